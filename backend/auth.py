@@ -4,7 +4,8 @@ Authentication system for Ultimate TicTacToe API.
 Provides:
 - JWT token creation and validation
 - AuthContext with user ID and admin status
-- get_current_auth_context dependency for injection
+- get_current_auth_context dependency for injection, served from the auth
+  cache (services/AuthCache.py) or the token's claims when possible
 - Auth decorator markers for route protection
 - Enforcement helper functions
 """
@@ -13,13 +14,23 @@ from fastapi import Depends, HTTPException, status, Request
 from typing import Optional, Callable
 from datetime import datetime, timedelta, UTC
 import jwt
+import time
+from sqlalchemy import select
 from services.UserService import UserService
+from services.AuthCache import auth_cache
+from database.session import db_session, get_async_db
 import os
 
 # Secret key for JWT encoding/decoding
 SECRET_KEY = os.environ.get("JWT_SECRET_KEY", "secret-key")
 ALGORITHM = "HS256"
 
+# Sign the user's admin flag into tokens so requests authenticate from the
+# token alone. Claims are only trusted for users unchanged since the token
+# was issued, which this process can only tell for tokens issued after it
+# started; don't enable with several server processes sharing a database.
+AUTH_TOKEN_CLAIMS = os.environ.get("AUTH_TOKEN_CLAIMS", "false").lower() in ("1", "true", "yes")
+
 
 class AuthContext:
     """Context object containing authenticated user information"""
@@ -31,13 +42,14 @@ class AuthContext:
         return f"AuthContext(user_id={self.user_id}, is_admin={self.is_admin})"
 
 
-def create_token(user_id: int, expires_in_minutes: int = 1440) -> str:
+def create_token(user_id: int, expires_in_minutes: int = 1440, admin: Optional[bool] = None) -> str:
     """
     Create a JWT token for a user.
     
     Args:
         user_id: The user ID to encode
         expires_in_minutes: Token expiration time in minutes (default: 24 hours)
+        admin: The user's admin flag, signed into the token with AUTH_TOKEN_CLAIMS
     
     Returns:
         JWT token string
@@ -46,6 +58,9 @@ def create_token(user_id: int, expires_in_minutes: int = 1440) -> str:
         "user_id": user_id,
         "exp": datetime.now(UTC) + timedelta(minutes=expires_in_minutes)
     }
+    if AUTH_TOKEN_CLAIMS and admin is not None:
+        payload["admin"] = bool(admin)
+        payload["iat"] = time.time()
     return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
 
 
@@ -68,29 +83,27 @@ def decode_token(token: str) -> Optional[dict]:
         return None
 
 
-async def get_current_auth_context(request: Request) -> AuthContext:
+def _token_payload(request: Request) -> Optional[dict]:
     """
-    Dependency that extracts auth context from request Bearer token.
-    
-    Returns AuthContext even if no token provided (user_id=None, is_admin=False).
-    Only raises HTTPException if token is provided but invalid.
+    The payload of the request's Bearer token, or None without a (well-formed) one.
     
-    This allows routes to be flexible about whether auth is required or optional.
+    Raises:
+        HTTPException: If a token is provided but invalid or expired
     """
     auth_header = request.headers.get("Authorization")
     
     if not auth_header:
         # No token provided - return empty context
-        return AuthContext()
+        return None
     
     try:
         scheme, token = auth_header.split()
         if scheme.lower() != "bearer":
             # Invalid scheme - return empty context
-            return AuthContext()
+            return None
     except ValueError:
         # Malformed header - return empty context
-        return AuthContext()
+        return None
     
     # Token was provided, so decode it
     payload = decode_token(token)
@@ -102,12 +115,24 @@ async def get_current_auth_context(request: Request) -> AuthContext:
             detail="Invalid or expired token"
         )
     
+    return payload
+
+
+def _cached_auth_context(payload: dict) -> Optional[AuthContext]:
+    """The auth context from the token's claims or the auth cache, or None if the user must be looked up."""
     user_id = payload.get("user_id")
     
-    # Get user info including admin status
-    user_service = UserService()
-    user = user_service.get_user_by_id(user_id)
+    if AUTH_TOKEN_CLAIMS and "admin" in payload and "iat" in payload:
+        if auth_cache.claims_valid(user_id, payload["iat"]):
+            return AuthContext(user_id=user_id, is_admin=bool(payload["admin"]))
     
+    is_admin = auth_cache.get_user_admin(user_id)
+    if is_admin is not None:
+        return AuthContext(user_id=user_id, is_admin=is_admin)
+    return None
+
+
+def _auth_context_for(user_id: int, user, loaded_at: float) -> AuthContext:
     if not user:
         # User not found
         raise HTTPException(
@@ -115,9 +140,50 @@ async def get_current_auth_context(request: Request) -> AuthContext:
             detail="User not found"
         )
     
+    auth_cache.put_user(user_id, user.admin, loaded_at)
     return AuthContext(user_id=user_id, is_admin=user.admin)
 
 
+def get_current_auth_context(request: Request) -> AuthContext:
+    """
+    Dependency that extracts auth context from request Bearer token.
+    
+    Returns AuthContext even if no token provided (user_id=None, is_admin=False).
+    Only raises HTTPException if token is provided but invalid.
+    
+    This allows routes to be flexible about whether auth is required or optional.
+    """
+    payload = _token_payload(request)
+    if payload is None or payload.get("user_id") is None:
+        return AuthContext()
+    
+    auth_context = _cached_auth_context(payload)
+    if auth_context is not None:
+        return auth_context
+    
+    # Get user info including admin status
+    user_id = payload["user_id"]
+    loaded_at = time.time()
+    user_service = UserService()
+    return _auth_context_for(user_id, user_service.get_user_by_id(user_id), loaded_at)
+
+
+async def get_current_auth_context_async(request: Request, session=Depends(get_async_db)) -> AuthContext:
+    """get_current_auth_context for async routes (DB_ASYNC): the user is looked up on the request's AsyncSession."""
+    payload = _token_payload(request)
+    if payload is None or payload.get("user_id") is None:
+        return AuthContext()
+    
+    auth_context = _cached_auth_context(payload)
+    if auth_context is not None:
+        return auth_context
+    
+    user_id = payload["user_id"]
+    loaded_at = time.time()
+    user_service = UserService()
+    return _auth_context_for(user_id, await user_service.get_user_by_id_async(session, user_id), loaded_at)
+
+
 # ===== Auth Decorators (markers for later enforcement) =====
 
 def auth_none():
@@ -216,9 +282,24 @@ def require_as_id(auth_context: AuthContext, target_user_id: int):
         )
 
 
+def _require_player(auth_context: AuthContext, game_id: int, players: Optional[tuple]):
+    if players is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Game not found"
+        )
+    
+    auth_cache.put_game(game_id, *players)
+    if auth_context.user_id not in players and not auth_context.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You are not a player in this game"
+        )
+
+
 def require_as_id_in_game(auth_context: AuthContext, game_id: int):
     """Check that user is a player in the specified game or is admin"""
-    from database.schema import SessionLocal, Game
+    from database.schema import Game
     
     if auth_context.user_id is None:
         raise HTTPException(
@@ -226,25 +307,32 @@ def require_as_id_in_game(auth_context: AuthContext, game_id: int):
             detail="Authentication required"
         )
     
-    db = SessionLocal()
-    game = db.query(Game).filter(Game.id == game_id).first()
-    db.close()
+    players = auth_cache.get_game_players(game_id)
+    if players is None:
+        players = db_session.query(Game.x_user_id, Game.o_user_id).filter(Game.id == game_id).first()
     
-    if not game:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Game not found"
-        )
+    _require_player(auth_context, game_id, tuple(players) if players else None)
+
+async def require_as_id_in_game_async(auth_context: AuthContext, game_id: int, session):
+    """require_as_id_in_game for async routes (DB_ASYNC), using the request's AsyncSession"""
+    from database.schema import Game
     
-    if auth_context.user_id not in [game.x_user_id, game.o_user_id] and not auth_context.is_admin:
+    if auth_context.user_id is None:
         raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="You are not a player in this game"
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Authentication required"
         )
+    
+    players = auth_cache.get_game_players(game_id)
+    if players is None:
+        result = await session.execute(select(Game.x_user_id, Game.o_user_id).where(Game.id == game_id))
+        players = result.first()
+    
+    _require_player(auth_context, game_id, tuple(players) if players else None)
 
 def require_as_inviter(auth_context: AuthContext, invite_id: int):
     """Check that user is the inviter of the specified invite or is admin"""
-    from database.schema import SessionLocal, UserInvite
+    from database.schema import UserInvite
     
     if auth_context.user_id is None:
         raise HTTPException(
@@ -252,9 +340,7 @@ def require_as_inviter(auth_context: AuthContext, invite_id: int):
             detail="Authentication required"
         )
     
-    db = SessionLocal()
-    invite = db.query(UserInvite).filter(UserInvite.id == invite_id).first()
-    db.close()
+    invite = db_session.query(UserInvite).filter(UserInvite.id == invite_id).first()
     
     if not invite:
         raise HTTPException(
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Build an opening book from every stored game.
+
+Usage:
+    python build_opening_book.py [--output PATH] [--max-ply N] [--min-games N]
+
+Games are read the same way the server stores them: JSON files under
+DATA_DIR/games when DB_TYPE=sqlite, or the games.game_state column when
+DB_TYPE=postgres. Finished games are replayed, and move statistics for
+positions with fewer than --max-ply stones are written as a sorted binary
+book. Set OPENING_BOOK_PATH to the output file to let bots play from it.
+
+Example:
+    cd backend && python build_opening_book.py --output ../devdata/opening_book.bin --max-ply 16
+"""
+
+import os
+import sys
+import time
+import argparse
+
+from database.schema import DB_TYPE
+from services.TicTacToeService import TicTacToeService
+from services.GameFileService import GameFileService
+from engines.opening_book import collect_statistics, write_book, DEFAULT_MAX_PLY
+
+DATA_DIR = os.environ.get("DATA_DIR", "./devdata")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build an opening book from stored games",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument(
+        "--output",
+        default=os.path.join(DATA_DIR, "opening_book.bin"),
+        help="Path of the book file to write (default: DATA_DIR/opening_book.bin)"
+    )
+    parser.add_argument(
+        "--max-ply",
+        type=int,
+        default=DEFAULT_MAX_PLY,
+        help=f"Only record positions with fewer stones than this (default: {DEFAULT_MAX_PLY})"
+    )
+    parser.add_argument(
+        "--min-games",
+        type=int,
+        default=1,
+        help="Drop moves seen in fewer games than this (default: 1)"
+    )
+
+    args = parser.parse_args()
+    if args.max_ply < 1:
+        print("❌ --max-ply must be at least 1")
+        sys.exit(1)
+
+    game_file_service = GameFileService(tictactoe_service=TicTacToeService())
+    source = "games.game_state (PostgreSQL)" if DB_TYPE == "postgres" else os.path.join(DATA_DIR, "games")
+    print(f"📦 Reading games from {source}")
+
+    loaded = 0
+
+    def games():
+        nonlocal loaded
+        for _, game in game_file_service.iter_games():
+            loaded += 1
+            yield game
+
+    start = time.perf_counter()
+    stats = collect_statistics(games(), max_ply=args.max_ply)
+    records = write_book(args.output, stats, min_games=args.min_games)
+    elapsed = time.perf_counter() - start
+
+    positions = len({key for key, _ in stats})
+    print(f"✓ Read {loaded} game(s), {positions} distinct position(s)")
+    print(f"✓ Wrote {records} record(s) to {args.output} in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Build an endgame tablebase for near-full boards.
+
+Usage:
+    python build_tablebase.py [--max-empty K] [--random-games N] [--workers W]
+                              [--chunk-size N] [--work-dir DIR] [--output PATH]
+                              [--known PATH] [--seed S]
+
+Seed positions are the first position with at most K playable cells in
+every stored game plus N randomly played games. Each seed is solved
+exactly backwards from the finished positions below it, and every position
+passed through is recorded with its win/loss/draw result and distance.
+
+Seeds are split into chunks that a multiprocessing pool solves in
+parallel. Each finished chunk is written to the work directory, so an
+interrupted run picks up where it stopped when started again with the same
+--work-dir. --known reuses an earlier (smaller K) table to cut the search
+short. Set TABLEBASE_PATH to the output file to use it in game analysis.
+
+Example:
+    cd backend && python build_tablebase.py --max-empty 12 --random-games 5000 --workers 8
+"""
+
+import os
+import sys
+import time
+import argparse
+import multiprocessing
+
+from database.schema import DB_TYPE
+from services.TicTacToeService import TicTacToeService
+from services.GameFileService import GameFileService
+from engines.tablebase import (
+    seed_from_game, random_seeds, prepare_work_dir, pending_jobs, solve_chunk, merge_chunks,
+)
+
+DATA_DIR = os.environ.get("DATA_DIR", "./devdata")
+
+
+def collect_seeds(max_empty: int, random_games: int, seed: int):
+    """Seed positions from stored games and random play."""
+    game_file_service = GameFileService(tictactoe_service=TicTacToeService())
+    source = "games.game_state (PostgreSQL)" if DB_TYPE == "postgres" else os.path.join(DATA_DIR, "games")
+    print(f"📦 Reading games from {source}")
+
+    seeds = []
+    for _, game in game_file_service.iter_games():
+        board = seed_from_game(game, max_empty)
+        if board is not None:
+            seeds.append(board)
+    print(f"✓ {len(seeds)} seed position(s) from stored games")
+
+    if random_games > 0:
+        print(f"🎲 Playing {random_games} random game(s) down to {max_empty} playable cells")
+        seeds.extend(random_seeds(random_games, max_empty, seed=seed))
+    return seeds
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build an endgame tablebase by retrograde analysis",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument(
+        "--max-empty",
+        type=int,
+        default=10,
+        help="Solve positions with at most this many playable cells (default: 10)"
+    )
+    parser.add_argument(
+        "--random-games",
+        type=int,
+        default=1000,
+        help="Random games played to find extra seed positions (default: 1000)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Worker processes (default: CPU count)"
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=50,
+        help="Seed positions per chunk of work (default: 50)"
+    )
+    parser.add_argument(
+        "--work-dir",
+        default=os.path.join(DATA_DIR, "tablebase-work"),
+        help="Directory for resumable progress (default: DATA_DIR/tablebase-work)"
+    )
+    parser.add_argument(
+        "--output",
+        default=os.path.join(DATA_DIR, "tablebase.bin"),
+        help="Path of the tablebase file to write (default: DATA_DIR/tablebase.bin)"
+    )
+    parser.add_argument(
+        "--known",
+        default=None,
+        help="Existing tablebase to probe instead of re-solving its positions"
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Random seed for the random games (default: 0)"
+    )
+
+    args = parser.parse_args()
+    if args.max_empty < 1 or args.chunk_size < 1 or args.workers < 1:
+        print("❌ --max-empty, --chunk-size and --workers must be at least 1")
+        sys.exit(1)
+    if args.known and not os.path.exists(args.known):
+        print(f"❌ Tablebase not found: {args.known}")
+        sys.exit(1)
+
+    plan_path = os.path.join(args.work_dir, "plan.json")
+    if os.path.exists(plan_path):
+        print(f"📁 Resuming from {args.work_dir}")
+        seeds = []
+    else:
+        seeds = collect_seeds(args.max_empty, args.random_games, args.seed)
+
+    try:
+        plan = prepare_work_dir(args.work_dir, args.max_empty, seeds, args.chunk_size)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    jobs = pending_jobs(plan, args.work_dir, args.known)
+    total_chunks = len(plan["chunks"])
+    print(f"📁 {total_chunks - len(jobs)}/{total_chunks} chunk(s) already solved")
+
+    start = time.perf_counter()
+    solved = total_chunks - len(jobs)
+    if jobs:
+        with multiprocessing.Pool(processes=min(args.workers, len(jobs))) as pool:
+            for index, count in pool.imap_unordered(solve_chunk, jobs):
+                solved += 1
+                print(f"✓ Chunk {index}: {count} position(s) ({solved}/{total_chunks})")
+
+    records = merge_chunks(plan, args.work_dir, args.output, known_path=args.known)
+    elapsed = time.perf_counter() - start
+    print(f"✓ Wrote {records} position(s) to {args.output} in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Convert stored games between the JSON and binary formats, or benchmark the two.
+
+Usage:
+    python convert_game_format.py --to binary|json [--dry-run]
+    python convert_game_format.py --benchmark [--limit N]
+
+Games are read the same way the server stores them: game files under
+DATA_DIR/games when DB_TYPE=sqlite, or the games table when
+DB_TYPE=postgres. Either format is read, so conversion can be run again
+safely. Set GAME_FORMAT to the same target so new writes keep the format.
+With GAME_STORAGE=movelog, unfinished games stay as move logs and are
+written in the target format once they finish.
+
+--benchmark converts nothing: it times encoding and decoding of the stored
+games with both codecs and reports bytes per game.
+
+Example:
+    cd backend && python convert_game_format.py --benchmark
+    cd backend && GAME_FORMAT=binary python convert_game_format.py --to binary
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+from database.schema import DB_TYPE
+from services.TicTacToeService import TicTacToeService
+from services.GameFileService import GameFileService, GAME_FORMATS
+from datamodels.game_codec import encode_game, decode_game
+
+DATA_DIR = os.environ.get("DATA_DIR", "./devdata")
+
+
+def benchmark(game_file_service: GameFileService, games: list) -> None:
+    """Print encode/decode throughput and size for the JSON and binary codecs."""
+    codecs = {
+        "json": (
+            lambda game: json.dumps(game_file_service._serialize_game(game), indent=2).encode(),
+            lambda data: game_file_service._deserialize_game(json.loads(data)),
+        ),
+        "binary": (encode_game, decode_game),
+    }
+    print(f"\n{'format':<8} {'encode games/s':>15} {'decode games/s':>15} {'bytes/game':>12}")
+    for name, (encode, decode) in codecs.items():
+        start = time.perf_counter()
+        encoded = [encode(game) for game in games]
+        encode_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for data in encoded:
+            decode(data)
+        decode_time = time.perf_counter() - start
+
+        size = sum(len(data) for data in encoded) / len(games)
+        print(f"{name:<8} {len(games) / encode_time:>15.0f} {len(games) / decode_time:>15.0f} {size:>12.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Convert stored games between JSON and binary formats",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument(
+        "--to",
+        choices=GAME_FORMATS,
+        help="Format to rewrite every stored game in"
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Count the games that would be converted without writing"
+    )
+    parser.add_argument(
+        "--benchmark",
+        action="store_true",
+        help="Compare the codecs on the stored games instead of converting"
+    )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=None,
+        help="Only use the first N games for --benchmark"
+    )
+
+    args = parser.parse_args()
+    if not args.benchmark and args.to is None:
+        parser.error("one of --to or --benchmark is required")
+
+    source = "games table (PostgreSQL)" if DB_TYPE == "postgres" else os.path.join(DATA_DIR, "games")
+    print(f"📦 Reading games from {source}")
+
+    if args.benchmark:
+        game_file_service = GameFileService(tictactoe_service=TicTacToeService())
+        games = []
+        for _, game in game_file_service.iter_games():
+            games.append(game)
+            if args.limit is not None and len(games) >= args.limit:
+                break
+        if not games:
+            print("❌ No games to benchmark")
+            sys.exit(1)
+        print(f"✓ Loaded {len(games)} game(s)")
+        benchmark(game_file_service, games)
+        return
+
+    # write straight through: no cache, no write-behind
+    game_file_service = GameFileService(
+        tictactoe_service=TicTacToeService(), game_format=args.to, cache_size=0, write_behind=0
+    )
+    converted = 0
+    start = time.perf_counter()
+    # collect ids first: saving renames files under the directory being listed
+    game_ids = [game_id for game_id, _ in game_file_service.iter_games()]
+    for game_id in game_ids:
+        game = game_file_service.load_game(game_id)
+        if game is None:
+            continue
+        if not args.dry_run:
+            game_file_service.save_game(game_id, game)
+        converted += 1
+    elapsed = time.perf_counter() - start
+
+    if args.dry_run:
+        print(f"📋 Dry-run complete. Would convert {converted} game(s) to {args.to}")
+    else:
+        print(f"✓ Converted {converted} game(s) to {args.to} in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -79,8 +79,13 @@ def repair_winner_ids(db: Optional[Session] = None) -> int:
             game_id, x_user_id, o_user_id, winner_id = game_row
             
             # Load game state from JSON
-            game_file = os.path.join(GAMES_DIR, f"{game_id}.json")
-            if not os.path.exists(game_file):
+            # the JSON file may still be flat or already in its shard
+            candidates = [
+                os.path.join(GAMES_DIR, f"{game_id}.json"),
+                os.path.join(GAMES_DIR, f"{game_id & 0xFF:02x}", f"{(game_id >> 8) & 0xFF:02x}", f"{game_id}.json"),
+            ]
+            game_file = next((path for path in candidates if os.path.exists(path)), None)
+            if game_file is None:
                 continue
             
             try:
@@ -239,3 +244,267 @@ def add_user_password_must_reset_column(db: Optional[Session] = None) -> bool:
         if db is None:
             session.close()
 
+
+def add_user_bot_column(db: Optional[Session] = None) -> bool:
+    """
+    Add bot column to users table if it doesn't exist.
+    Bot users have their turns played by the BotService.
+    
+    Args:
+        db: Optional database session. If not provided, creates a new one.
+    
+    Returns:
+        True if column was added, False if it already existed
+    """
+    session = db or SessionLocal()
+    
+    try:
+        try:
+            inspector = inspect(engine)
+            users_columns = [col['name'] for col in inspector.get_columns('users')]
+            
+            if 'bot' in users_columns:
+                print("✓ bot column already exists")
+                return False
+        except Exception as e:
+            print(f"Note: Could not inspect columns: {e}, will attempt to add anyway")
+        
+        print("Adding bot column to users table...")
+        default = "FALSE" if DB_TYPE == "postgres" else "0"
+        try:
+            session.execute(text(
+                f"ALTER TABLE users ADD COLUMN bot BOOLEAN DEFAULT {default}"
+            ))
+            session.commit()
+            print("✓ Successfully added bot column")
+            return True
+        except Exception as add_err:
+            error_msg = str(add_err).lower()
+            if 'already exists' in error_msg or 'duplicate' in error_msg:
+                print("✓ bot column already exists")
+                return False
+            else:
+                session.rollback()
+                print(f"Warning: Error adding bot column: {add_err}")
+                return False
+        
+    finally:
+        if db is None:
+            session.close()
+
+
+
+def add_game_state_bin_column(db: Optional[Session] = None) -> bool:
+    """
+    Add game_state_bin column to games table if it doesn't exist.
+    It holds binary encoded game states when GAME_FORMAT is binary.
+    
+    Args:
+        db: Optional database session. If not provided, creates a new one.
+    
+    Returns:
+        True if column was added, False if it already existed
+    """
+    session = db or SessionLocal()
+    
+    try:
+        try:
+            inspector = inspect(engine)
+            games_columns = [col['name'] for col in inspector.get_columns('games')]
+            
+            if 'game_state_bin' in games_columns:
+                print("✓ game_state_bin column already exists")
+                return False
+        except Exception as e:
+            print(f"Note: Could not inspect columns: {e}, will attempt to add anyway")
+        
+        print("Adding game_state_bin column to games table...")
+        column_type = "BYTEA" if DB_TYPE == "postgres" else "BLOB"
+        try:
+            session.execute(text(
+                f"ALTER TABLE games ADD COLUMN game_state_bin {column_type}"
+            ))
+            session.commit()
+            print("✓ Successfully added game_state_bin column")
+            return True
+        except Exception as add_err:
+            error_msg = str(add_err).lower()
+            if 'already exists' in error_msg or 'duplicate' in error_msg:
+                print("✓ game_state_bin column already exists")
+                return False
+            else:
+                session.rollback()
+                print(f"Warning: Error adding game_state_bin column: {add_err}")
+                return False
+        
+    finally:
+        if db is None:
+            session.close()
+
+
+def convert_game_state_to_jsonb(db: Optional[Session] = None) -> bool:
+    """
+    Change games.game_state from JSON to JSONB on PostgreSQL, so loads can
+    extract current_game or a slice of the moves server side instead of
+    fetching whole documents. Also switches the column to lz4 compression
+    (PostgreSQL 14+), which decompresses large documents much faster than
+    the default pglz. The type change rewrites the table once.
+    
+    Args:
+        db: Optional database session. If not provided, creates a new one.
+    
+    Returns:
+        True if the column was converted, False if it already was JSONB (or on SQLite)
+    """
+    if DB_TYPE != "postgres":
+        return False
+    session = db or SessionLocal()
+    
+    try:
+        column_type = session.execute(text("""
+            SELECT data_type FROM information_schema.columns
+            WHERE table_name = 'games' AND column_name = 'game_state'
+        """)).scalar()
+        if column_type is None:
+            print("Warning: games.game_state column not found, skipping JSONB conversion")
+            return False
+        if column_type == 'jsonb':
+            print("✓ game_state column is already JSONB")
+            return False
+        
+        print("Converting game_state column to JSONB...")
+        try:
+            session.execute(text(
+                "ALTER TABLE games ALTER COLUMN game_state TYPE JSONB USING game_state::jsonb"
+            ))
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            print(f"Warning: Error converting game_state column to JSONB: {e}")
+            return False
+        
+        try:
+            if int(session.execute(text("SHOW server_version_num")).scalar()) >= 140000:
+                session.execute(text("ALTER TABLE games ALTER COLUMN game_state SET COMPRESSION lz4"))
+                session.commit()
+        except Exception as e:
+            # lz4 is optional at PostgreSQL build time; pglz still works
+            session.rollback()
+            print(f"Note: Keeping default compression for game_state: {e}")
+        
+        print("✓ Successfully converted game_state column to JSONB")
+        return True
+    finally:
+        if db is None:
+            session.close()
+
+
+def add_game_turn_columns(db: Optional[Session] = None) -> bool:
+    """
+    Add the turn, next_user_id, move_count and last_move_at columns to the
+    games table if they don't exist, plus the indexes the turn lists use.
+    
+    Args:
+        db: Optional database session. If not provided, creates a new one.
+    
+    Returns:
+        True if any column was added, False if they all existed
+    """
+    session = db or SessionLocal()
+    datetime_type = "TIMESTAMP" if DB_TYPE == "postgres" else "DATETIME"
+    columns = {
+        "turn": "VARCHAR(1)",
+        "next_user_id": "INTEGER REFERENCES users(id)",
+        "move_count": "INTEGER DEFAULT 0",
+        "last_move_at": datetime_type,
+    }
+    
+    try:
+        try:
+            inspector = inspect(engine)
+            games_columns = [col['name'] for col in inspector.get_columns('games')]
+        except Exception as e:
+            print(f"Note: Could not inspect columns: {e}, will attempt to add anyway")
+            games_columns = []
+        
+        added = False
+        for name, column_type in columns.items():
+            if name in games_columns:
+                continue
+            try:
+                session.execute(text(f"ALTER TABLE games ADD COLUMN {name} {column_type}"))
+                session.commit()
+                print(f"✓ Successfully added {name} column")
+                added = True
+            except Exception as add_err:
+                session.rollback()
+                error_msg = str(add_err).lower()
+                if 'already exists' not in error_msg and 'duplicate' not in error_msg:
+                    print(f"Warning: Error adding {name} column: {add_err}")
+        if not added:
+            print("✓ game turn columns already exist")
+        
+        for index_name, index_columns in (
+            ("ix_games_next_user_id", "next_user_id, finished"),
+            ("ix_games_x_user_id", "x_user_id, finished"),
+            ("ix_games_o_user_id", "o_user_id, finished"),
+        ):
+            try:
+                session.execute(text(f"CREATE INDEX IF NOT EXISTS {index_name} ON games ({index_columns})"))
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                print(f"Warning: Could not create index {index_name}: {e}")
+        
+        return added
+    
+    finally:
+        if db is None:
+            session.close()
+
+
+def backfill_game_turn_columns(db: Optional[Session] = None) -> int:
+    """
+    Fill the turn columns of games stored before they existed, by loading
+    each game's state once.
+    
+    Args:
+        db: Optional database session. If not provided, creates a new one.
+    
+    Returns:
+        Number of games backfilled
+    """
+    # imported here: the services import database.schema themselves
+    from services.TicTacToeService import TicTacToeService
+    from services.GameFileService import GameFileService
+    
+    session = db or SessionLocal()
+    game_file_service = GameFileService(tictactoe_service=TicTacToeService(), cache_size=0, write_behind=0)
+    filled_count = 0
+    
+    try:
+        game_records = session.query(Game).filter(Game.turn.is_(None)).all()
+        for game_record in game_records:
+            try:
+                game = game_file_service.load_game(game_record.id)
+            except (KeyError, TypeError, ValueError) as e:
+                print(f"Warning: Could not process game {game_record.id}: {e}")
+                continue
+            if game is None:
+                continue
+            game_file_service.update_game_record(game_record, game)
+            filled_count += 1
+        
+        session.commit()
+        if filled_count > 0:
+            print(f"✓ Backfilled turn columns for {filled_count} game(s)")
+        return filled_count
+    
+    except Exception as e:
+        session.rollback()
+        print(f"Error during turn column backfill: {e}")
+        return 0
+    finally:
+        game_file_service.db.close()
+        if db is None:
+            session.close()
@@ -9,8 +9,11 @@ from sqlalchemy import (
     Text,
     Boolean,
     DateTime,
-    JSON
+    JSON,
+    LargeBinary,
+    Index
 )
+from sqlalchemy.dialects.postgresql import JSONB
 import datetime
 from sqlalchemy.orm import declarative_base, relationship, sessionmaker
 
@@ -18,6 +21,10 @@ from sqlalchemy.orm import declarative_base, relationship, sessionmaker
 DATA_DIR = os.environ.get("DATA_DIR", "./devdata")
 DB_TYPE = os.environ.get("DB_TYPE", "sqlite").lower()
 
+# Connection pool per process; requests each hold one connection while they run
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", "20"))
+
 if DB_TYPE == "postgres":
     # PostgreSQL configuration
     DB_HOST = os.environ.get("DB_HOST", "localhost")
@@ -31,20 +38,23 @@ if DB_TYPE == "postgres":
         DB_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
     else:
         DB_URL = f"postgresql://{DB_USER}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+    # Same database through asyncpg, for the async data layer (DB_ASYNC)
+    ASYNC_DB_URL = DB_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
     
     # PostgreSQL engine configuration
     engine = create_engine(
         DB_URL,
         echo=False,
         future=True,
-        pool_size=10,
-        max_overflow=20,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
     )
 else:
     # SQLite configuration (default)
     DB_DIR = DATA_DIR
     DB_PATH = os.path.join(DB_DIR, "app.db")
     os.makedirs(DB_DIR, exist_ok=True)
+    ASYNC_DB_URL = f"sqlite+aiosqlite:///{DB_PATH}"
     
     # SQLite engine configuration
     engine = create_engine(
@@ -52,8 +62,8 @@ else:
         echo=False,
         future=True,
         connect_args={"timeout": 30},
-        pool_size=10,
-        max_overflow=20,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
     )
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 Base = declarative_base()
@@ -71,6 +81,7 @@ class User(Base):
     admin = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.datetime.utcnow, nullable=True)
     password_must_reset = Column(Boolean, default=False, nullable=True)
+    bot = Column(Boolean, default=False, nullable=True)
 
     # Relationships
     games_as_x = relationship("Game", foreign_keys="Game.x_user_id", back_populates="x_user")
@@ -91,7 +102,21 @@ class Game(Base):
     
     # For PostgreSQL: store game state as JSON in database
     # For SQLite: game state is stored in JSON files
-    game_state = Column(JSON, nullable=True)  # Only used when DB_TYPE is postgres
+    # JSONB on PostgreSQL so current_game or a slice of moves can be read server side
+    game_state = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=True)  # Only used when DB_TYPE is postgres
+    game_state_bin = Column(LargeBinary, nullable=True)  # Same, when GAME_FORMAT is binary
+
+    # Copied from the game state on every turn so turn lists need no state loading
+    turn = Column(String(1), nullable=True)  # 'X' or 'O', the player to move
+    next_user_id = Column(Integer, ForeignKey("users.id"), nullable=True)  # None once finished
+    move_count = Column(Integer, default=0, nullable=True)
+    last_move_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_games_next_user_id", "next_user_id", "finished"),
+        Index("ix_games_x_user_id", "x_user_id", "finished"),
+        Index("ix_games_o_user_id", "o_user_id", "finished"),
+    )
 
     # Relationships
     x_user = relationship("User", foreign_keys=[x_user_id], back_populates="games_as_x")
@@ -0,0 +1,186 @@
+"""
+Request-scoped database sessions.
+
+Services share `db_session`, a scoped session proxy: every call on it goes
+to the session of the current unit of work. DBSessionMiddleware opens one
+unit of work per HTTP request, so concurrent requests never share a session
+(or its identity map), and closes it when the response is done. Outside a
+request (startup, CLI tools, background threads) each thread gets its own
+session.
+
+With DB_ASYNC enabled the hot read routes (game reads, turn lists and
+the auth lookup) query through an AsyncEngine instead (asyncpg on
+PostgreSQL, aiosqlite on SQLite), so waiting on the database never holds a
+worker thread. It needs the sqlalchemy[asyncio] extra and the driver.
+"""
+import asyncio
+import os
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
+from sqlalchemy import event
+from sqlalchemy.orm import Session, scoped_session
+from database.schema import SessionLocal, engine, ASYNC_DB_URL, DB_POOL_SIZE, DB_MAX_OVERFLOW
+
+DB_ASYNC = os.environ.get("DB_ASYNC", "false").lower() in ("1", "true", "yes")
+
+# Requests allowed to hold a session at once; the rest wait on the event loop
+# without a worker thread or connection. Keeping this within the pool means a
+# request holding a connection never waits for a thread that is itself
+# waiting for a connection.
+DB_MAX_REQUESTS = int(os.environ.get("DB_MAX_REQUESTS", str(DB_POOL_SIZE + DB_MAX_OVERFLOW)))
+
+_scope: ContextVar[Optional[object]] = ContextVar("db_session_scope", default=None)
+
+
+def _current_scope() -> Any:
+    scope = _scope.get()
+    return scope if scope is not None else ("thread", threading.get_ident())
+
+
+db_session = scoped_session(SessionLocal, scopefunc=_current_scope)
+
+_stats_lock = threading.Lock()
+_stats = {
+    "units_of_work": 0,
+    "active_units_of_work": 0,
+    "peak_active_units_of_work": 0,
+    "connects": 0,
+    "checkouts": 0,
+    "invalidations": 0,
+    "waiting_requests": 0,
+}
+
+
+def _count(name: str, amount: int = 1) -> None:
+    with _stats_lock:
+        _stats[name] += amount
+
+
+@event.listens_for(engine, "connect")
+def _on_connect(dbapi_connection, connection_record):
+    _count("connects")
+
+
+@event.listens_for(engine, "checkout")
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    _count("checkouts")
+
+
+@event.listens_for(engine, "invalidate")
+def _on_invalidate(dbapi_connection, connection_record, exception):
+    _count("invalidations")
+
+
+@contextmanager
+def session_scope() -> Iterator[Session]:
+    """
+    Run a unit of work with its own session; db_session refers to it until
+    the block exits, when it is closed (uncommitted changes are rolled back).
+    """
+    token = _scope.set(object())
+    with _stats_lock:
+        _stats["units_of_work"] += 1
+        _stats["active_units_of_work"] += 1
+        _stats["peak_active_units_of_work"] = max(_stats["peak_active_units_of_work"], _stats["active_units_of_work"])
+    try:
+        yield db_session()
+    finally:
+        db_session.remove()
+        _scope.reset(token)
+        _count("active_units_of_work", -1)
+
+
+class DBSessionMiddleware:
+    """
+    ASGI middleware giving every HTTP request its own database session, for
+    at most max_requests requests at a time.
+    """
+
+    def __init__(self, app, max_requests: int = DB_MAX_REQUESTS):
+        if max_requests < 1:
+            raise ValueError("DB_MAX_REQUESTS must be at least 1")
+        self.app = app
+        self.admission = asyncio.Semaphore(max_requests)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        _count("waiting_requests")
+        try:
+            await self.admission.acquire()
+        finally:
+            _count("waiting_requests", -1)
+        try:
+            # handlers run on worker threads with a copy of this context, so they see the same scope
+            with session_scope():
+                await self.app(scope, receive, send)
+        finally:
+            self.admission.release()
+
+
+_async_sessionmaker = None
+_async_lock = threading.Lock()
+
+
+def get_async_sessionmaker():
+    """The AsyncSession factory, creating the AsyncEngine on first use."""
+    global _async_sessionmaker
+    with _async_lock:
+        if _async_sessionmaker is None:
+            # imported here so the async drivers are only needed with DB_ASYNC
+            from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+            async_engine = create_async_engine(
+                ASYNC_DB_URL,
+                echo=False,
+                pool_size=DB_POOL_SIZE,
+                max_overflow=DB_MAX_OVERFLOW,
+            )
+            # expire_on_commit would make every attribute access after a commit a lazy (sync) load
+            _async_sessionmaker = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+        return _async_sessionmaker
+
+
+@asynccontextmanager
+async def async_session_scope() -> AsyncIterator[Any]:
+    """An AsyncSession for one unit of work, closed when the block exits."""
+    _count("units_of_work")
+    async with get_async_sessionmaker()() as session:
+        yield session
+
+
+async def get_async_db() -> AsyncIterator[Any]:
+    """FastAPI dependency: one AsyncSession per request."""
+    async with async_session_scope() as session:
+        yield session
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """
+    Connection pool and unit of work counters.
+
+    Returns:
+        Dictionary with the pool's size, checked out / idle connections and
+        overflow in use (when the pool reports them), plus totals of
+        connections opened, checkouts and units of work
+    """
+    pool = engine.pool
+    stats: Dict[str, Any] = {
+        "pool": type(pool).__name__,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "max_requests": DB_MAX_REQUESTS,
+    }
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        method = getattr(pool, name, None)
+        if callable(method):
+            stats[name] = method()
+    with _stats_lock:
+        stats.update(_stats)
+    if _async_sessionmaker is not None:
+        async_pool = _async_sessionmaker.kw["bind"].pool
+        stats["async"] = {name: getattr(async_pool, name)() for name in ("size", "checkedin", "checkedout", "overflow")
+                          if callable(getattr(async_pool, name, None))}
+    return stats
@@ -0,0 +1,170 @@
+from __future__ import annotations
+from typing import List, Optional, Sequence
+import numpy as np
+from datamodels.tictactoe import UltimateTicTacToeGameState
+from datamodels.bitboard import BitboardGameState, POSITION_INDEX, ANY_CORNER, NO_WINNER, X, O, iter_cells
+from datamodels.subboard_table import SUBBOARD_TABLE, POW3 as _POW3, WINNER_MASK, FINISHED_BIT
+
+# Cell values
+EMPTY = 0
+X_CELL = 1
+O_CELL = 2
+
+# Sub-board status values
+OPEN = 0
+X_WON = 1
+O_WON = 2
+DRAWN = 3
+
+NO_MOVE = -1
+
+POW3 = np.array(_POW3, dtype=np.int32)
+TABLE = np.frombuffer(SUBBOARD_TABLE.tobytes(), dtype=np.uint32).copy()
+CORNERS = np.arange(9, dtype=np.int8)
+
+
+class BatchGameState:
+    """
+    N Ultimate TicTacToe games held as NumPy arrays and advanced together.
+
+    cells:    (N, 81) int8, cell 9*corner + position; EMPTY, X_CELL or O_CELL
+    status:   (N, 9) int8 sub-board status; OPEN, X_WON, O_WON or DRAWN
+    turn:     (N,) int8, X_CELL or O_CELL
+    active:   (N,) int8 forced corner, or ANY_CORNER
+    finished: (N,) bool
+    winner:   (N,) int8, EMPTY, X_CELL or O_CELL
+    """
+
+    def __init__(self, n: int):
+        self.n = n
+        self.cells = np.zeros((n, 81), dtype=np.int8)
+        self.status = np.zeros((n, 9), dtype=np.int8)
+        self.turn = np.full(n, X_CELL, dtype=np.int8)
+        self.active = np.full(n, POSITION_INDEX['center'], dtype=np.int8)
+        self.finished = np.zeros(n, dtype=bool)
+        self.winner = np.zeros(n, dtype=np.int8)
+
+    def legal_mask(self) -> np.ndarray:
+        """(N, 81) bool mask of the cells each game's side to move may play."""
+        allowed = self.status == OPEN
+        forced = self.active != ANY_CORNER
+        allowed &= ~forced[:, None] | (CORNERS[None, :] == self.active[:, None])
+        allowed &= ~self.finished[:, None]
+        return np.repeat(allowed, 9, axis=1) & (self.cells == EMPTY)
+
+    def random_moves(self, rng: np.random.Generator) -> np.ndarray:
+        """Pick a uniformly random legal cell per game, NO_MOVE where there is none."""
+        legal = self.legal_mask()
+        scores = np.where(legal, rng.random(legal.shape), -1.0)
+        moves = scores.argmax(axis=1).astype(np.int16)
+        moves[~legal.any(axis=1)] = NO_MOVE
+        return moves
+
+    def step(self, moves: np.ndarray, validate: bool = True) -> None:
+        """
+        Apply one move per game. Games whose move is NO_MOVE are left untouched.
+
+        Args:
+            moves: (N,) cell indices (9*corner + position) or NO_MOVE
+            validate: Check every move against legal_mask() first
+
+        Raises:
+            ValueError: If validate is set and any move is illegal
+        """
+        moves = np.asarray(moves)
+        rows = np.nonzero(moves != NO_MOVE)[0]
+        if rows.size == 0:
+            return
+        cells = moves[rows].astype(np.intp)
+
+        if validate:
+            legal = self.legal_mask()[rows, cells]
+            if not legal.all():
+                raise ValueError(f"Illegal move in game(s) {rows[~legal].tolist()}")
+
+        corner = cells // 9
+        position = cells % 9
+        player = self.turn[rows]
+        self.cells[rows, cells] = player
+
+        # one outcome table lookup per played sub-board
+        sub_cells = self.cells.reshape(self.n, 9, 9)[rows, corner]
+        entries = TABLE[sub_cells.astype(np.int32) @ POW3]
+        sub_finished = (entries & FINISHED_BIT) != 0
+        sub_winner = (entries & WINNER_MASK).astype(np.int8)
+        self.status[rows, corner] = np.where(sub_finished, np.where(sub_winner > 0, sub_winner, DRAWN), OPEN)
+
+        # next corner is the position played, unless that sub-board is closed
+        next_open = self.status[rows, position] == OPEN
+        self.active[rows] = np.where(next_open, position, ANY_CORNER)
+        self.turn[rows] = np.where(player == X_CELL, O_CELL, X_CELL)
+
+        # meta board: sub-board winners as a 3x3 board, drawn boards count as empty
+        status = self.status[rows]
+        meta_cells = np.where(status == DRAWN, 0, status).astype(np.int32)
+        meta_winner = (TABLE[meta_cells @ POW3] & WINNER_MASK).astype(np.int8)
+        all_closed = (status != OPEN).all(axis=1)
+        done = (meta_winner > 0) | all_closed
+        self.finished[rows] = done
+        self.winner[rows] = np.where(done, meta_winner, EMPTY)
+
+    # ===== Conversion =====
+
+    @classmethod
+    def from_game_states(cls, states: Sequence[UltimateTicTacToeGameState]) -> BatchGameState:
+        batch = cls(len(states))
+        for i, state in enumerate(states):
+            batch.set_bitboard(i, BitboardGameState.from_game_state(state))
+        return batch
+
+    def set_bitboard(self, i: int, board: BitboardGameState) -> None:
+        self.cells[i] = EMPTY
+        self.cells[i, list(iter_cells(board.x))] = X_CELL
+        self.cells[i, list(iter_cells(board.o))] = O_CELL
+        for k in range(9):
+            if (board.x_won >> k) & 1:
+                self.status[i, k] = X_WON
+            elif (board.o_won >> k) & 1:
+                self.status[i, k] = O_WON
+            elif (board.drawn >> k) & 1:
+                self.status[i, k] = DRAWN
+            else:
+                self.status[i, k] = OPEN
+        self.turn[i] = X_CELL if board.turn == X else O_CELL
+        self.active[i] = board.active
+        self.finished[i] = board.finished
+        self.winner[i] = EMPTY if board.winner == NO_WINNER else board.winner + 1
+
+    def get_bitboard(self, i: int) -> BitboardGameState:
+        x = o = 0
+        for cell in np.nonzero(self.cells[i] == X_CELL)[0]:
+            x |= 1 << int(cell)
+        for cell in np.nonzero(self.cells[i] == O_CELL)[0]:
+            o |= 1 << int(cell)
+        x_won = o_won = drawn = 0
+        for k in range(9):
+            if self.status[i, k] == X_WON:
+                x_won |= 1 << k
+            elif self.status[i, k] == O_WON:
+                o_won |= 1 << k
+            elif self.status[i, k] == DRAWN:
+                drawn |= 1 << k
+        return BitboardGameState(
+            x=x,
+            o=o,
+            x_won=x_won,
+            o_won=o_won,
+            drawn=drawn,
+            turn=X if self.turn[i] == X_CELL else O,
+            active=int(self.active[i]),
+            finished=bool(self.finished[i]),
+            winner=NO_WINNER if self.winner[i] == EMPTY else int(self.winner[i]) - 1,
+        )
+
+    def to_game_state(self, i: int) -> UltimateTicTacToeGameState:
+        return self.get_bitboard(i).to_game_state()
+
+    def to_game_states(self, indices: Optional[List[int]] = None) -> List[UltimateTicTacToeGameState]:
+        if indices is None:
+            indices = range(self.n)
+        return [self.to_game_state(i) for i in indices]
@@ -0,0 +1,278 @@
+from __future__ import annotations
+from typing import Dict, List, Tuple
+from datamodels.tictactoe import UltimateTicTacToeGameState, SubTicTacToeGame, POSITIONS, STATUS_OFFSET, STATUS_FINISHED
+from datamodels.subboard_table import SUBBOARD_TABLE, TERNARY, WIN_LINES, FULL_SUBBOARD, FINISHED_BIT, WINNER_MASK
+from datamodels.zobrist import CELL_KEYS, SIDE_KEY, ACTIVE_KEYS
+
+# Cell `p` of sub-board `k` lives at bit 9*k + p, in POSITIONS order.
+POSITION_INDEX: Dict[str, int] = {name: i for i, name in enumerate(POSITIONS)}
+
+X = 0
+O = 1
+NO_WINNER = -1
+ANY_CORNER = -1
+PLAYERS: Tuple[str, str] = ('X', 'O')
+PLAYER_INDEX: Dict[str, int] = {'X': X, 'O': O}
+
+# IS_WIN[mask] is True when the 9-bit mask contains a complete line (used for the meta board).
+IS_WIN: Tuple[bool, ...] = tuple(
+    any(mask & line == line for line in WIN_LINES) for mask in range(1 << 9)
+)
+
+# All 81-bit cells belonging to sub-board k.
+SUBBOARD_MASKS: Tuple[int, ...] = tuple(FULL_SUBBOARD << (9 * k) for k in range(9))
+
+# OPEN_CELLS[closed] is every cell of the sub-boards not set in the 9-bit `closed` mask.
+OPEN_CELLS: Tuple[int, ...] = tuple(
+    sum(SUBBOARD_MASKS[k] for k in range(9) if not (closed >> k) & 1)
+    for closed in range(1 << 9)
+)
+
+# CELL_NAMES[9*k + p] is the (corner, position) name pair for that bit.
+CELL_NAMES: Tuple[Tuple[str, str], ...] = tuple(
+    (corner, position) for corner in POSITIONS for position in POSITIONS
+)
+
+
+def iter_cells(mask: int):
+    """Yield the bit index of every set bit in an 81-bit cell mask, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class BitboardGameState:
+    """
+    Bit-packed Ultimate TicTacToe state.
+
+    `x` and `o` hold one bit per cell (81 bits each). `x_won`, `o_won` and
+    `drawn` are 9-bit masks over the sub-boards. `turn` is X or O, `active`
+    is the forced sub-board index or ANY_CORNER, and `winner` is X, O or
+    NO_WINNER.
+    """
+
+    __slots__ = (
+        'x', 'o', 'x_won', 'o_won', 'drawn',
+        'turn', 'active', 'finished', 'winner', 'next_turn_timestamp',
+    )
+
+    def __init__(
+        self,
+        x: int = 0,
+        o: int = 0,
+        x_won: int = 0,
+        o_won: int = 0,
+        drawn: int = 0,
+        turn: int = X,
+        active: int = POSITION_INDEX['center'],
+        finished: bool = False,
+        winner: int = NO_WINNER,
+        next_turn_timestamp: int = 0,
+    ):
+        self.x = x
+        self.o = o
+        self.x_won = x_won
+        self.o_won = o_won
+        self.drawn = drawn
+        self.turn = turn
+        self.active = active
+        self.finished = finished
+        self.winner = winner
+        self.next_turn_timestamp = next_turn_timestamp
+
+    @property
+    def occupied(self) -> int:
+        return self.x | self.o
+
+    @property
+    def closed(self) -> int:
+        """9-bit mask of sub-boards that are won or drawn."""
+        return self.x_won | self.o_won | self.drawn
+
+    def cell(self, corner: int, position: int) -> str:
+        bit = 1 << (9 * corner + position)
+        if self.x & bit:
+            return 'X'
+        if self.o & bit:
+            return 'O'
+        return ''
+
+    def zobrist_hash(self) -> int:
+        """Full Zobrist hash; equal to UltimateTicTacToeGameState.computeHash() for the same position."""
+        value = ACTIVE_KEYS[self.active]
+        for cell in iter_cells(self.x):
+            value ^= CELL_KEYS[X][cell]
+        for cell in iter_cells(self.o):
+            value ^= CELL_KEYS[O][cell]
+        if self.turn == O:
+            value ^= SIDE_KEY
+        return value
+
+    def legal_move_mask(self) -> int:
+        """81-bit mask of every cell the side to move may play."""
+        if self.finished:
+            return 0
+        allowed = OPEN_CELLS[self.x_won | self.o_won | self.drawn]
+        if self.active != ANY_CORNER:
+            allowed &= SUBBOARD_MASKS[self.active]
+        return allowed & ~(self.x | self.o)
+
+    def legal_moves(self) -> List[Tuple[int, int]]:
+        """Legal moves as (corner, position) index pairs."""
+        return [divmod(cell, 9) for cell in iter_cells(self.legal_move_mask())]
+
+    def check_move(self, player: str, corner: str, position: str) -> Tuple[int, int]:
+        """
+        Validate a move using the same rules and messages as TicTacToeService.
+
+        Returns:
+            The (corner, position) indices of the move
+
+        Raises:
+            ValueError: If the move is not legal
+        """
+        if self.finished:
+            raise ValueError("The game is already finished!")
+
+        if PLAYERS[self.turn] != player:
+            raise ValueError("It's not your turn!")
+
+        corner_index = POSITION_INDEX.get(corner)
+        if corner_index is None:
+            raise ValueError(f"Invalid corner: {corner}")
+        position_index = POSITION_INDEX.get(position)
+        if position_index is None:
+            raise ValueError(f"Invalid position: {position}")
+
+        if self.active != ANY_CORNER and self.active != corner_index:
+            raise ValueError(f"You must play in the {POSITIONS[self.active]} corner!")
+
+        if (self.closed >> corner_index) & 1:
+            raise ValueError(f"The {corner} subgame is already finished!")
+
+        if (self.occupied >> (9 * corner_index + position_index)) & 1:
+            raise ValueError(f"The position {position} in {corner} is already taken!")
+
+        return corner_index, position_index
+
+    def apply_move(self, corner: int, position: int) -> None:
+        """Play the side to move at (corner, position). The move is assumed legal."""
+        shift = 9 * corner
+        bit = 1 << (shift + position)
+        corner_bit = 1 << corner
+
+        if self.turn == X:
+            self.x |= bit
+        else:
+            self.o |= bit
+
+        # one outcome table lookup for the sub-board that was played in
+        entry = SUBBOARD_TABLE[TERNARY[(self.x >> shift) & FULL_SUBBOARD] + 2 * TERNARY[(self.o >> shift) & FULL_SUBBOARD]]
+        if entry & FINISHED_BIT:
+            winner = entry & WINNER_MASK
+            if winner == 1:
+                self.x_won |= corner_bit
+            elif winner == 2:
+                self.o_won |= corner_bit
+            else:
+                self.drawn |= corner_bit
+        closed = self.x_won | self.o_won | self.drawn
+
+        self.active = ANY_CORNER if (closed >> position) & 1 else position
+        self.turn ^= 1
+
+        if IS_WIN[self.x_won]:
+            self.finished = True
+            self.winner = X
+        elif IS_WIN[self.o_won]:
+            self.finished = True
+            self.winner = O
+        elif closed == FULL_SUBBOARD:
+            self.finished = True
+            self.winner = NO_WINNER
+
+    def play(self, player: str, corner: str, position: str) -> Tuple[int, int]:
+        """Validate and apply a move given by name. Returns the move indices."""
+        corner_index, position_index = self.check_move(player, corner, position)
+        self.apply_move(corner_index, position_index)
+        return corner_index, position_index
+
+    def copy(self) -> BitboardGameState:
+        return BitboardGameState(
+            self.x, self.o, self.x_won, self.o_won, self.drawn,
+            self.turn, self.active, self.finished, self.winner,
+            self.next_turn_timestamp,
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, BitboardGameState):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self) -> str:
+        return (
+            f"BitboardGameState(x={self.x:#x}, o={self.o:#x}, turn={PLAYERS[self.turn]}, "
+            f"active={self.active}, finished={self.finished}, winner={self.winner})"
+        )
+
+    # ===== Conversion to/from the dataclass model =====
+
+    @classmethod
+    def from_game_state(cls, state: UltimateTicTacToeGameState) -> BitboardGameState:
+        # read the compact state buffer directly rather than through the subgame views
+        buffer = state.buffer
+        x = o = x_won = o_won = drawn = 0
+        for cell in range(81):
+            value = buffer[cell]
+            if value == 1:
+                x |= 1 << cell
+            elif value == 2:
+                o |= 1 << cell
+        for k in range(9):
+            status = buffer[STATUS_OFFSET + k]
+            if status & WINNER_MASK == 1:
+                x_won |= 1 << k
+            elif status & WINNER_MASK == 2:
+                o_won |= 1 << k
+            elif status & STATUS_FINISHED:
+                drawn |= 1 << k
+
+        return cls(
+            x=x,
+            o=o,
+            x_won=x_won,
+            o_won=o_won,
+            drawn=drawn,
+            turn=PLAYER_INDEX[state.turn],
+            active=POSITION_INDEX[state.activeCorner] if state.activeCorner else ANY_CORNER,
+            finished=state.finished,
+            winner=PLAYER_INDEX[state.winner] if state.winner else NO_WINNER,
+            next_turn_timestamp=state.next_turn_timestamp,
+        )
+
+    def to_subgame(self, corner: int) -> SubTicTacToeGame:
+        corner_bit = 1 << corner
+        if self.x_won & corner_bit:
+            winner = 'X'
+        elif self.o_won & corner_bit:
+            winner = 'O'
+        else:
+            winner = ''
+        cells = {position: self.cell(corner, p) for p, position in enumerate(POSITIONS)}
+        return SubTicTacToeGame(
+            finished=bool(self.closed & corner_bit),
+            winner=winner,
+            **cells,
+        )
+
+    def to_game_state(self) -> UltimateTicTacToeGameState:
+        subgames = {corner: self.to_subgame(k) for k, corner in enumerate(POSITIONS)}
+        return UltimateTicTacToeGameState(
+            turn=PLAYERS[self.turn],
+            finished=self.finished,
+            winner=PLAYERS[self.winner] if self.winner != NO_WINNER else '',
+            activeCorner=POSITIONS[self.active] if self.active != ANY_CORNER else '',
+            next_turn_timestamp=self.next_turn_timestamp,
+            **subgames,
+        )
@@ -0,0 +1,207 @@
+"""
+Versioned binary encoding of a whole game (current state, moves and checkpoints).
+
+Version 1 layout (little endian):
+    header      MAGIC (4 bytes), version (uint8)
+    state       current state (STATE_BYTES, below)
+    moves       count (varint), then per move:
+                    cell (uint8, 9*corner + position) | 0x80 if played by O
+                    timestamp delta from the previous move (zigzag varint)
+    checkpoints count (varint), then per checkpoint: move index (varint), state
+
+A state packs 2-bit values four to a byte: the 81 cells, the 9 subgame
+winners, the side to move and the game winner (0 none, 1 X, 2 O). A uint16
+follows with the 9 subgame finished flags (bits 0-8), the game finished
+flag (bit 9) and the active corner (bits 10-13, NO_ACTIVE_CORNER if free).
+Zobrist hashes are recomputed on decode.
+"""
+from __future__ import annotations
+import struct
+from typing import Callable, Dict, List, Tuple
+from datamodels.tictactoe import (
+    UltimateTicTacToe, UltimateTicTacToeGameState, Move, POSITIONS, POSITION_INDEX,
+    STATUS_OFFSET, TURN_BYTE, FINISHED_BYTE, WINNER_BYTE, ACTIVE_BYTE, STATE_SIZE, STATUS_FINISHED,
+)
+from datamodels.subboard_table import WINNER_MASK
+
+MAGIC = b'UTTG'
+VERSION = 1
+HEADER_BYTES = len(MAGIC) + 1
+
+PACKED_VALUES = 92                  # 81 cells + 9 subgame winners + turn + winner
+PACKED_BYTES = PACKED_VALUES // 4
+FLAGS = struct.Struct('<H')
+STATE_BYTES = PACKED_BYTES + FLAGS.size
+# every version starts with the current state, so this much of a game decodes it alone
+CURRENT_STATE_BYTES = HEADER_BYTES + STATE_BYTES
+
+GAME_FINISHED_FLAG = 1 << 9
+ACTIVE_SHIFT = 10
+PLAYER_O_FLAG = 0x80
+
+# UNPACK[b] is the four 2-bit values of byte b, lowest bits first
+UNPACK: Tuple[bytes, ...] = tuple(bytes((b & 3, (b >> 2) & 3, (b >> 4) & 3, (b >> 6) & 3)) for b in range(256))
+
+
+def is_encoded(data: bytes) -> bool:
+    """True if data starts with the binary game header."""
+    return data[:len(MAGIC)] == MAGIC
+
+
+# ===== States =====
+
+def encode_state(state: UltimateTicTacToeGameState) -> bytes:
+    buffer = state.buffer
+    values = bytearray(buffer[:81])
+    values.extend(status & WINNER_MASK for status in buffer[STATUS_OFFSET:STATUS_OFFSET + 9])
+    values.append(buffer[TURN_BYTE])
+    values.append(buffer[WINNER_BYTE])
+
+    flags = buffer[ACTIVE_BYTE] << ACTIVE_SHIFT
+    for k in range(9):
+        if buffer[STATUS_OFFSET + k] & STATUS_FINISHED:
+            flags |= 1 << k
+    if buffer[FINISHED_BYTE]:
+        flags |= GAME_FINISHED_FLAG
+
+    packed = bytes(
+        values[i] | (values[i + 1] << 2) | (values[i + 2] << 4) | (values[i + 3] << 6)
+        for i in range(0, PACKED_VALUES, 4)
+    )
+    return packed + FLAGS.pack(flags)
+
+
+def decode_state(data: bytes, offset: int = 0) -> UltimateTicTacToeGameState:
+    values = b''.join([UNPACK[b] for b in data[offset:offset + PACKED_BYTES]])
+    (flags,) = FLAGS.unpack_from(data, offset + PACKED_BYTES)
+
+    buffer = bytearray(STATE_SIZE)
+    buffer[:81] = values[:81]
+    for k in range(9):
+        buffer[STATUS_OFFSET + k] = values[81 + k] | (STATUS_FINISHED if (flags >> k) & 1 else 0)
+    buffer[TURN_BYTE] = values[90]
+    buffer[FINISHED_BYTE] = 1 if flags & GAME_FINISHED_FLAG else 0
+    buffer[WINNER_BYTE] = values[91]
+    buffer[ACTIVE_BYTE] = flags >> ACTIVE_SHIFT
+    return UltimateTicTacToeGameState.from_buffer(buffer)
+
+
+# ===== Varints =====
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data: bytes, offset: int) -> Tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+def _zigzag(value: int) -> int:
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def _unzigzag(value: int) -> int:
+    return value >> 1 if not value & 1 else -((value + 1) >> 1)
+
+
+# ===== Games =====
+
+def encode_game(game: UltimateTicTacToe) -> bytes:
+    """Encode a game in the current format version."""
+    out = bytearray(MAGIC)
+    out.append(VERSION)
+    out += encode_state(game.current_game)
+
+    _write_varint(out, len(game.moves))
+    previous = 0
+    for move in game.moves:
+        cell = 9 * POSITION_INDEX[move.corner] + POSITION_INDEX[move.position]
+        out.append(cell | (PLAYER_O_FLAG if move.player == 'O' else 0))
+        _write_varint(out, _zigzag(move.timestamp - previous))
+        previous = move.timestamp
+
+    _write_varint(out, len(game.checkpoints))
+    for index in sorted(game.checkpoints):
+        _write_varint(out, index)
+        out += encode_state(game.checkpoints[index])
+    return bytes(out)
+
+
+def _decode_v1(data: bytes, offset: int) -> UltimateTicTacToe:
+    current_game = decode_state(data, offset)
+    offset += STATE_BYTES
+
+    count, offset = _read_varint(data, offset)
+    moves: List[Move] = []
+    timestamp = 0
+    for _ in range(count):
+        byte = data[offset]
+        cell = byte & ~PLAYER_O_FLAG
+        delta, offset = _read_varint(data, offset + 1)
+        timestamp += _unzigzag(delta)
+        moves.append(Move(
+            player='O' if byte & PLAYER_O_FLAG else 'X',
+            corner=POSITIONS[cell // 9],
+            position=POSITIONS[cell % 9],
+            timestamp=timestamp,
+        ))
+
+    count, offset = _read_varint(data, offset)
+    checkpoints = {}
+    for _ in range(count):
+        index, offset = _read_varint(data, offset)
+        checkpoints[index] = decode_state(data, offset)
+        offset += STATE_BYTES
+
+    return UltimateTicTacToe(current_game=current_game, moves=moves, checkpoints=checkpoints)
+
+
+DECODERS: Dict[int, Callable[[bytes, int], UltimateTicTacToe]] = {
+    1: _decode_v1,
+}
+
+
+def decode_game(data: bytes) -> UltimateTicTacToe:
+    """
+    Decode a game written by any supported format version.
+
+    Raises:
+        ValueError: If the data is not an encoded game, is truncated or has an unknown version
+    """
+    if not is_encoded(data) or len(data) <= len(MAGIC):
+        raise ValueError("Data is not a binary encoded game")
+    version = data[len(MAGIC)]
+    decoder = DECODERS.get(version)
+    if decoder is None:
+        raise ValueError(f"Unsupported game encoding version {version}")
+    try:
+        return decoder(data, HEADER_BYTES)
+    except (IndexError, struct.error) as e:
+        raise ValueError(f"Truncated binary game: {e}") from e
+
+
+def decode_current_state(data: bytes) -> UltimateTicTacToeGameState:
+    """
+    Decode only the current state from the first CURRENT_STATE_BYTES of an
+    encoded game, without the moves and checkpoints.
+    
+    Raises:
+        ValueError: If the data is not an encoded game, is truncated or has an unknown version
+    """
+    if not is_encoded(data) or len(data) < CURRENT_STATE_BYTES:
+        raise ValueError("Data is not a binary encoded game")
+    version = data[len(MAGIC)]
+    if version not in DECODERS:
+        raise ValueError(f"Unsupported game encoding version {version}")
+    return decode_state(data, HEADER_BYTES)
@@ -0,0 +1,113 @@
+from __future__ import annotations
+from array import array
+from typing import NamedTuple, Tuple
+
+# A 3x3 board is indexed by its base-3 encoding: cell p (in POSITIONS order)
+# contributes CELL_VALUE[value] * 3**p, so there are 3**9 = 19683 entries.
+CELL_VALUE = {'': 0, 'X': 1, 'O': 2}
+WINNER_NAMES: Tuple[str, str, str] = ('', 'X', 'O')
+POW3: Tuple[int, ...] = tuple(3 ** p for p in range(9))
+TABLE_SIZE = 3 ** 9
+
+FULL_SUBBOARD = 0x1FF
+
+WIN_LINES: Tuple[int, ...] = (
+    0b000000111,  # top row
+    0b000111000,  # middle row
+    0b111000000,  # bottom row
+    0b001001001,  # left column
+    0b010010010,  # middle column
+    0b100100100,  # right column
+    0b100010001,  # topleft -> bottomright
+    0b001010100,  # topright -> bottomleft
+)
+
+# TERNARY[mask] is the base-3 weight of a 9-bit cell mask; a board's index
+# is TERNARY[x_cells] + 2 * TERNARY[o_cells].
+TERNARY: Tuple[int, ...] = tuple(
+    sum(POW3[p] for p in range(9) if (mask >> p) & 1) for mask in range(1 << 9)
+)
+
+# Packed table entry layout
+WINNER_MASK = 0b11      # 0 none, 1 X, 2 O
+FINISHED_BIT = 1 << 2
+DRAW_BIT = 1 << 3
+OPEN_SHIFT = 4          # 9-bit mask of playable cells (0 once finished)
+X_THREATS_SHIFT = 13    # 9-bit mask of open cells where X would complete a line
+O_THREATS_SHIFT = 22    # same for O
+
+
+class SubBoardOutcome(NamedTuple):
+    winner: str
+    finished: bool
+    draw: bool
+    open_cells: int
+    x_threats: int
+    o_threats: int
+
+
+def _first_line(mask: int) -> int:
+    for i, line in enumerate(WIN_LINES):
+        if mask & line == line:
+            return i
+    return len(WIN_LINES)
+
+
+def _completing_cells(mask: int) -> int:
+    cells = 0
+    for line in WIN_LINES:
+        missing = line & ~mask
+        if missing and missing & (missing - 1) == 0:
+            cells |= missing
+    return cells
+
+
+def _build_table() -> array:
+    first_line = [_first_line(mask) for mask in range(1 << 9)]
+    completing = [_completing_cells(mask) for mask in range(1 << 9)]
+    no_line = len(WIN_LINES)
+
+    table = array('I', bytes(4 * TABLE_SIZE))
+    for x in range(1 << 9):
+        free = ~x & FULL_SUBBOARD
+        o = free
+        while True:
+            index = TERNARY[x] + 2 * TERNARY[o]
+            empty = free & ~o
+            # same precedence as scanning the lines in order for either player
+            x_line, o_line = first_line[x], first_line[o]
+            if x_line < no_line or o_line < no_line:
+                entry = (1 if x_line < o_line else 2) | FINISHED_BIT
+            elif not empty:
+                entry = FINISHED_BIT | DRAW_BIT
+            else:
+                entry = (
+                    (empty << OPEN_SHIFT)
+                    | ((completing[x] & empty) << X_THREATS_SHIFT)
+                    | ((completing[o] & empty) << O_THREATS_SHIFT)
+                )
+            table[index] = entry
+            if o == 0:
+                break
+            o = (o - 1) & free
+    return table
+
+
+SUBBOARD_TABLE = _build_table()
+
+
+def index_from_masks(x: int, o: int) -> int:
+    return TERNARY[x] + 2 * TERNARY[o]
+
+
+def describe(index: int) -> SubBoardOutcome:
+    """Unpack the table entry for a board index."""
+    entry = SUBBOARD_TABLE[index]
+    return SubBoardOutcome(
+        winner=WINNER_NAMES[entry & WINNER_MASK],
+        finished=bool(entry & FINISHED_BIT),
+        draw=bool(entry & DRAW_BIT),
+        open_cells=(entry >> OPEN_SHIFT) & FULL_SUBBOARD,
+        x_threats=(entry >> X_THREATS_SHIFT) & FULL_SUBBOARD,
+        o_threats=(entry >> O_THREATS_SHIFT) & FULL_SUBBOARD,
+    )
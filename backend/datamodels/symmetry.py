@@ -0,0 +1,134 @@
+"""
+Symmetry canonicalization for Ultimate TicTacToe positions.
+
+The 8 rotations and reflections of the square act on the meta-board and on
+every sub-board at once: transform t moves cell (corner, position) to
+(PERMUTATIONS[t][corner], PERMUTATIONS[t][position]). A position's canonical
+form is the image with the smallest (x, o, active) key, so all eight
+equivalents canonicalize to the same board.
+"""
+from __future__ import annotations
+from typing import Tuple
+from datamodels.tictactoe import UltimateTicTacToeGameState
+from datamodels.bitboard import BitboardGameState, ANY_CORNER
+from datamodels.subboard_table import FULL_SUBBOARD
+
+IDENTITY = 0
+TRANSFORM_NAMES: Tuple[str, ...] = (
+    'identity', 'rotate90', 'rotate180', 'rotate270',
+    'flip_horizontal', 'flip_vertical', 'transpose', 'anti_transpose',
+)
+
+
+def _image(transform: int, row: int, col: int) -> Tuple[int, int]:
+    return (
+        (row, col),
+        (col, 2 - row),         # 90 degrees clockwise
+        (2 - row, 2 - col),
+        (2 - col, row),
+        (row, 2 - col),         # mirror left/right
+        (2 - row, col),         # mirror top/bottom
+        (col, row),             # main diagonal
+        (2 - col, 2 - row),     # anti-diagonal
+    )[transform]
+
+
+# PERMUTATIONS[t][p] is where position p (POSITIONS order) moves under transform t.
+PERMUTATIONS: Tuple[Tuple[int, ...], ...] = tuple(
+    tuple(3 * r + c for r, c in (_image(t, *divmod(p, 3)) for p in range(9)))
+    for t in range(8)
+)
+
+# INVERSE[t] undoes transform t.
+INVERSE: Tuple[int, ...] = tuple(
+    next(u for u in range(8) if all(PERMUTATIONS[u][PERMUTATIONS[t][p]] == p for p in range(9)))
+    for t in range(8)
+)
+
+# MASK_TABLES[t][mask] permutes the bits of a 9-bit mask (a sub-board or the meta-board).
+MASK_TABLES: Tuple[Tuple[int, ...], ...] = tuple(
+    tuple(
+        sum(1 << PERMUTATIONS[t][p] for p in range(9) if (mask >> p) & 1)
+        for mask in range(1 << 9)
+    )
+    for t in range(8)
+)
+
+# CELL_TABLES[t][cell] maps an 81-cell index 9*corner + position.
+CELL_TABLES: Tuple[Tuple[int, ...], ...] = tuple(
+    tuple(9 * PERMUTATIONS[t][cell // 9] + PERMUTATIONS[t][cell % 9] for cell in range(81))
+    for t in range(8)
+)
+
+
+def transform_cells(mask: int, transform: int) -> int:
+    """Apply a transform to an 81-bit cell mask, one table lookup per sub-board."""
+    table = MASK_TABLES[transform]
+    permutation = PERMUTATIONS[transform]
+    result = 0
+    for k in range(9):
+        chunk = (mask >> (9 * k)) & FULL_SUBBOARD
+        if chunk:
+            result |= table[chunk] << (9 * permutation[k])
+    return result
+
+
+def transform_cell(cell: int, transform: int) -> int:
+    return CELL_TABLES[transform][cell]
+
+
+def transform_bitboard(board: BitboardGameState, transform: int) -> BitboardGameState:
+    table = MASK_TABLES[transform]
+    return BitboardGameState(
+        x=transform_cells(board.x, transform),
+        o=transform_cells(board.o, transform),
+        x_won=table[board.x_won],
+        o_won=table[board.o_won],
+        drawn=table[board.drawn],
+        turn=board.turn,
+        active=PERMUTATIONS[transform][board.active] if board.active != ANY_CORNER else ANY_CORNER,
+        finished=board.finished,
+        winner=board.winner,
+        next_turn_timestamp=board.next_turn_timestamp,
+    )
+
+
+def canonicalize_bitboard(board: BitboardGameState) -> Tuple[BitboardGameState, int]:
+    """
+    Returns:
+        The canonical image of the board and the transform that produces it
+        (the lowest-numbered one when several do)
+    """
+    best_key = None
+    best_transform = IDENTITY
+    for transform in range(8):
+        x = transform_cells(board.x, transform)
+        o = transform_cells(board.o, transform)
+        active = PERMUTATIONS[transform][board.active] if board.active != ANY_CORNER else ANY_CORNER
+        key = (x, o, active)
+        if best_key is None or key < best_key:
+            best_key = key
+            best_transform = transform
+    return transform_bitboard(board, best_transform), best_transform
+
+
+def transform_state(state: UltimateTicTacToeGameState, transform: int) -> UltimateTicTacToeGameState:
+    return transform_bitboard(BitboardGameState.from_game_state(state), transform).to_game_state()
+
+
+def canonicalize(state: UltimateTicTacToeGameState) -> Tuple[UltimateTicTacToeGameState, int]:
+    """
+    Map a game state to the canonical representative of its symmetry class.
+
+    Returns:
+        The canonical state and the transform used; apply INVERSE[transform]
+        to map positions or moves in the canonical state back to the original
+    """
+    board, transform = canonicalize_bitboard(BitboardGameState.from_game_state(state))
+    return board.to_game_state(), transform
+
+
+def canonical_hash(state: UltimateTicTacToeGameState) -> int:
+    """Zobrist hash shared by every position in the state's symmetry class."""
+    board, _ = canonicalize_bitboard(BitboardGameState.from_game_state(state))
+    return board.zobrist_hash()
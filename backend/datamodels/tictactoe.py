@@ -1,8 +1,37 @@
 from __future__ import annotations
-from dataclasses import dataclass, asdict
-from typing import Dict, List
-
-@dataclass
+from dataclasses import dataclass, asdict, field
+from typing import Any, Dict, List, Optional
+from datamodels.subboard_table import SUBBOARD_TABLE, CELL_VALUE, POW3, WINNER_NAMES, WINNER_MASK, FINISHED_BIT
+from datamodels.zobrist import CELL_KEYS, SIDE_KEY, ACTIVE_KEYS, format_hash, parse_hash
+
+POSITIONS = [
+    'topleft', 'topmiddle', 'topright',
+    'middleleft', 'center', 'middleright',
+    'bottomleft', 'bottommiddle', 'bottomright',
+]
+
+WINNING_COMBINATIONS = [
+    ['topleft', 'topmiddle', 'topright'],
+    ['middleleft', 'center', 'middleright'],
+    ['bottomleft', 'bottommiddle', 'bottomright'],
+    ['topleft', 'middleleft', 'bottomleft'],
+    ['topmiddle', 'center', 'bottommiddle'],
+    ['topright', 'middleright', 'bottomright'],
+    ['topleft', 'center', 'bottomright'],
+    ['topright', 'center', 'bottomleft'],
+]
+
+# A full state snapshot is kept every CHECKPOINT_INTERVAL moves so any
+# historical state can be rebuilt by replaying at most that many moves
+CHECKPOINT_INTERVAL = 10
+
+# For each position, the winning lines that pass through it (2 to 4 lines)
+LINES_THROUGH = {
+    pos: [combo for combo in WINNING_COMBINATIONS if pos in combo]
+    for pos in POSITIONS
+}
+
+@dataclass(slots=True)
 class SubTicTacToeGame:
     finished: bool
     winner: str  # '', 'X', or 'O'
@@ -17,24 +46,12 @@ class SubTicTacToeGame:
     bottommiddle: str
     bottomright: str
 
-    def getWinner(self) -> str:
-        winning_combinations = [
-            ['topleft', 'topmiddle', 'topright'],
-            ['middleleft', 'center', 'middleright'],
-            ['bottomleft', 'bottommiddle', 'bottomright'],
-            ['topleft', 'middleleft', 'bottomleft'],
-            ['topmiddle', 'center', 'bottommiddle'],
-            ['topright', 'middleright', 'bottomright'],
-            ['topleft', 'center', 'bottomright'],
-            ['topright', 'center', 'bottomleft'],
-        ]
-
-        for combo in winning_combinations:
-            values = [getattr(self, pos) for pos in combo]
-            if values[0] and all(v == values[0] for v in values):
-                return values[0]
+    def getTableIndex(self) -> int:
+        # base-3 encoding of the cells, used to look up SUBBOARD_TABLE
+        return sum(CELL_VALUE[getattr(self, pos)] * POW3[i] for i, pos in enumerate(POSITIONS))
 
-        return ''
+    def getWinner(self) -> str:
+        return WINNER_NAMES[SUBBOARD_TABLE[self.getTableIndex()] & WINNER_MASK]
 
     def to_dict(self) -> Dict:
         return asdict(self)
@@ -44,28 +61,10 @@ class SubTicTacToeGame:
         return cls(**data)
 
     def updateSelf(self) -> None:
-        # Check for a win
-        winner = self.getWinner()
-        if winner:
-            self.winner = winner
-            self.finished = True
-            return
-
-        # Check for draw (all cells filled, no winner)
-        cells = [
-            self.topleft, self.topmiddle, self.topright,
-            self.middleleft, self.center, self.middleright,
-            self.bottomleft, self.bottommiddle, self.bottomright,
-        ]
-
-        if all(cell != '' for cell in cells):
-            self.winner = ''
-            self.finished = True
-            return
-
-        # Otherwise, game is still in progress
-        self.winner = ''
-        self.finished = False
+        # Win, draw and in-progress status for every configuration are precomputed
+        entry = SUBBOARD_TABLE[self.getTableIndex()]
+        self.winner = WINNER_NAMES[entry & WINNER_MASK]
+        self.finished = bool(entry & FINISHED_BIT)
 
     def copy(self) -> SubTicTacToeGame:
         return SubTicTacToeGame(
@@ -82,45 +81,266 @@ class SubTicTacToeGame:
             bottomright=self.bottomright,
         )
 
-@dataclass
-class UltimateTicTacToeGameState:
-    turn: str          # 'X' or 'O'
-    finished: bool
-    winner: str        # '', 'X', or 'O'
-    activeCorner: str  # '', or one of the 9 board names
-
-    topleft: SubTicTacToeGame
-    topmiddle: SubTicTacToeGame
-    topright: SubTicTacToeGame
-    middleleft: SubTicTacToeGame
-    center: SubTicTacToeGame
-    middleright: SubTicTacToeGame
-    bottomleft: SubTicTacToeGame
-    bottommiddle: SubTicTacToeGame
-    bottomright: SubTicTacToeGame
-    next_turn_timestamp: int = 0 # for history tracking of turn times
+# Compact state layout: one bytearray per game state.
+#   bytes 0-80   cells, 9*corner + position in POSITIONS order (0 empty, 1 X, 2 O)
+#   bytes 81-89  subgame status, winner (0 none, 1 X, 2 O) | STATUS_FINISHED
+#   bytes 90-93  turn (1 X, 2 O), finished, winner, active corner (NO_ACTIVE_CORNER if free)
+STATUS_OFFSET = 81
+TURN_BYTE = 90
+FINISHED_BYTE = 91
+WINNER_BYTE = 92
+ACTIVE_BYTE = 93
+STATE_SIZE = 94
+
+STATUS_FINISHED = 4
+NO_ACTIVE_CORNER = 9
+CELL_NAMES_BY_VALUE = ('', 'X', 'O')
+POSITION_INDEX = {pos: i for i, pos in enumerate(POSITIONS)}
+
+
+class _CellField:
+    """A named cell of a SubBoardView, read from and written to the shared buffer."""
+
+    __slots__ = ('position',)
+
+    def __init__(self, position: int):
+        self.position = position
+
+    def __get__(self, view, owner=None):
+        if view is None:
+            return self
+        return CELL_NAMES_BY_VALUE[view.buffer[view.offset + self.position]]
+
+    def __set__(self, view, value: str) -> None:
+        view.buffer[view.offset + self.position] = CELL_VALUE[value]
+
+
+class SubBoardView:
+    """
+    Live view of one subgame inside an UltimateTicTacToeGameState buffer.
+
+    Exposes the same attributes and methods as SubTicTacToeGame, so code that
+    does `getattr(state, corner).topleft = 'X'` keeps working. Writes go
+    straight to the state's buffer.
+    """
+
+    __slots__ = ('buffer', 'offset', 'index')
+
+    topleft = _CellField(0)
+    topmiddle = _CellField(1)
+    topright = _CellField(2)
+    middleleft = _CellField(3)
+    center = _CellField(4)
+    middleright = _CellField(5)
+    bottomleft = _CellField(6)
+    bottommiddle = _CellField(7)
+    bottomright = _CellField(8)
+
+    def __init__(self, buffer: bytearray, index: int):
+        self.buffer = buffer
+        self.offset = 9 * index
+        self.index = index
+
+    @property
+    def finished(self) -> bool:
+        return bool(self.buffer[STATUS_OFFSET + self.index] & STATUS_FINISHED)
+
+    @finished.setter
+    def finished(self, value: bool) -> None:
+        status = self.buffer[STATUS_OFFSET + self.index] & ~STATUS_FINISHED
+        self.buffer[STATUS_OFFSET + self.index] = status | (STATUS_FINISHED if value else 0)
+
+    @property
+    def winner(self) -> str:
+        return CELL_NAMES_BY_VALUE[self.buffer[STATUS_OFFSET + self.index] & WINNER_MASK]
+
+    @winner.setter
+    def winner(self, value: str) -> None:
+        status = self.buffer[STATUS_OFFSET + self.index] & STATUS_FINISHED
+        self.buffer[STATUS_OFFSET + self.index] = status | CELL_VALUE[value]
+
+    def getTableIndex(self) -> int:
+        buffer, offset = self.buffer, self.offset
+        return sum(buffer[offset + p] * POW3[p] for p in range(9))
 
     def getWinner(self) -> str:
-        winning_combinations = [
-            ['topleft', 'topmiddle', 'topright'],
-            ['middleleft', 'center', 'middleright'],
-            ['bottomleft', 'bottommiddle', 'bottomright'],
-            ['topleft', 'middleleft', 'bottomleft'],
-            ['topmiddle', 'center', 'bottommiddle'],
-            ['topright', 'middleright', 'bottomright'],
-            ['topleft', 'center', 'bottomright'],
-            ['topright', 'center', 'bottomleft'],
-        ]
+        return WINNER_NAMES[SUBBOARD_TABLE[self.getTableIndex()] & WINNER_MASK]
+
+    def updateSelf(self) -> None:
+        # Win, draw and in-progress status for every configuration are precomputed
+        entry = SUBBOARD_TABLE[self.getTableIndex()]
+        self.buffer[STATUS_OFFSET + self.index] = (entry & WINNER_MASK) | (STATUS_FINISHED if entry & FINISHED_BIT else 0)
+
+    def to_dict(self) -> Dict:
+        data = {'finished': self.finished, 'winner': self.winner}
+        for pos in POSITIONS:
+            data[pos] = getattr(self, pos)
+        return data
+
+    def copy(self) -> SubTicTacToeGame:
+        # a detached subgame, no longer tied to the state's buffer
+        return SubTicTacToeGame(**self.to_dict())
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, (SubBoardView, SubTicTacToeGame)):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        return f"SubBoardView({POSITIONS[self.index]}, {self.to_dict()})"
+
 
-        for combo in winning_combinations:
-            values = [getattr(self, pos).winner for pos in combo]
-            if values[0] and all(v == values[0] for v in values):
-                return values[0]
+class _SubBoardField:
+    """State attribute for one subgame: reads return a SubBoardView, writes copy the subgame in."""
 
-        return ''
+    __slots__ = ('index',)
+
+    def __init__(self, index: int):
+        self.index = index
+
+    def __get__(self, state, owner=None):
+        if state is None:
+            return self
+        return SubBoardView(state.buffer, self.index)
+
+    def __set__(self, state, subgame) -> None:
+        offset = 9 * self.index
+        for p, pos in enumerate(POSITIONS):
+            state.buffer[offset + p] = CELL_VALUE[getattr(subgame, pos)]
+        state.buffer[STATUS_OFFSET + self.index] = (
+            CELL_VALUE[subgame.winner] | (STATUS_FINISHED if subgame.finished else 0)
+        )
+
+
+class UltimateTicTacToeGameState:
+    """
+    Full game position packed into a single STATE_SIZE-byte bytearray.
+
+    The constructor, attribute names and methods match the former dataclass:
+    turn, finished, winner and activeCorner are properties, and each subgame
+    attribute (topleft ... bottomright) returns a SubBoardView into the buffer.
+    copy() is one buffer copy.
+    """
+
+    __slots__ = ('buffer', 'next_turn_timestamp', 'zobrist_hash')
+
+    topleft = _SubBoardField(0)
+    topmiddle = _SubBoardField(1)
+    topright = _SubBoardField(2)
+    middleleft = _SubBoardField(3)
+    center = _SubBoardField(4)
+    middleright = _SubBoardField(5)
+    bottomleft = _SubBoardField(6)
+    bottommiddle = _SubBoardField(7)
+    bottomright = _SubBoardField(8)
+
+    def __init__(
+        self,
+        turn: str,
+        finished: bool,
+        winner: str,
+        activeCorner: str,
+        topleft: SubTicTacToeGame,
+        topmiddle: SubTicTacToeGame,
+        topright: SubTicTacToeGame,
+        middleleft: SubTicTacToeGame,
+        center: SubTicTacToeGame,
+        middleright: SubTicTacToeGame,
+        bottomleft: SubTicTacToeGame,
+        bottommiddle: SubTicTacToeGame,
+        bottomright: SubTicTacToeGame,
+        next_turn_timestamp: int = 0, # for history tracking of turn times
+        zobrist_hash: Optional[int] = None, # position key, computed on creation if not given
+    ):
+        self.buffer = bytearray(STATE_SIZE)
+        self.turn = turn
+        self.finished = finished
+        self.winner = winner
+        self.activeCorner = activeCorner
+        self.topleft = topleft
+        self.topmiddle = topmiddle
+        self.topright = topright
+        self.middleleft = middleleft
+        self.center = center
+        self.middleright = middleright
+        self.bottomleft = bottomleft
+        self.bottommiddle = bottommiddle
+        self.bottomright = bottomright
+        self.next_turn_timestamp = next_turn_timestamp
+        self.zobrist_hash = zobrist_hash if zobrist_hash is not None else self.computeHash()
+
+    @classmethod
+    def from_buffer(cls, buffer: bytearray, next_turn_timestamp: int = 0, zobrist_hash: Optional[int] = None) -> UltimateTicTacToeGameState:
+        """Wrap an existing STATE_SIZE buffer (not copied)."""
+        state = cls.__new__(cls)
+        state.buffer = buffer
+        state.next_turn_timestamp = next_turn_timestamp
+        state.zobrist_hash = zobrist_hash if zobrist_hash is not None else state.computeHash()
+        return state
+
+    @property
+    def turn(self) -> str:  # 'X' or 'O'
+        return CELL_NAMES_BY_VALUE[self.buffer[TURN_BYTE]]
+
+    @turn.setter
+    def turn(self, value: str) -> None:
+        self.buffer[TURN_BYTE] = CELL_VALUE[value]
+
+    @property
+    def finished(self) -> bool:
+        return bool(self.buffer[FINISHED_BYTE])
+
+    @finished.setter
+    def finished(self, value: bool) -> None:
+        self.buffer[FINISHED_BYTE] = 1 if value else 0
+
+    @property
+    def winner(self) -> str:  # '', 'X', or 'O'
+        return CELL_NAMES_BY_VALUE[self.buffer[WINNER_BYTE]]
+
+    @winner.setter
+    def winner(self, value: str) -> None:
+        self.buffer[WINNER_BYTE] = CELL_VALUE[value]
+
+    @property
+    def activeCorner(self) -> str:  # '', or one of the 9 board names
+        active = self.buffer[ACTIVE_BYTE]
+        return POSITIONS[active] if active != NO_ACTIVE_CORNER else ''
+
+    @activeCorner.setter
+    def activeCorner(self, value: str) -> None:
+        self.buffer[ACTIVE_BYTE] = POSITION_INDEX[value] if value else NO_ACTIVE_CORNER
+
+    def computeHash(self) -> int:
+        # Full 64-bit Zobrist hash of the cells, side to move and activeCorner
+        buffer = self.buffer
+        value = 0
+        for cell in range(81):
+            if buffer[cell]:
+                value ^= CELL_KEYS[buffer[cell] - 1][cell]
+        if buffer[TURN_BYTE] == CELL_VALUE['O']:
+            value ^= SIDE_KEY
+        active = buffer[ACTIVE_BYTE]
+        value ^= ACTIVE_KEYS[active] if active != NO_ACTIVE_CORNER else ACTIVE_KEYS[-1]
+        return value
+
+    def getWinner(self) -> str:
+        # Subgame winners form a 3x3 board of their own
+        index = sum((self.buffer[STATUS_OFFSET + i] & WINNER_MASK) * POW3[i] for i in range(9))
+        return WINNER_NAMES[SUBBOARD_TABLE[index] & WINNER_MASK]
 
     def to_dict(self) -> Dict:
-        data = asdict(self)
+        data = {
+            'turn': self.turn,
+            'finished': self.finished,
+            'winner': self.winner,
+            'activeCorner': self.activeCorner,
+        }
+        for corner in POSITIONS:
+            data[corner] = getattr(self, corner).to_dict()
+        data['next_turn_timestamp'] = self.next_turn_timestamp
+        # same hex form as stored game files and the API
+        data['zobrist_hash'] = format_hash(self.zobrist_hash)
         return data
 
     @classmethod
@@ -133,21 +353,24 @@ class UltimateTicTacToeGameState:
         ]:
             subgames[key] = SubTicTacToeGame.from_dict(data[key])
 
+        # states saved before hashing was added get theirs computed on load
+        zobrist_hash = data.get('zobrist_hash')
+        if zobrist_hash is not None:
+            zobrist_hash = parse_hash(zobrist_hash)
+
         return cls(
             turn=data['turn'],
             finished=data['finished'],
             winner=data['winner'],
             activeCorner=data['activeCorner'],
+            next_turn_timestamp=data.get('next_turn_timestamp', 0),
+            zobrist_hash=zobrist_hash,
             **subgames
         )
 
     def updateSelf(self) -> None:
         # 1. Update all subgames
-        subgames = [
-            self.topleft, self.topmiddle, self.topright,
-            self.middleleft, self.center, self.middleright,
-            self.bottomleft, self.bottommiddle, self.bottomright,
-        ]
+        subgames = [getattr(self, pos) for pos in POSITIONS]
 
         for subgame in subgames:
             subgame.updateSelf()
@@ -169,6 +392,26 @@ class UltimateTicTacToeGameState:
         self.winner = ''
         self.finished = False
 
+    def updateAfterMove(self, corner: str) -> None:
+        # Called after a move in `corner` has been applied and that subgame updated.
+        # The overall result can only change if that subgame just finished.
+        status = self.buffer[STATUS_OFFSET:STATUS_OFFSET + 9]
+        k = POSITION_INDEX[corner]
+        if not status[k] & STATUS_FINISHED:
+            return
+
+        winner = status[k] & WINNER_MASK
+        if winner:
+            for combo in LINES_THROUGH[corner]:
+                if all(status[POSITION_INDEX[pos]] & WINNER_MASK == winner for pos in combo):
+                    self.buffer[WINNER_BYTE] = winner
+                    self.finished = True
+                    return
+
+        if all(value & STATUS_FINISHED for value in status):
+            self.winner = ''
+            self.finished = True
+
     def __str__(self) -> str:
         # Helper to fetch a cell by subgame + position
         def cell(sg, pos):
@@ -331,44 +574,127 @@ class UltimateTicTacToeGameState:
         print(self)
 
     def copy(self) -> UltimateTicTacToeGameState:
-        return UltimateTicTacToeGameState(
-            turn=self.turn,
-            finished=self.finished,
-            winner=self.winner,
-            activeCorner=self.activeCorner,
-            topleft=self.topleft.copy(),
-            topmiddle=self.topmiddle.copy(),
-            topright=self.topright.copy(),
-            middleleft=self.middleleft.copy(),
-            center=self.center.copy(),
-            middleright=self.middleright.copy(),
-            bottomleft=self.bottomleft.copy(),
-            bottommiddle=self.bottommiddle.copy(),
-            bottomright=self.bottomright.copy(),
+        return UltimateTicTacToeGameState.from_buffer(
+            bytearray(self.buffer),
+            next_turn_timestamp=self.next_turn_timestamp,
+            zobrist_hash=self.zobrist_hash,
         )
 
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, UltimateTicTacToeGameState):
+            return NotImplemented
+        return (
+            self.buffer == other.buffer
+            and self.next_turn_timestamp == other.next_turn_timestamp
+            and self.zobrist_hash == other.zobrist_hash
+        )
+
+    def __repr__(self) -> str:
+        return f"UltimateTicTacToeGameState({self.to_dict()})"
+
+
+@dataclass(slots=True)
+class Move:
+    player: str    # 'X' or 'O'
+    corner: str    # board the move was played in
+    position: str  # cell within that board
+    timestamp: int = 0
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> Move:
+        return cls(**data)
+
 
 @dataclass
 class UltimateTicTacToe:
     current_game: UltimateTicTacToeGameState
-    history: List[UltimateTicTacToeGameState]
+    moves: List[Move] = field(default_factory=list)
+    # Snapshots keyed by move index; 0 is the starting position and is always present
+    checkpoints: Dict[int, UltimateTicTacToeGameState] = field(default_factory=dict)
+    # BitboardGameState mirror of current_game kept by the bitboard engine
+    # between turns, and the Zobrist hash current_game had when they were in sync
+    bitboard: Any = field(default=None, init=False, repr=False, compare=False)
+    bitboard_hash: Optional[int] = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        if 0 not in self.checkpoints and not self.moves:
+            self.checkpoints[0] = self.current_game.copy()
+
+    def copy(self) -> UltimateTicTacToe:
+        """
+        A copy whose current state and move list can change independently.
+        Moves and checkpoint states are never changed in place, so they are shared.
+        """
+        game = UltimateTicTacToe(
+            current_game=self.current_game.copy(),
+            moves=list(self.moves),
+            checkpoints=dict(self.checkpoints),
+        )
+        if self.bitboard is not None:
+            game.bitboard = self.bitboard.copy()
+            game.bitboard_hash = self.bitboard_hash
+        return game
 
     def to_dict(self) -> Dict:
         return {
             "current_game": self.current_game.to_dict(),
-            "history": [state.to_dict() for state in self.history],
+            "moves": [move.to_dict() for move in self.moves],
+            "checkpoints": {
+                str(index): state.to_dict()
+                for index, state in self.checkpoints.items()
+            },
         }
 
     @classmethod
     def from_dict(cls, data: Dict) -> UltimateTicTacToe:
+        current_game = UltimateTicTacToeGameState.from_dict(data["current_game"])
+        if "history" in data:
+            return cls.from_history(
+                current_game,
+                [UltimateTicTacToeGameState.from_dict(s) for s in data["history"]],
+            )
         return cls(
-            current_game=UltimateTicTacToeGameState.from_dict(data["current_game"]),
-            history=[
-                UltimateTicTacToeGameState.from_dict(s)
-                for s in data["history"]
-            ],
+            current_game=current_game,
+            moves=[Move.from_dict(m) for m in data["moves"]],
+            checkpoints={
+                int(index): UltimateTicTacToeGameState.from_dict(s)
+                for index, s in data["checkpoints"].items()
+            },
         )
 
+    @classmethod
+    def from_history(cls, current_game: UltimateTicTacToeGameState, history: List[UltimateTicTacToeGameState]) -> UltimateTicTacToe:
+        """Build a game from the legacy format, where history holds the full state before every move."""
+        states = history + [current_game]
+        moves = []
+        for before, after in zip(states, states[1:]):
+            moves.append(Move(
+                player=before.turn,
+                timestamp=before.next_turn_timestamp,
+                **cls._find_move(before, after),
+            ))
+
+        # the same checkpoints take_turn would have taken, including one after the last move
+        checkpoints = {
+            index: states[index].copy()
+            for index in range(0, len(states), CHECKPOINT_INTERVAL)
+        }
+
+        return cls(current_game=current_game, moves=moves, checkpoints=checkpoints)
+
+    @staticmethod
+    def _find_move(before: UltimateTicTacToeGameState, after: UltimateTicTacToeGameState) -> Dict[str, str]:
+        for corner in POSITIONS:
+            before_subgame = getattr(before, corner)
+            after_subgame = getattr(after, corner)
+            for position in POSITIONS:
+                if getattr(before_subgame, position) != getattr(after_subgame, position):
+                    return {"corner": corner, "position": position}
+        raise ValueError("History states do not differ by a move")
+
     def __str__(self) -> str:
         return str(self.current_game)
 
@@ -0,0 +1,44 @@
+from __future__ import annotations
+import random
+from typing import Tuple, Union
+
+# Fixed seed: hashes are persisted with game state, so the keys must never change.
+ZOBRIST_SEED = 0x5EED_7AC7_0E
+HASH_BITS = 64
+
+_rng = random.Random(ZOBRIST_SEED)
+
+# CELL_KEYS[player][9*corner + position], player 0 = X, 1 = O
+CELL_KEYS: Tuple[Tuple[int, ...], Tuple[int, ...]] = (
+    tuple(_rng.getrandbits(HASH_BITS) for _ in range(81)),
+    tuple(_rng.getrandbits(HASH_BITS) for _ in range(81)),
+)
+
+# XORed in while O is to move
+SIDE_KEY: int = _rng.getrandbits(HASH_BITS)
+
+# ACTIVE_KEYS[corner] for a forced corner; the last entry is for a free
+# choice, so ACTIVE_KEYS[-1] lines up with ANY_CORNER == -1.
+ACTIVE_KEYS: Tuple[int, ...] = tuple(_rng.getrandbits(HASH_BITS) for _ in range(10))
+
+del _rng
+
+
+def move_key(player: int, cell: int, old_active: int, new_active: int) -> int:
+    """
+    XOR delta for one move: the new stone, the side to move flipping and the
+    forced corner changing from old_active to new_active (-1 for a free choice).
+    """
+    return CELL_KEYS[player][cell] ^ SIDE_KEY ^ ACTIVE_KEYS[old_active] ^ ACTIVE_KEYS[new_active]
+
+
+def format_hash(value: int) -> str:
+    """Fixed-width hex form used when persisting (JSON numbers lose 64-bit precision in JS)."""
+    return f"{value:016x}"
+
+
+def parse_hash(value: Union[str, int]) -> int:
+    """Read a persisted hash: the hex form, or a plain int as stored by older versions."""
+    if isinstance(value, int):
+        return value
+    return int(value, 16)
@@ -0,0 +1,191 @@
+"""
+Monte Carlo Tree Search over the bitboard rules engine.
+
+A single search runs UCT with uniformly random playouts. `parallel_search`
+runs independent searches in a process pool (root parallelism) and sums the
+visit counts of the root moves.
+"""
+from __future__ import annotations
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from datamodels.bitboard import BitboardGameState, NO_WINNER, iter_cells
+
+EXPLORATION = math.sqrt(2)
+
+
+@dataclass
+class MCTSResult:
+    move: Optional[Tuple[int, int]]  # (corner, position) indices, None if no legal move
+    playouts: int
+    elapsed: float
+    # root statistics per cell index (9*corner + position)
+    visits: Dict[int, int] = field(default_factory=dict)
+    wins: Dict[int, float] = field(default_factory=dict)
+
+    @property
+    def playouts_per_second(self) -> float:
+        return self.playouts / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def win_rate(self) -> float:
+        """Estimated score of the chosen move for the side to move (draw = 0.5)."""
+        if self.move is None:
+            return 0.0
+        cell = 9 * self.move[0] + self.move[1]
+        return self.wins[cell] / self.visits[cell] if self.visits.get(cell) else 0.0
+
+
+class _Node:
+    __slots__ = ('cell', 'parent', 'children', 'untried', 'wins', 'visits', 'mover')
+
+    def __init__(self, board: BitboardGameState, cell: int = -1, parent: Optional[_Node] = None):
+        self.cell = cell
+        self.parent = parent
+        self.children: List[_Node] = []
+        self.untried = list(iter_cells(board.legal_move_mask()))
+        self.wins = 0.0
+        self.visits = 0
+        # the player whose move led to this node
+        self.mover = board.turn ^ 1
+
+    def select_child(self) -> _Node:
+        log_visits = math.log(self.visits)
+        return max(
+            self.children,
+            key=lambda c: c.wins / c.visits + EXPLORATION * math.sqrt(log_visits / c.visits),
+        )
+
+
+def _playout(board: BitboardGameState, rng: random.Random) -> int:
+    while not board.finished:
+        cells = list(iter_cells(board.legal_move_mask()))
+        if not cells:
+            return NO_WINNER
+        corner, position = divmod(cells[rng.randrange(len(cells))], 9)
+        board.apply_move(corner, position)
+    return board.winner
+
+
+def search(
+    board: BitboardGameState,
+    time_limit: Optional[float] = None,
+    max_playouts: Optional[int] = None,
+    seed: Optional[int] = None,
+) -> MCTSResult:
+    """
+    Run UCT from `board` until the time limit or playout budget is used up.
+
+    At least one of time_limit (seconds) or max_playouts must be given.
+    """
+    if time_limit is None and max_playouts is None:
+        raise ValueError("search needs a time_limit or max_playouts")
+
+    rng = random.Random(seed)
+    root = _Node(board)
+    start = time.perf_counter()
+    deadline = start + time_limit if time_limit is not None else math.inf
+    playouts = 0
+
+    while root.untried or root.children:
+        if max_playouts is not None and playouts >= max_playouts:
+            break
+        # checking the clock every few playouts keeps the overhead low
+        if playouts % 16 == 0 and time.perf_counter() >= deadline:
+            break
+
+        node = root
+        state = board.copy()
+
+        # selection
+        while not node.untried and node.children:
+            node = node.select_child()
+            state.apply_move(*divmod(node.cell, 9))
+
+        # expansion
+        if node.untried:
+            cell = node.untried.pop(rng.randrange(len(node.untried)))
+            state.apply_move(*divmod(cell, 9))
+            child = _Node(state, cell, node)
+            node.children.append(child)
+            node = child
+
+        # simulation
+        winner = _playout(state, rng)
+
+        # backpropagation
+        while node is not None:
+            node.visits += 1
+            if winner == NO_WINNER:
+                node.wins += 0.5
+            elif winner == node.mover:
+                node.wins += 1.0
+            node = node.parent
+        playouts += 1
+
+    elapsed = time.perf_counter() - start
+    visits = {child.cell: child.visits for child in root.children}
+    wins = {child.cell: child.wins for child in root.children}
+    return MCTSResult(
+        move=_best_move(visits),
+        playouts=playouts,
+        elapsed=elapsed,
+        visits=visits,
+        wins=wins,
+    )
+
+
+def _best_move(visits: Dict[int, int]) -> Optional[Tuple[int, int]]:
+    if not visits:
+        return None
+    return divmod(max(visits, key=lambda cell: (visits[cell], -cell)), 9)
+
+
+def _search_worker(args: Tuple[BitboardGameState, Optional[float], Optional[int], int]) -> MCTSResult:
+    board, time_limit, max_playouts, seed = args
+    return search(board, time_limit=time_limit, max_playouts=max_playouts, seed=seed)
+
+
+def parallel_search(
+    executor: ProcessPoolExecutor,
+    workers: int,
+    board: BitboardGameState,
+    time_limit: Optional[float] = None,
+    max_playouts: Optional[int] = None,
+    seed: Optional[int] = None,
+) -> MCTSResult:
+    """
+    Root-parallel MCTS: each worker searches its own tree with a different seed
+    and the root visit counts are summed. max_playouts is the total budget.
+    """
+    if seed is None:
+        seed = random.randrange(1 << 30)
+    per_worker = None if max_playouts is None else max(1, max_playouts // workers)
+    jobs = [(board, time_limit, per_worker, seed + i) for i in range(workers)]
+
+    start = time.perf_counter()
+    results = list(executor.map(_search_worker, jobs))
+    elapsed = time.perf_counter() - start
+
+    visits: Dict[int, int] = {}
+    wins: Dict[int, float] = {}
+    for result in results:
+        for cell, count in result.visits.items():
+            visits[cell] = visits.get(cell, 0) + count
+            wins[cell] = wins.get(cell, 0.0) + result.wins[cell]
+
+    return MCTSResult(
+        move=_best_move(visits),
+        playouts=sum(result.playouts for result in results),
+        elapsed=elapsed,
+        visits=visits,
+        wins=wins,
+    )
+
+
+def default_workers() -> int:
+    return os.cpu_count() or 1
@@ -0,0 +1,353 @@
+"""
+Deterministic alpha-beta search for analysis.
+
+Negamax with alpha-beta pruning and iterative deepening over the bitboard
+rules engine. Moves are ordered by the transposition table move, then moves
+that win a sub-board, then killer moves, then the history heuristic. The
+transposition table is keyed by the Zobrist hash (updated incrementally per
+move) and has a fixed number of slots; a slot is replaced when the new entry
+is from a newer search or was searched at least as deep.
+
+With an endgame tablebase attached, positions it covers are scored exactly
+without searching below them.
+
+The clock is checked every CLOCK_CHECK_INTERVAL nodes and an unfinished
+iteration is abandoned, so a search never runs past its deadline by more
+than a fraction of a millisecond.
+"""
+from __future__ import annotations
+import time
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple, Union
+from datamodels.tictactoe import UltimateTicTacToeGameState
+from datamodels.bitboard import BitboardGameState, CELL_NAMES, NO_WINNER, OPEN_CELLS, X, iter_cells
+from datamodels.zobrist import move_key
+from datamodels.symmetry import canonicalize_bitboard
+from datamodels.subboard_table import (
+    SUBBOARD_TABLE, TERNARY, WIN_LINES, FULL_SUBBOARD, X_THREATS_SHIFT, O_THREATS_SHIFT,
+)
+
+INFINITY = 1_000_000
+WIN_SCORE = 100_000   # a win at ply p scores WIN_SCORE - p
+MAX_PLY = 81
+
+# Static evaluation weights
+SUBBOARD_WEIGHTS = (3, 2, 3, 2, 4, 2, 3, 2, 3)   # per corner, in POSITIONS order
+SUBBOARD_WIN = 100
+META_TWO_IN_LINE = 150
+SUBBOARD_THREAT = 8
+
+# Transposition table entry bounds
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+DEFAULT_TT_SIZE = 1 << 20
+CLOCK_CHECK_INTERVAL = 64
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the deadline has passed."""
+
+
+@dataclass
+class SearchResult:
+    move: Optional[Tuple[str, str]]  # (corner, position), None if there is no legal move
+    score: int                       # from the side to move's point of view
+    depth: int                       # deepest fully searched iteration
+    nodes: int
+    elapsed: float
+    pv: List[Tuple[str, str]] = field(default_factory=list)
+    tt_hits: int = 0
+    tb_hits: int = 0
+
+    @property
+    def nodes_per_second(self) -> float:
+        return self.nodes / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def is_win(self) -> bool:
+        return abs(self.score) >= WIN_SCORE - MAX_PLY
+
+
+class TranspositionTable:
+    """
+    Fixed-size table of (key, depth, bound, score, move, generation) entries,
+    one per slot. Colliding keys overwrite by the replacement policy.
+    """
+
+    def __init__(self, size: int = DEFAULT_TT_SIZE):
+        if size <= 0 or size & (size - 1):
+            raise ValueError("Transposition table size must be a power of two")
+        self.mask = size - 1
+        self.slots: List[Optional[tuple]] = [None] * size
+        self.generation = 0
+
+    def new_search(self) -> None:
+        # entries from earlier searches become preferred replacement victims
+        self.generation += 1
+
+    def probe(self, key: int) -> Optional[tuple]:
+        entry = self.slots[key & self.mask]
+        if entry is not None and entry[0] == key:
+            return entry
+        return None
+
+    def store(self, key: int, depth: int, bound: int, score: int, move: int) -> None:
+        index = key & self.mask
+        entry = self.slots[index]
+        if entry is None or entry[0] == key or entry[5] != self.generation or depth >= entry[1]:
+            self.slots[index] = (key, depth, bound, score, move, self.generation)
+
+    def clear(self) -> None:
+        self.slots = [None] * len(self.slots)
+        self.generation = 0
+
+
+def evaluate(board: BitboardGameState) -> int:
+    """Static score of an unfinished position from X's point of view."""
+    score = 0
+    closed = board.x_won | board.o_won | board.drawn
+    for k in range(9):
+        corner_bit = 1 << k
+        if board.x_won & corner_bit:
+            score += SUBBOARD_WIN * SUBBOARD_WEIGHTS[k]
+        elif board.o_won & corner_bit:
+            score -= SUBBOARD_WIN * SUBBOARD_WEIGHTS[k]
+        elif not closed & corner_bit:
+            shift = 9 * k
+            entry = SUBBOARD_TABLE[TERNARY[(board.x >> shift) & FULL_SUBBOARD] + 2 * TERNARY[(board.o >> shift) & FULL_SUBBOARD]]
+            x_threats = ((entry >> X_THREATS_SHIFT) & FULL_SUBBOARD).bit_count()
+            o_threats = ((entry >> O_THREATS_SHIFT) & FULL_SUBBOARD).bit_count()
+            score += SUBBOARD_THREAT * SUBBOARD_WEIGHTS[k] * (x_threats - o_threats)
+
+    # two won sub-boards in a meta line the opponent has not blocked
+    x_blocked = board.o_won | board.drawn
+    o_blocked = board.x_won | board.drawn
+    for line in WIN_LINES:
+        if not line & x_blocked and (line & board.x_won).bit_count() == 2:
+            score += META_TWO_IN_LINE
+        if not line & o_blocked and (line & board.o_won).bit_count() == 2:
+            score -= META_TWO_IN_LINE
+    return score
+
+
+class NegamaxSearcher:
+    """
+    Iterative deepening alpha-beta searcher. The transposition table is kept
+    between searches, so reusing one searcher speeds up analysing a game move
+    by move. An optional Tablebase (engines.tablebase) scores near-full
+    boards exactly.
+    """
+
+    def __init__(self, tt_size: int = DEFAULT_TT_SIZE, tablebase=None):
+        self.tt = TranspositionTable(tt_size)
+        self.tablebase = tablebase
+        self.nodes = 0
+        self.tt_hits = 0
+        self.tb_hits = 0
+        self.deadline = float('inf')
+        self.killers: List[List[int]] = [[-1, -1] for _ in range(MAX_PLY + 1)]
+        self.history = [0] * 81
+        self.pv_table: List[List[int]] = [[] for _ in range(MAX_PLY + 2)]
+
+    def search(
+        self,
+        state: Union[UltimateTicTacToeGameState, BitboardGameState],
+        time_limit: Optional[float] = None,
+        max_depth: Optional[int] = None,
+    ) -> SearchResult:
+        """
+        Search the position until the time limit passes or max_depth is completed.
+
+        Args:
+            state: Position to analyse (the side to move is state.turn)
+            time_limit: Budget in seconds; the search returns within it
+            max_depth: Deepest iteration to run (default: every remaining move)
+
+        Returns:
+            SearchResult for the deepest completed iteration
+
+        Raises:
+            ValueError: If neither a time limit nor a depth limit is given
+        """
+        if time_limit is None and max_depth is None:
+            raise ValueError("search needs a time_limit or max_depth")
+
+        board = state if isinstance(state, BitboardGameState) else BitboardGameState.from_game_state(state)
+        start = time.perf_counter()
+        self.deadline = start + time_limit if time_limit is not None else float('inf')
+        self.nodes = 0
+        self.tt_hits = 0
+        self.tb_hits = 0
+        self.killers = [[-1, -1] for _ in range(MAX_PLY + 1)]
+        self.history = [0] * 81
+        self.tt.new_search()
+
+        legal = list(iter_cells(board.legal_move_mask()))
+        if not legal:
+            return SearchResult(move=None, score=self._terminal_score(board, 0), depth=0, nodes=0, elapsed=0.0)
+
+        remaining = 81 - (board.x | board.o).bit_count()
+        if max_depth is None or max_depth > remaining:
+            max_depth = remaining
+
+        # fall back to the best-ordered move if not even depth 1 finishes
+        best_pv = [self._order_moves(board, -1, 0)[0]]
+        root_key = board.zobrist_hash()
+        best_score = 0
+        completed_depth = 0
+
+        for depth in range(1, max_depth + 1):
+            try:
+                score = self._negamax(board, root_key, depth, -INFINITY, INFINITY, 0)
+            except SearchTimeout:
+                break
+            completed_depth = depth
+            best_score = score
+            best_pv = list(self.pv_table[0])
+            if abs(score) >= WIN_SCORE - MAX_PLY:
+                break  # forced result found, deeper search cannot change it
+            if time.perf_counter() >= self.deadline:
+                break
+
+        elapsed = time.perf_counter() - start
+        return SearchResult(
+            move=CELL_NAMES[best_pv[0]],
+            score=best_score,
+            depth=completed_depth,
+            nodes=self.nodes,
+            elapsed=elapsed,
+            pv=[CELL_NAMES[cell] for cell in best_pv],
+            tt_hits=self.tt_hits,
+            tb_hits=self.tb_hits,
+        )
+
+    def _terminal_score(self, board: BitboardGameState, ply: int) -> int:
+        if board.winner == NO_WINNER:
+            return 0
+        # the side to move at a finished position is always the loser
+        return -(WIN_SCORE - ply) if board.winner != board.turn else WIN_SCORE - ply
+
+    def _order_moves(self, board: BitboardGameState, tt_move: int, ply: int) -> List[int]:
+        mask = board.legal_move_mask()
+        # cells that complete a line in their sub-board for the side to move
+        threat_shift = X_THREATS_SHIFT if board.turn == X else O_THREATS_SHIFT
+        winning = 0
+        active_boards = range(9) if board.active < 0 else (board.active,)
+        for k in active_boards:
+            shift = 9 * k
+            if (mask >> shift) & FULL_SUBBOARD:
+                entry = SUBBOARD_TABLE[TERNARY[(board.x >> shift) & FULL_SUBBOARD] + 2 * TERNARY[(board.o >> shift) & FULL_SUBBOARD]]
+                winning |= ((entry >> threat_shift) & FULL_SUBBOARD) << shift
+
+        killers = self.killers[ply]
+        history = self.history
+
+        def priority(cell: int) -> int:
+            if cell == tt_move:
+                return 1 << 40
+            if (winning >> cell) & 1:
+                return 1 << 39
+            if cell == killers[0] or cell == killers[1]:
+                return 1 << 38
+            return history[cell]
+
+        return sorted(iter_cells(mask), key=priority, reverse=True)
+
+    def _negamax(self, board: BitboardGameState, key: int, depth: int, alpha: int, beta: int, ply: int) -> int:
+        self.nodes += 1
+        if self.nodes % CLOCK_CHECK_INTERVAL == 0 and time.perf_counter() >= self.deadline:
+            raise SearchTimeout()
+
+        self.pv_table[ply] = []
+        if board.finished:
+            return self._terminal_score(board, ply)
+        if self.tablebase is not None and ply > 0:
+            score = self._probe_tablebase(board, ply)
+            if score is not None:
+                return score
+        if depth == 0:
+            score = evaluate(board)
+            return score if board.turn == X else -score
+
+        alpha_orig = alpha
+        tt_move = -1
+        entry = self.tt.probe(key)
+        if entry is not None:
+            self.tt_hits += 1
+            tt_move = entry[4]
+            if entry[1] >= depth and ply > 0:
+                score = self._score_from_tt(entry[3], ply)
+                bound = entry[2]
+                if bound == EXACT:
+                    return score
+                if bound == LOWER and score > alpha:
+                    alpha = score
+                elif bound == UPPER and score < beta:
+                    beta = score
+                if alpha >= beta:
+                    return score
+
+        best_score = -INFINITY
+        best_move = -1
+        for cell in self._order_moves(board, tt_move, ply):
+            child = board.copy()
+            child.apply_move(cell // 9, cell % 9)
+            child_key = key ^ move_key(board.turn, cell, board.active, child.active)
+            score = -self._negamax(child, child_key, depth - 1, -beta, -alpha, ply + 1)
+
+            if score > best_score:
+                best_score = score
+                best_move = cell
+                if score > alpha:
+                    alpha = score
+                    self.pv_table[ply] = [cell] + self.pv_table[ply + 1]
+                    if alpha >= beta:
+                        killers = self.killers[ply]
+                        if killers[0] != cell:
+                            killers[1] = killers[0]
+                            killers[0] = cell
+                        self.history[cell] += depth * depth
+                        break
+
+        if best_score <= alpha_orig:
+            bound = UPPER
+        elif best_score >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        self.tt.store(key, depth, bound, self._score_to_tt(best_score, ply), best_move)
+        return best_score
+
+    def _probe_tablebase(self, board: BitboardGameState, ply: int) -> Optional[int]:
+        # cheap emptiness test first; canonicalizing costs far more than a node
+        playable = OPEN_CELLS[board.closed] & ~board.occupied
+        if playable.bit_count() > self.tablebase.max_empty:
+            return None
+        entry = self.tablebase.probe_key(canonicalize_bitboard(board)[0].zobrist_hash())
+        if entry is None:
+            return None
+        self.tb_hits += 1
+        if entry.result > 0:
+            return WIN_SCORE - (ply + entry.distance)
+        if entry.result < 0:
+            return -(WIN_SCORE - (ply + entry.distance))
+        return 0
+
+    # Win scores are stored relative to the node so they stay valid at any ply
+    @staticmethod
+    def _score_to_tt(score: int, ply: int) -> int:
+        if score >= WIN_SCORE - MAX_PLY:
+            return score + ply
+        if score <= -(WIN_SCORE - MAX_PLY):
+            return score - ply
+        return score
+
+    @staticmethod
+    def _score_from_tt(score: int, ply: int) -> int:
+        if score >= WIN_SCORE - MAX_PLY:
+            return score - ply
+        if score <= -(WIN_SCORE - MAX_PLY):
+            return score + ply
+        return score
@@ -0,0 +1,161 @@
+"""
+Opening book: move statistics per canonical position, stored as a sorted
+file of fixed-size records and read through mmap.
+
+File layout (little endian):
+    header   MAGIC (8 bytes), version (uint32), record count (uint32)
+    records  position hash (uint64), cell (uint8), 3 padding bytes,
+             games (uint32), wins (uint32), draws (uint32)
+
+Records are sorted by (hash, cell). Positions are canonicalized with the
+symmetry transforms before hashing, and cells are stored in the canonical
+orientation, so one entry covers all eight symmetric equivalents. `wins`
+counts games won by the player who made the move.
+"""
+from __future__ import annotations
+import mmap
+import os
+import struct
+from collections import defaultdict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from datamodels.tictactoe import UltimateTicTacToe, UltimateTicTacToeGameState
+from datamodels.bitboard import BitboardGameState, POSITION_INDEX, PLAYER_INDEX, CELL_NAMES
+from datamodels.symmetry import canonicalize_bitboard, transform_cell, INVERSE
+from engines.record_file import lower_bound
+
+MAGIC = b'UTTTBOOK'
+VERSION = 1
+HEADER = struct.Struct('<8sII')
+RECORD = struct.Struct('<QB3xIII')
+
+DEFAULT_MAX_PLY = 20
+
+
+class BookMove(NamedTuple):
+    corner: str
+    position: str
+    games: int
+    wins: int
+    draws: int
+
+    @property
+    def score(self) -> float:
+        """Average result for the player making the move (win 1, draw 0.5)."""
+        return (self.wins + 0.5 * self.draws) / self.games if self.games else 0.0
+
+
+def _replay_positions(game: UltimateTicTacToe, max_ply: int):
+    """Yield (board before the move, cell) for every move made within the first max_ply stones."""
+    board = BitboardGameState.from_game_state(game.checkpoints[0])
+    for move in game.moves:
+        if (board.x | board.o).bit_count() >= max_ply:
+            return
+        corner = POSITION_INDEX[move.corner]
+        position = POSITION_INDEX[move.position]
+        yield board, 9 * corner + position
+        board = board.copy()
+        board.apply_move(corner, position)
+
+
+def collect_statistics(games: Iterable[UltimateTicTacToe], max_ply: int = DEFAULT_MAX_PLY) -> Dict[Tuple[int, int], List[int]]:
+    """
+    Aggregate [games, wins, draws] per (canonical position hash, canonical cell).
+    Unfinished games are skipped since they have no result.
+    """
+    stats: Dict[Tuple[int, int], List[int]] = defaultdict(lambda: [0, 0, 0])
+    for game in games:
+        if not game.current_game.finished:
+            continue
+        winner = PLAYER_INDEX[game.current_game.winner] if game.current_game.winner else None
+        for board, cell in _replay_positions(game, max_ply):
+            canonical, transform = canonicalize_bitboard(board)
+            entry = stats[(canonical.zobrist_hash(), transform_cell(cell, transform))]
+            entry[0] += 1
+            if winner is None:
+                entry[2] += 1
+            elif winner == board.turn:
+                entry[1] += 1
+    return stats
+
+
+def write_book(path: str, stats: Dict[Tuple[int, int], List[int]], min_games: int = 1) -> int:
+    """
+    Write the statistics as a sorted book file (atomically replacing `path`).
+
+    Returns:
+        Number of records written
+    """
+    records = sorted(
+        (key, cell, games, wins, draws)
+        for (key, cell), (games, wins, draws) in stats.items()
+        if games >= min_games
+    )
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(records)))
+        for record in records:
+            f.write(RECORD.pack(*record))
+    os.replace(temp_path, path)
+    return len(records)
+
+
+class OpeningBook:
+    """
+    Read-only view of a book file. Nothing is parsed up front: the file is
+    memory-mapped and each lookup binary-searches the records in place.
+    """
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count = HEADER.unpack_from(self.mmap, 0)
+        if magic != MAGIC:
+            self.mmap.close()
+            raise ValueError(f"{path} is not an opening book")
+        if version != VERSION:
+            self.mmap.close()
+            raise ValueError(f"Unsupported opening book version {version}")
+        if HEADER.size + count * RECORD.size > len(self.mmap):
+            self.mmap.close()
+            raise ValueError(f"Opening book {path} is truncated")
+        self.count = count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def probe(self, key: int) -> List[Tuple[int, int, int, int]]:
+        """Raw (canonical cell, games, wins, draws) records for a canonical position hash."""
+        results = []
+        index = lower_bound(self.mmap, HEADER.size, RECORD.size, self.count, key)
+        while index < self.count:
+            record_key, cell, games, wins, draws = RECORD.unpack_from(self.mmap, HEADER.size + index * RECORD.size)
+            if record_key != key:
+                break
+            results.append((cell, games, wins, draws))
+            index += 1
+        return results
+
+    def lookup(self, state: UltimateTicTacToeGameState) -> List[BookMove]:
+        """
+        Book moves for a position, in the position's own orientation,
+        most played first.
+        """
+        board = state if isinstance(state, BitboardGameState) else BitboardGameState.from_game_state(state)
+        canonical, transform = canonicalize_bitboard(board)
+        inverse = INVERSE[transform]
+        moves = []
+        for cell, games, wins, draws in self.probe(canonical.zobrist_hash()):
+            corner, position = CELL_NAMES[transform_cell(cell, inverse)]
+            moves.append(BookMove(corner, position, games, wins, draws))
+        moves.sort(key=lambda move: (move.games, move.score), reverse=True)
+        return moves
+
+    def best_move(self, state: UltimateTicTacToeGameState, min_games: int = 1) -> Optional[BookMove]:
+        """The most played book move with at least min_games games, if any."""
+        moves = self.lookup(state)
+        if moves and moves[0].games >= min_games:
+            return moves[0]
+        return None
+
+    def close(self):
+        self.mmap.close()
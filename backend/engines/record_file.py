@@ -0,0 +1,19 @@
+"""
+Helpers for the sorted fixed-record binary files (opening book, tablebase).
+Every record starts with a little-endian uint64 key and records are sorted by it.
+"""
+import struct
+
+KEY = struct.Struct('<Q')
+
+
+def lower_bound(buffer, offset: int, record_size: int, count: int, key: int) -> int:
+    """Index of the first record whose key is >= key (binary search in place)."""
+    low, high = 0, count
+    while low < high:
+        mid = (low + high) // 2
+        if KEY.unpack_from(buffer, offset + mid * record_size)[0] < key:
+            low = mid + 1
+        else:
+            high = mid
+    return low
@@ -0,0 +1,291 @@
+"""
+Endgame tablebase: exact results for positions with at most `max_empty`
+playable cells (empty cells in sub-boards that are still open).
+
+Every move fills a cell, so the positions below a seed position form a DAG
+that ends in finished games. Generation solves that DAG backwards from the
+finished positions (memoized retrograde analysis) for each seed and records
+every position it passes through. Enumerating all positions with K empty
+cells is out of reach for any useful K, so seeds are the first position
+with at most K playable cells in stored and randomly played games.
+
+File layout (little endian):
+    header   MAGIC (8 bytes), version (uint32), record count (uint32), max_empty (uint32)
+    records  canonical position hash (uint64), result (int8), distance (uint8), 6 padding bytes
+
+Records are sorted by hash. `result` is WIN, DRAW or LOSS for the side to
+move, and `distance` is the number of plies to the end of the game under
+best play (fastest win, slowest loss).
+"""
+from __future__ import annotations
+import json
+import mmap
+import os
+import random
+import struct
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from datamodels.tictactoe import UltimateTicTacToe, UltimateTicTacToeGameState
+from datamodels.bitboard import BitboardGameState, OPEN_CELLS, POSITION_INDEX, NO_WINNER, iter_cells
+from datamodels.symmetry import canonicalize_bitboard
+from datamodels.zobrist import move_key
+from engines.record_file import lower_bound
+
+MAGIC = b'UTTTBASE'
+VERSION = 1
+HEADER = struct.Struct('<8sIII')
+RECORD = struct.Struct('<QbB6x')
+
+WIN = 1
+DRAW = 0
+LOSS = -1
+RESULT_NAMES = {WIN: 'win', DRAW: 'draw', LOSS: 'loss'}
+
+SEED_FIELDS = ('x', 'o', 'x_won', 'o_won', 'drawn', 'turn', 'active', 'finished', 'winner')
+
+
+class TablebaseEntry(NamedTuple):
+    result: int     # WIN, DRAW or LOSS for the side to move
+    distance: int   # plies to the end of the game under best play
+
+
+def playable_cells(board: BitboardGameState) -> int:
+    """81-bit mask of empty cells in open sub-boards (0 once the game is finished)."""
+    if board.finished:
+        return 0
+    return OPEN_CELLS[board.closed] & ~board.occupied
+
+
+def _rank(entry: Tuple[int, int]) -> Tuple[int, int]:
+    # prefer the fastest win, then the fastest draw, then the slowest loss
+    result, distance = entry
+    return (result, -distance if result != LOSS else distance)
+
+
+class Solver:
+    """Memoized exact solver; collects every solved position by canonical hash."""
+
+    def __init__(self, known: Optional[Tablebase] = None):
+        self.known = known
+        self.memo: Dict[int, Tuple[int, int]] = {}
+        self.records: Dict[int, Tuple[int, int]] = {}
+
+    def solve(self, board: BitboardGameState, key: Optional[int] = None) -> Tuple[int, int]:
+        """(result, distance) of a position for the side to move."""
+        if key is None:
+            key = board.zobrist_hash()
+        cached = self.memo.get(key)
+        if cached is not None:
+            return cached
+
+        if board.finished:
+            # the player who just moved ended the game, so the side to move never wins
+            value = (DRAW if board.winner == NO_WINNER else LOSS, 0)
+            self.memo[key] = value
+            return value
+
+        canonical_key = canonicalize_bitboard(board)[0].zobrist_hash()
+        value = None
+        if self.known is not None:
+            entry = self.known.probe_key(canonical_key)
+            if entry is not None:
+                value = (entry.result, entry.distance)
+
+        if value is None:
+            best = None
+            for cell in iter_cells(board.legal_move_mask()):
+                child = board.copy()
+                child.apply_move(cell // 9, cell % 9)
+                child_key = key ^ move_key(board.turn, cell, board.active, child.active)
+                result, distance = self.solve(child, child_key)
+                candidate = (-result, distance + 1)
+                if best is None or _rank(candidate) > _rank(best):
+                    best = candidate
+            value = best
+
+        self.memo[key] = value
+        self.records[canonical_key] = value
+        return value
+
+
+# ===== Seeds =====
+
+def seed_from_game(game: UltimateTicTacToe, max_empty: int) -> Optional[BitboardGameState]:
+    """The first unfinished position of a stored game with at most max_empty playable cells."""
+    board = BitboardGameState.from_game_state(game.checkpoints[0])
+    for move in game.moves:
+        if board.finished:
+            return None
+        if playable_cells(board).bit_count() <= max_empty:
+            return board
+        board = board.copy()
+        board.apply_move(POSITION_INDEX[move.corner], POSITION_INDEX[move.position])
+    if not board.finished and playable_cells(board).bit_count() <= max_empty:
+        return board
+    return None
+
+
+def random_seeds(count: int, max_empty: int, seed: int = 0) -> List[BitboardGameState]:
+    """Play random games until they reach at most max_empty playable cells."""
+    rng = random.Random(seed)
+    seeds = []
+    while len(seeds) < count:
+        board = BitboardGameState()
+        while not board.finished and playable_cells(board).bit_count() > max_empty:
+            cells = list(iter_cells(board.legal_move_mask()))
+            cell = cells[rng.randrange(len(cells))]
+            board.apply_move(cell // 9, cell % 9)
+        if not board.finished:
+            seeds.append(board)
+    return seeds
+
+
+def seeds_to_json(seeds: Iterable[BitboardGameState]) -> List[List[int]]:
+    return [[int(getattr(board, name)) for name in SEED_FIELDS] for board in seeds]
+
+
+def seeds_from_json(data: List[List[int]]) -> List[BitboardGameState]:
+    seeds = []
+    for values in data:
+        fields = dict(zip(SEED_FIELDS, values))
+        fields['finished'] = bool(fields['finished'])
+        seeds.append(BitboardGameState(**fields))
+    return seeds
+
+
+# ===== Files =====
+
+def write_table(path: str, records: Dict[int, Tuple[int, int]], max_empty: int) -> int:
+    """Write records as a sorted table file (atomically replacing `path`). Returns the record count."""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(records), max_empty))
+        for key in sorted(records):
+            result, distance = records[key]
+            f.write(RECORD.pack(key, result, distance))
+    os.replace(temp_path, path)
+    return len(records)
+
+
+class Tablebase:
+    """
+    Memory-mapped tablebase file. Lookups binary-search the sorted records in
+    place, so opening a table costs nothing beyond the mmap.
+    """
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, max_empty = HEADER.unpack_from(self.mmap, 0)
+        if magic != MAGIC:
+            self.mmap.close()
+            raise ValueError(f"{path} is not a tablebase file")
+        if version != VERSION:
+            self.mmap.close()
+            raise ValueError(f"Unsupported tablebase version {version}")
+        if HEADER.size + count * RECORD.size > len(self.mmap):
+            self.mmap.close()
+            raise ValueError(f"Tablebase {path} is truncated")
+        self.count = count
+        self.max_empty = max_empty
+
+    def __len__(self) -> int:
+        return self.count
+
+    def probe_key(self, canonical_key: int) -> Optional[TablebaseEntry]:
+        index = lower_bound(self.mmap, HEADER.size, RECORD.size, self.count, canonical_key)
+        if index < self.count:
+            key, result, distance = RECORD.unpack_from(self.mmap, HEADER.size + index * RECORD.size)
+            if key == canonical_key:
+                return TablebaseEntry(result, distance)
+        return None
+
+    def probe(self, state: UltimateTicTacToeGameState) -> Optional[TablebaseEntry]:
+        """
+        Exact result for the side to move, or None if the position is not in
+        the table. Accepts a game state or a BitboardGameState.
+        """
+        board = state if isinstance(state, BitboardGameState) else BitboardGameState.from_game_state(state)
+        if board.finished:
+            return TablebaseEntry(DRAW if board.winner == NO_WINNER else LOSS, 0)
+        if playable_cells(board).bit_count() > self.max_empty:
+            return None
+        return self.probe_key(canonicalize_bitboard(board)[0].zobrist_hash())
+
+    def records(self) -> Iterator[Tuple[int, Tuple[int, int]]]:
+        for index in range(self.count):
+            key, result, distance = RECORD.unpack_from(self.mmap, HEADER.size + index * RECORD.size)
+            yield key, (result, distance)
+
+    def close(self):
+        self.mmap.close()
+
+
+# ===== Parallel, resumable generation =====
+
+def _chunk_path(work_dir: str, index: int) -> str:
+    return os.path.join(work_dir, f"chunk-{index:05d}.bin")
+
+
+def solve_chunk(job: Dict) -> Tuple[int, int]:
+    """Solve one chunk of seeds and write its records. Returns (chunk index, record count)."""
+    known = Tablebase(job["known"]) if job["known"] else None
+    solver = Solver(known)
+    for board in seeds_from_json(job["seeds"]):
+        solver.solve(board)
+    count = write_table(_chunk_path(job["work_dir"], job["index"]), solver.records, job["max_empty"])
+    if known is not None:
+        known.close()
+    return job["index"], count
+
+
+def prepare_work_dir(work_dir: str, max_empty: int, seeds: List[BitboardGameState], chunk_size: int) -> Dict:
+    """
+    Write the seed plan for a run, or load the existing one so an interrupted
+    run resumes with the same chunks.
+    """
+    os.makedirs(work_dir, exist_ok=True)
+    plan_path = os.path.join(work_dir, "plan.json")
+    if os.path.exists(plan_path):
+        with open(plan_path, 'r') as f:
+            plan = json.load(f)
+        if plan["max_empty"] != max_empty:
+            raise ValueError(f"{work_dir} was started with max_empty={plan['max_empty']}")
+        return plan
+
+    data = seeds_to_json(seeds)
+    plan = {
+        "max_empty": max_empty,
+        "chunks": [data[i:i + chunk_size] for i in range(0, len(data), chunk_size)],
+    }
+    with open(f"{plan_path}.tmp", 'w') as f:
+        json.dump(plan, f)
+    os.replace(f"{plan_path}.tmp", plan_path)
+    return plan
+
+
+def pending_jobs(plan: Dict, work_dir: str, known_path: Optional[str]) -> List[Dict]:
+    """Chunks without a finished chunk file."""
+    return [
+        {
+            "index": index,
+            "seeds": seeds,
+            "max_empty": plan["max_empty"],
+            "work_dir": work_dir,
+            "known": known_path,
+        }
+        for index, seeds in enumerate(plan["chunks"])
+        if not os.path.exists(_chunk_path(work_dir, index))
+    ]
+
+
+def merge_chunks(plan: Dict, work_dir: str, output: str, known_path: Optional[str] = None) -> int:
+    """Merge every chunk (and an earlier, smaller table) into the final file."""
+    records: Dict[int, Tuple[int, int]] = {}
+    sources = [_chunk_path(work_dir, index) for index in range(len(plan["chunks"]))]
+    if known_path:
+        sources.append(known_path)
+    for path in sources:
+        table = Tablebase(path)
+        records.update(table.records())
+        table.close()
+    return write_table(output, records, plan["max_empty"])
@@ -3,7 +3,12 @@ from database.migrations import (
     repair_winner_ids, 
     add_game_state_column, 
     add_user_created_at_column,
-    add_user_password_must_reset_column
+    add_user_password_must_reset_column,
+    add_user_bot_column,
+    add_game_state_bin_column,
+    add_game_turn_columns,
+    convert_game_state_to_jsonb,
+    backfill_game_turn_columns
 )
 from server import Server
 from services.UserService import UserService
@@ -13,6 +18,8 @@ from services.TicTacToeService import TicTacToeService
 from services.GameFileService import GameFileService
 from services.GameService import GameService
 from services.NotificationService import NotificationService
+from services.BotService import BotService
+from services.PasswordHasher import password_hasher
 
 import os
 from dotenv import load_dotenv
@@ -23,13 +30,19 @@ def setup_services():
     user_invite_service = UserInviteService(user_service=user_service, notification_service=notification_service)
     tictactoe_service = TicTacToeService()
     game_file_service = GameFileService(tictactoe_service=tictactoe_service)
+    bot_service = BotService()
     game_service = GameService(
         game_file_service=game_file_service,
         user_service=user_service,
-        notification_service=notification_service
+        notification_service=notification_service,
+        bot_service=bot_service
     )
     game_invite_service = GameInviteService(game_service=game_service, notification_service=notification_service)
 
+    # With GAME_LAYOUT=sharded, move legacy flat game files into shards while serving
+    if game_file_service.start_layout_migration():
+        print("Migrating game files to the sharded layout in the background")
+
     # Start the server
     print("Starting server on http://0.0.0.0:8080")
     server = Server(
@@ -39,7 +52,13 @@ def setup_services():
         game_invite_service=game_invite_service,
         notification_service=notification_service
     )
-    server.run()
+    try:
+        server.run()
+    finally:
+        # stop the worker pools and threads, and flush pending game writes
+        bot_service.close()
+        game_file_service.close()
+        password_hasher.close()
 
 def main():
     # Load environment variables from .env.dev
@@ -55,6 +74,11 @@ def main():
     add_game_state_column()
     add_user_created_at_column()
     add_user_password_must_reset_column()
+    add_user_bot_column()
+    add_game_state_bin_column()
+    convert_game_state_to_jsonb()
+    add_game_turn_columns()
+    backfill_game_turn_columns()
     # repair_winner_ids()
     print("Database migrations completed")
 
@@ -25,6 +25,9 @@ from pathlib import Path
 from sqlalchemy import inspect, text
 from database.schema import Base, SessionLocal, engine as pg_engine, DB_TYPE
 from sqlalchemy import create_engine
+from services.TicTacToeService import TicTacToeService
+from services.GameFileService import GameFileService, parse_game_file_name
+from datamodels.game_codec import decode_game
 
 def get_sqlite_engine(sqlite_path):
     """Create SQLite engine for the source database."""
@@ -151,16 +154,29 @@ def migrate_data(sqlite_engine, pg_engine, dry_run=False):
         data_dir = os.environ.get("DATA_DIR", "../devdata")
         games_dir = os.path.join(data_dir, "games")
         if os.path.exists(games_dir):
-            game_files = [f for f in os.listdir(games_dir) if f.endswith('.json')]
+            # walk shard directories as well as the legacy flat layout
+            game_files = [
+                os.path.join(root, f)
+                for root, _, file_names in os.walk(games_dir)
+                for f in file_names
+                if parse_game_file_name(f) is not None
+            ]
             migrated_games = 0
+            # move logs and binary game files are converted to the JSON document format
+            log_reader = GameFileService(tictactoe_service=TicTacToeService(), storage="movelog")
             
-            for game_file in game_files:
+            for game_path in game_files:
                 try:
-                    game_id = int(game_file.replace('.json', ''))
-                    game_path = os.path.join(games_dir, game_file)
+                    game_id = parse_game_file_name(os.path.basename(game_path))
                     
-                    with open(game_path, 'r') as f:
-                        game_data = json.load(f)
+                    if game_path.endswith('.log'):
+                        game_data = log_reader._serialize_game(log_reader._read_log(game_path))
+                    elif game_path.endswith('.bin'):
+                        with open(game_path, 'rb') as f:
+                            game_data = log_reader._serialize_game(decode_game(f.read()))
+                    else:
+                        with open(game_path, 'r') as f:
+                            game_data = json.load(f)
                     
                     if not dry_run:
                         # Update the game record with game_state
@@ -169,7 +185,7 @@ def migrate_data(sqlite_engine, pg_engine, dry_run=False):
                             game_record.game_state = game_data
                             migrated_games += 1
                 except Exception as e:
-                    print(f"    ⚠ Error migrating game {game_file}: {e}")
+                    print(f"    ⚠ Error migrating game {game_path}: {e}")
             
             if migrated_games > 0:
                 print(f"    ✓ {migrated_games} game state files migrated")
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Self-play harness: plays games to completion through TicTacToeService and
+reports engine throughput.
+
+Usage:
+    python selfplay.py [--games N] [--workers W] [--seed S] [--policy random|mcts]
+                       [--playouts P] [--engine dataclass|bitboard] [--output DIR]
+
+Games are split across a multiprocessing pool; worker i seeds its random
+number generator with seed + i, so a run is reproducible for a given
+seed and worker count. With --output, every game is written as
+DIR/{id}.json in the GameFileService format, ready to copy into
+DATA_DIR/games for load tests.
+
+Example:
+    cd backend && python selfplay.py --games 2000 --workers 8 --output /tmp/games
+"""
+
+import os
+import sys
+import time
+import json
+import random
+import argparse
+import multiprocessing
+from collections import Counter
+from typing import Dict, Optional, Tuple
+
+from services.TicTacToeService import TicTacToeService, ENGINES
+from datamodels.bitboard import BitboardGameState, CELL_NAMES
+from engines.mcts import search
+
+POLICIES = ("random", "mcts")
+
+
+def choose_move(tictactoe_service, game, policy, playouts, rng) -> Tuple[str, str]:
+    """Pick the next move for the side to move."""
+    if policy == "mcts":
+        board = BitboardGameState.from_game_state(game.current_game)
+        result = search(board, max_playouts=playouts, seed=rng.randrange(1 << 30))
+        corner, position = result.move
+        return CELL_NAMES[9 * corner + position]
+    return rng.choice(tictactoe_service.legal_moves(game.current_game))
+
+
+def play_batch(job: Dict) -> Dict:
+    """Play job['games'] games in one worker process and return its tallies."""
+    rng = random.Random(job["seed"])
+    tictactoe_service = TicTacToeService(engine=job["engine"])
+
+    game_file_service = None
+    if job["output"]:
+        # imported here so runs without --output never touch the database config
+        from services.GameFileService import GameFileService
+        game_file_service = GameFileService(tictactoe_service=tictactoe_service)
+
+    outcomes = Counter()
+    moves = 0
+    start = time.perf_counter()
+    for i in range(job["games"]):
+        game = tictactoe_service.init_empty_game()
+        while not game.current_game.finished:
+            corner, position = choose_move(tictactoe_service, game, job["policy"], job["playouts"], rng)
+            tictactoe_service.take_turn(game, game.current_game.turn, corner, position)
+        moves += len(game.moves)
+        outcomes[game.current_game.winner or "draw"] += 1
+
+        if game_file_service is not None:
+            game_id = job["first_id"] + i
+            with open(os.path.join(job["output"], f"{game_id}.json"), "w") as f:
+                json.dump(game_file_service._serialize_game(game), f)
+
+    return {
+        "games": job["games"],
+        "moves": moves,
+        "outcomes": outcomes,
+        "elapsed": time.perf_counter() - start,
+    }
+
+
+def run(games: int, workers: int, seed: int, policy: str, playouts: int, engine: str, output: Optional[str]) -> Dict:
+    """Fan the games out over a process pool and combine the worker tallies."""
+    if output:
+        os.makedirs(output, exist_ok=True)
+
+    jobs = []
+    first_id = 1
+    for worker in range(workers):
+        count = games // workers + (1 if worker < games % workers else 0)
+        if count == 0:
+            continue
+        jobs.append({
+            "games": count,
+            "seed": seed + worker,
+            "policy": policy,
+            "playouts": playouts,
+            "engine": engine,
+            "output": output,
+            "first_id": first_id,
+        })
+        first_id += count
+
+    start = time.perf_counter()
+    with multiprocessing.Pool(processes=len(jobs)) as pool:
+        results = pool.map(play_batch, jobs)
+    elapsed = time.perf_counter() - start
+
+    outcomes = Counter()
+    for result in results:
+        outcomes.update(result["outcomes"])
+    total_moves = sum(result["moves"] for result in results)
+    return {
+        "games": games,
+        "moves": total_moves,
+        "outcomes": dict(outcomes),
+        "elapsed": elapsed,
+        "games_per_second": games / elapsed,
+        "moves_per_second": total_moves / elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Play self-play games and report rules engine throughput",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__
+    )
+    parser.add_argument("--games", type=int, default=1000, help="Number of games to play (default: 1000)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes (default: CPU count)")
+    parser.add_argument("--seed", type=int, default=0, help="Base seed; worker i uses seed + i (default: 0)")
+    parser.add_argument("--policy", choices=POLICIES, default="random", help="Move policy (default: random)")
+    parser.add_argument("--playouts", type=int, default=200, help="MCTS playouts per move for --policy mcts (default: 200)")
+    parser.add_argument("--engine", choices=ENGINES, default="dataclass", help="TicTacToeService engine (default: dataclass)")
+    parser.add_argument("--output", default=None, help="Directory to write games to in GameFileService JSON format")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+
+    args = parser.parse_args()
+    if args.games < 1 or args.workers < 1:
+        print("❌ --games and --workers must be at least 1")
+        sys.exit(1)
+
+    print(f"🎲 Playing {args.games} {args.policy} game(s) on {args.workers} worker(s) with the {args.engine} engine...")
+    report = run(args.games, args.workers, args.seed, args.policy, args.playouts, args.engine, args.output)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"\n✓ {report['games']} games, {report['moves']} moves in {report['elapsed']:.2f}s")
+    print(f"   {report['games_per_second']:.1f} games/s, {report['moves_per_second']:.0f} moves/s")
+    print(f"   Average length: {report['moves'] / report['games']:.1f} moves")
+    for outcome in ("X", "O", "draw"):
+        count = report["outcomes"].get(outcome, 0)
+        print(f"   {outcome:>4}: {count} ({100 * count / report['games']:.1f}%)")
+    if args.output:
+        print(f"\n📁 Games written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
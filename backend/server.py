@@ -10,8 +10,11 @@ from services.GameService import GameService
 from services.UserInviteService import UserInviteService
 from services.GameInviteService import GameInviteService
 from services.NotificationService import NotificationService
-from database.schema import SessionLocal, Game, User, GameInviteRequest
-from auth import create_token, auth_none, auth_logged_in, auth_as_id, auth_admin, auth_as_id_in_game, auth_as_inviter, get_current_auth_context, AuthContext, require_logged_in, require_admin, require_as_id, require_as_id_in_game, require_as_inviter
+from services.AuthCache import auth_cache
+from services.PasswordHasher import password_hasher, PasswordHashQueueFull
+from database.schema import Game, User, GameInviteRequest
+from database.session import db_session, DBSessionMiddleware, get_pool_stats, get_async_db, DB_ASYNC
+from auth import create_token, auth_none, auth_logged_in, auth_as_id, auth_admin, auth_as_id_in_game, auth_as_inviter, get_current_auth_context, get_current_auth_context_async, AuthContext, require_logged_in, require_admin, require_as_id, require_as_id_in_game, require_as_id_in_game_async, require_as_inviter
 
 import os
 import json
@@ -28,6 +31,7 @@ class UserCreate(BaseModel):
     email: str
     password: str
     admin: bool = False
+    bot: bool = False
 
 class UserUpdate(BaseModel):
     name: Optional[str] = None
@@ -50,6 +54,7 @@ class UserResponse(BaseModel):
     name: str
     username: str
     password_must_reset: bool = False
+    bot: bool = False
 
     class Config:
         from_attributes = True
@@ -202,11 +207,15 @@ class Server:
         self.user_invite_service = user_invite_service
         self.game_invite_service = game_invite_service
         self.notification_service = notification_service
-        self.db = SessionLocal()
+        self.db = db_session
 
         # Add auth middleware - REMOVED, using per-route enforcement instead
         # self.app.add_middleware(AuthMiddleware)
 
+        # Route handlers are plain functions, so FastAPI runs them concurrently on
+        # its thread pool; each request gets its own database session
+        self.app.add_middleware(DBSessionMiddleware)
+
         self._setup_routes()
         self._ensure_www()
         self._setup_spa_middleware()
@@ -243,23 +252,27 @@ class Server:
     def _setup_routes(self):
         """Setup all API routes"""
 
+        # registered first so they take precedence over the sync routes below
+        if DB_ASYNC:
+            self._setup_async_routes()
+
         @self.app.get("/api/health")
         @auth_none()
-        async def health_check(auth_context: AuthContext = Depends(get_current_auth_context)):
+        def health_check(auth_context: AuthContext = Depends(get_current_auth_context)):
             """Health check endpoint"""
             return JSONResponse(content={"status": "ok"})
 
         @self.app.get("/api/config.js", response_class=PlainTextResponse)
         @self.app.get("{path:path}/api/config.js", response_class=PlainTextResponse)
         @auth_none()
-        async def get_config(auth_context: AuthContext = Depends(get_current_auth_context)):
+        def get_config(auth_context: AuthContext = Depends(get_current_auth_context)):
             """Get frontend configuration as JavaScript"""
             base_url = os.getenv("BASE_URL", "/")
             return f"window.__BASE_URL__ = '{base_url}';"
 
         @self.app.get("/api/validate", response_model=UserResponse)
         @auth_logged_in()
-        async def validate(auth_context: AuthContext = Depends(get_current_auth_context)):
+        def validate(auth_context: AuthContext = Depends(get_current_auth_context)):
             """Validate token and return user info"""
             require_logged_in(auth_context)
             user = self.user_service.get_user_by_id(auth_context.user_id)
@@ -271,26 +284,28 @@ class Server:
         
         @self.app.post("/api/login", response_model=LoginResponse)
         @auth_none()
-        async def login(body: LoginRequest, auth_context: AuthContext = Depends(get_current_auth_context)):
+        def login(body: LoginRequest, auth_context: AuthContext = Depends(get_current_auth_context)):
             """Authenticate a user and return JWT token"""
             try:
                 user = self.user_service.authenticate_user(body.username, body.password)
                 if not user:
                     raise HTTPException(status_code=401, detail="Invalid credentials")
                 
-                token = create_token(user.id)
+                token = create_token(user.id, admin=user.admin)
                 return {
                     "token": token,
                     "user": UserResponse.from_orm(user)
                 }
             except HTTPException:
                 raise
+            except PasswordHashQueueFull as e:
+                raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
             except Exception as e:
                 raise HTTPException(status_code=400, detail=str(e))
         
         @self.app.post("/api/users", response_model=UserResponse)
         @auth_admin()
-        async def create_user(user: UserCreate, auth_context: AuthContext = Depends(get_current_auth_context)):
+        def create_user(user: UserCreate, auth_context: AuthContext = Depends(get_current_auth_context)):
             """Create a new user"""
             # Enforce admin requirement
             require_admin(auth_context)
@@ -301,7 +316,8 @@ class Server:
                     username=user.username,
                     email=user.email,
                     password=user.password,
-                    admin=user.admin
+                    admin=user.admin,
+                    bot=user.bot
                 )
                 return UserResponse.from_orm(new_user)
             except Exception as e:
@@ -309,7 +325,7 @@ class Server:
 
         @self.app.get("/api/users/{user_id}", response_model=UserResponse) 
         @auth_logged_in()
-        async def get_user(user_id: int, auth_context: AuthContext = Depends(get_current_auth_context)):
+        def get_user(user_id: int, auth_context: AuthContext = Depends(get_current_auth_context)):
             """Get a user by ID"""
             # Enforce logged in requirement
             require_logged_in(auth_context)
@@ -321,7 +337,7 @@ class Server:
 
         @self.app.get("/api/users", response_model=List[UserResponse])
         @auth_logged_in()
-        async def list_users(auth_context: AuthContext = Depends(get_current_auth_context)):
+        def list_users(auth_context: AuthContext = Depends(get_current_auth_context)):
             """List all users"""
             # Enforce auth requirement
             require_logged_in(auth_context)
@@ -334,7 +350,7 @@ class Server:
 
         @self.app.get("/api/users/username/{username}", response_model=UserResponse)
         @auth_logged_in()
-        async def get_user_by_username(username: str, auth_context: AuthContext = Depends(get_current_auth_context)):
+        def get_user_by_username(username: str, auth_context: AuthContext = Depends(get_current_auth_context)):
             """Get a user by username"""
             # Enforce logged in requirement
             require_logged_in(auth_context)
@@ -346,7 +362,7 @@ class Server:
 
         @self.app.put("/api/users/{user_id}", response_model=UserResponse)
         @auth_as_id(param_name="user_id")
-        async def update_user(user_id: int, user: UserUpdate, auth_context: AuthContext = Depends(get_current_auth_context)):
+        def update_user(user_id: int, user: UserUpdate, auth_context: AuthContext = Depends(get_current_auth_context)):
             """Update a user"""
             # Enforce as_id requirement
             require_as_id(auth_context, user_id)
@@ -359,7 +375,7 @@ class Server:
 
         @self.app.delete("/api/users/{user_id}")
         @auth_as_id(param_name="user_id")
-        async def delete_user(user_id: int, auth_context: AuthContext = Depends(get_current_auth_context)):
+        def delete_user(user_id: int, auth_context: AuthContext = Depends(get_current_auth_context)):
             """Delete a user (soft delete)"""
             # Enforce as_id requirement
             require_as_id(auth_context, user_id)
@@ -371,7 +387,7 @@ class Server:
 
         @self.app.get("/api/users/{user_id}/stats", response_model=UserStatsResponse)
         @auth_logged_in()
-        async def get_user_stats(user_id: int, auth_context: AuthContext = Depends(get_current_auth_context)):
+        def get_user_stats(user_id: int, auth_context: AuthContext = Depends(get_current_auth_context)):
             """Get detailed user statistics including wins, losses, ties, and recent games"""
             # Enforce logged in requirement
             require_logged_in(auth_context)
@@ -465,7 +481,7 @@ class Server:
 
         @self.app.get("/api/scoreboard", response_model=List[ScoreboardEntryResponse])
         @auth_logged_in()
-        async def get_scoreboard(auth_context: AuthContext = Depends(get_current_auth_context)):
+        def get_scoreboard(auth_context: AuthContext = Depends(get_current_auth_context)):
             """Get aggregated stats for all users for global rankings"""
             require_logged_in(auth_context)
 
@@ -509,7 +525,7 @@ class Server:
 
         @self.app.put("/api/admin/users/{user_id}/username", response_model=UserResponse)
         @auth_admin()
-        async def admin_reset_username(user_id: int, request: AdminResetUsernameRequest, auth_context: AuthContext = Depends(get_current_auth_context)):
+        def admin_reset_username(user_id: int, request: AdminResetUsernameRequest, auth_context: AuthContext = Depends(get_current_auth_context)):
             """Reset a user's username (admin only)"""
             require_admin(auth_context)
             
@@ -525,7 +541,7 @@ class Server:
 
         @self.app.put("/api/admin/users/{user_id}/password", response_model=AdminResetPasswordResponse)
         @auth_admin()
-        async def admin_reset_password(user_id: int, auth_context: AuthContext = Depends(get_current_auth_context)):
+        def admin_reset_password(user_id: int, auth_context: AuthContext = Depends(get_current_auth_context)):
             """Reset a user's password with a random one (admin only). User must change on next login."""
             require_admin(auth_context)
             
@@ -545,7 +561,7 @@ class Server:
 
         @self.app.delete("/api/admin/users/{user_id}")
         @auth_admin()
-        async def admin_delete_user(user_id: int, request: AdminDeleteUserRequest, auth_context: AuthContext = Depends(get_current_auth_context)):
+        def admin_delete_user(user_id: int, request: AdminDeleteUserRequest, auth_context: AuthContext = Depends(get_current_auth_context)):
             """Delete a user (admin only, requires confirmation)"""
             require_admin(auth_context)
             
@@ -568,7 +584,7 @@ class Server:
 
         @self.app.post("/api/invite")
         @auth_logged_in()
-        async def create_user_invite(user_invite_create: UserInviteCreate, auth_context: AuthContext = Depends(get_current_auth_context)):
+        def create_user_invite(user_invite_create: UserInviteCreate, auth_context: AuthContext = Depends(get_current_auth_context)):
             """Create a new user invite"""
             # Enforce logged in requirement
             require_logged_in(auth_context)
@@ -585,7 +601,7 @@ class Server:
 
         @self.app.get("/api/invite/{invite_id}", response_model=UserInviteResponse)
         @auth_as_inviter(invite_id_param="invite_id")
-        async def get_user_invite(invite_id: int, auth_context: AuthContext = Depends(get_current_auth_context)):
+        def get_user_invite(invite_id: int, auth_context: AuthContext = Depends(get_current_auth_context)):
             """Get a user invite by ID"""
             # Enforce as_inviter requirement
             require_as_inviter(auth_context, invite_id)
@@ -597,7 +613,7 @@ class Server:
 
         @self.app.delete("/api/invite/{invite_id}")
         @auth_as_inviter(invite_id_param="invite_id")
-        async def delete_user_invite(invite_id: int, auth_context: AuthContext = Depends(get_current_auth_context)):
+        def delete_user_invite(invite_id: int, auth_context: AuthContext = Depends(get_current_auth_context)):
             """Delete a user invite by ID"""
             # Enforce as_inviter requirement
             require_as_inviter(auth_context, invite_id)
@@ -609,7 +625,7 @@ class Server:
 
         @self.app.post("/api/invite/use", response_model=UserInviteResponse)
         @auth_none()
-        async def use_user_invite(user_invite_use: UserInviteUse, auth_context: AuthContext = Depends(get_current_auth_context)):
+        def use_user_invite(user_invite_use: UserInviteUse, auth_context: AuthContext = Depends(get_current_auth_context)):
             """Use a user invite to create a new user"""
             try:
                 user_invite = self.user_invite_service.use_user_invite(
@@ -627,7 +643,7 @@ class Server:
 
         @self.app.post("/api/games", response_model=GameResponse)
         @auth_logged_in()
-        async def create_game(game: GameCreate, auth_context: AuthContext = Depends(get_current_auth_context)):
+        def create_game(game: GameCreate, auth_context: AuthContext = Depends(get_current_auth_context)):
             """Create a new game"""
             # Enforce logged in requirement
             require_logged_in(auth_context)
@@ -642,7 +658,7 @@ class Server:
 
         @self.app.get("/api/games/{game_id}", response_model=GameResponse)
         @auth_as_id_in_game(game_id_param="game_id")
-        async def get_game(game_id: int, auth_context: AuthContext = Depends(get_current_auth_context)):
+        def get_game(game_id: int, auth_context: AuthContext = Depends(get_current_auth_context)):
             """Get a game by ID with full state"""
             # Enforce as_id_in_game requirement
             require_as_id_in_game(auth_context, game_id)
@@ -654,7 +670,7 @@ class Server:
 
         @self.app.get("/api/games/{game_id}/spectate", response_model=GameResponse)
         @auth_logged_in()
-        async def spectate_game(game_id: int, auth_context: AuthContext = Depends(get_current_auth_context)):
+        def spectate_game(game_id: int, auth_context: AuthContext = Depends(get_current_auth_context)):
             """Get a game by ID for spectating — accessible to any logged-in user"""
             require_logged_in(auth_context)
 
@@ -663,9 +679,42 @@ class Server:
             except Exception as e:
                 raise HTTPException(status_code=404, detail=str(e))
 
+        @self.app.get("/api/games/{game_id}/legal-moves", response_model=List[Dict[str, str]])
+        @auth_logged_in()
+        def get_legal_moves(game_id: int, auth_context: AuthContext = Depends(get_current_auth_context)):
+            """List the corner/position pairs that can be played next"""
+            require_logged_in(auth_context)
+
+            try:
+                return self.game_service.get_legal_moves(game_id)
+            except Exception as e:
+                raise HTTPException(status_code=404, detail=str(e))
+
+        @self.app.get("/api/games/{game_id}/history")
+        @auth_logged_in()
+        def get_game_history(game_id: int, start: int = 0, stop: Optional[int] = None, auth_context: AuthContext = Depends(get_current_auth_context)):
+            """Get the states of a game (moves start..stop) rebuilt from its move list — accessible to any logged-in user"""
+            require_logged_in(auth_context)
+
+            try:
+                return self.game_service.get_game_history(game_id, start=start, stop=stop)
+            except Exception as e:
+                raise HTTPException(status_code=404, detail=str(e))
+
+        @self.app.get("/api/games/{game_id}/analysis")
+        @auth_logged_in()
+        def analyze_game(game_id: int, time_limit: float = 1.0, max_depth: Optional[int] = None, auth_context: AuthContext = Depends(get_current_auth_context)):
+            """Search the current position for the best move within time_limit seconds"""
+            require_logged_in(auth_context)
+
+            try:
+                return self.game_service.analyze_game(game_id, time_limit=time_limit, max_depth=max_depth)
+            except Exception as e:
+                raise HTTPException(status_code=400, detail=str(e))
+
         @self.app.post("/api/games/{game_id}/fork", response_model=GameResponse)
         @auth_logged_in()
-        async def fork_game(game_id: int, fork_request: GameForkRequest, auth_context: AuthContext = Depends(get_current_auth_context)):
+        def fork_game(game_id: int, fork_request: GameForkRequest, auth_context: AuthContext = Depends(get_current_auth_context)):
             """Fork a game from a specific move, creating a new playable game"""
             require_logged_in(auth_context)
 
@@ -681,7 +730,7 @@ class Server:
 
         @self.app.get("/api/games/{game_id}/ascii", response_model=str)
         @auth_as_id_in_game(game_id_param="game_id")
-        async def get_game_ascii(game_id: int, auth_context: AuthContext = Depends(get_current_auth_context)):
+        def get_game_ascii(game_id: int, auth_context: AuthContext = Depends(get_current_auth_context)):
             """Get a game's ASCII representation"""
             # Enforce as_id_in_game requirement
             require_as_id_in_game(auth_context, game_id)
@@ -693,7 +742,7 @@ class Server:
 
         @self.app.get("/api/games", response_model=List[GameResponse])
         @auth_admin()
-        async def list_games(auth_context: AuthContext = Depends(get_current_auth_context)):
+        def list_games(auth_context: AuthContext = Depends(get_current_auth_context)):
             """List all games"""
             # Enforce admin requirement
             require_admin(auth_context)
@@ -704,7 +753,7 @@ class Server:
         
         @self.app.get("/api/games/user/{user_id}", response_model=List[GameResponse])
         @auth_as_id(param_name="user_id")
-        async def list_games_by_user(user_id: int, auth_context: AuthContext = Depends(get_current_auth_context)):
+        def list_games_by_user(user_id: int, auth_context: AuthContext = Depends(get_current_auth_context)):
             """List all games for a specific user"""
             # Enforce as_id requirement
             require_as_id(auth_context, user_id)
@@ -714,66 +763,45 @@ class Server:
 
         @self.app.get("/api/games/user/{user_id}/your-turn", response_model=List[GameResponse])
         @auth_as_id(param_name="user_id")
-        async def list_games_user_turn(user_id: int, auth_context: AuthContext = Depends(get_current_auth_context)):
+        def list_games_user_turn(user_id: int, auth_context: AuthContext = Depends(get_current_auth_context)):
             """List games where it's the user's turn"""
             # Enforce as_id requirement
             require_as_id(auth_context, user_id)
             
             games = self.game_service.list_games_user_turn(user_id)
-            result = []
-            for g in games:
-                try:
-                    game_data = self.game_service.get_game(g.id)
-                    result.append(game_data)
-                except Exception as e:
-                    # Skip games that fail to load
-                    print(f"Error loading game {g.id}: {e}")
-            return result
+            # one bulk load; games that fail to load are skipped
+            return self.game_service.get_games([g.id for g in games])
 
         @self.app.get("/api/games/user/{user_id}/opponent-turn", response_model=List[GameResponse])
         @auth_as_id(param_name="user_id")
-        async def list_games_opponent_turn(user_id: int, auth_context: AuthContext = Depends(get_current_auth_context)):
+        def list_games_opponent_turn(user_id: int, auth_context: AuthContext = Depends(get_current_auth_context)):
             """List games where it's the opponent's turn"""
             # Enforce as_id requirement
             require_as_id(auth_context, user_id)
             
             games = self.game_service.list_games_opponent_turn(user_id)
-            result = []
-            for g in games:
-                try:
-                    game_data = self.game_service.get_game(g.id)
-                    result.append(game_data)
-                except Exception as e:
-                    # Skip games that fail to load
-                    print(f"Error loading game {g.id}: {e}")
-            return result
+            # one bulk load; games that fail to load are skipped
+            return self.game_service.get_games([g.id for g in games])
 
         @self.app.get("/api/games/user/{user_id}/finished", response_model=List[GameResponse])
         @auth_as_id(param_name="user_id")
-        async def list_games_finished(user_id: int, auth_context: AuthContext = Depends(get_current_auth_context)):
+        def list_games_finished(user_id: int, auth_context: AuthContext = Depends(get_current_auth_context)):
             """List finished games for a user"""
             # Enforce as_id requirement
             require_as_id(auth_context, user_id)
             
             games = self.game_service.list_games_finished(user_id)
-            result = []
-            for g in games:
-                try:
-                    game_data = self.game_service.get_game(g.id)
-                    result.append(game_data)
-                except Exception as e:
-                    # Skip games that fail to load
-                    print(f"Error loading game {g.id}: {e}")
-            return result
+            # one bulk load; games that fail to load are skipped
+            return self.game_service.get_games([g.id for g in games])
 
         @self.app.post("/api/games/{game_id}/turn", response_model=GameResponse)
         @auth_as_id_in_game(game_id_param="game_id")
-        async def take_turn(game_id: int, turn: GameTurn, auth_context: AuthContext = Depends(get_current_auth_context)):
+        def take_turn(game_id: int, turn: GameTurn, auth_context: AuthContext = Depends(get_current_auth_context)):
             """Execute a turn in a game"""
             # Enforce as_id_in_game requirement
             require_as_id_in_game(auth_context, game_id)
             
-            player = 'X' if auth_context.user_id == self.game_service.get_game(game_id)["x_user_id"] else 'O'
+            player = 'X' if auth_context.user_id == self.game_service.get_game_record(game_id).x_user_id else 'O'
 
             try:
                 return self.game_service.take_turn(
@@ -787,7 +815,7 @@ class Server:
 
         @self.app.delete("/api/games/{game_id}")
         @auth_admin()
-        async def delete_game(game_id: int, auth_context: AuthContext = Depends(get_current_auth_context)):
+        def delete_game(game_id: int, auth_context: AuthContext = Depends(get_current_auth_context)):
             """Delete a game (admin only)"""
             # Enforce admin requirement
             require_admin(auth_context)
@@ -800,7 +828,7 @@ class Server:
 
         @self.app.get("/api/games/export/zip")
         @auth_admin()
-        async def export_games(auth_context: AuthContext = Depends(get_current_auth_context)):
+        def export_games(auth_context: AuthContext = Depends(get_current_auth_context)):
             """Export all games as a zipped JSON archive (admin only)"""
             # Enforce admin requirement
             require_admin(auth_context)
@@ -813,21 +841,11 @@ class Server:
                 zip_buffer = io.BytesIO()
                 with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
                     for game in games:
-                        # Get game state (from DB or file)
+                        # Get game state (from DB or file, in whichever format it is stored)
                         game_data = None
-                        db_type = os.environ.get("DB_TYPE", "sqlite").lower()
-                        
-                        if db_type == "postgres":
-                            # Get from database
-                            if game.game_state:
-                                game_data = game.game_state
-                        else:
-                            # Get from JSON file
-                            games_dir = os.path.join(os.environ.get("DATA_DIR", "./devdata"), "games")
-                            file_path = os.path.join(games_dir, f"{game.id}.json")
-                            if os.path.exists(file_path):
-                                with open(file_path, 'r') as f:
-                                    game_data = json.load(f)
+                        stored_game = self.game_service.game_file_service.load_game(game.id)
+                        if stored_game:
+                            game_data = self.game_service.game_file_service._serialize_game(stored_game)
                         
                         if game_data:
                             # Add to zip
@@ -844,9 +862,52 @@ class Server:
             except Exception as e:
                 raise HTTPException(status_code=400, detail=str(e))
 
+        @self.app.get("/api/games/cache/stats")
+        @auth_admin()
+        def get_game_cache_stats(auth_context: AuthContext = Depends(get_current_auth_context)):
+            """Game cache hit/miss/eviction counters and write-behind totals (admin only)"""
+            require_admin(auth_context)
+            
+            return self.game_service.game_file_service.get_cache_stats()
+
+        @self.app.get("/api/bots/stats")
+        @auth_admin()
+        def get_bot_stats(auth_context: AuthContext = Depends(get_current_auth_context)):
+            """Bot move counts, opening book hits and search playouts per second (admin only)"""
+            require_admin(auth_context)
+            
+            bot_service = self.game_service.bot_service
+            if bot_service is None:
+                return {"enabled": False}
+            return {"enabled": True, **bot_service.get_stats()}
+
+        @self.app.get("/api/db/pool/stats")
+        @auth_admin()
+        def get_db_pool_stats(auth_context: AuthContext = Depends(get_current_auth_context)):
+            """Database connection pool usage and request session counters (admin only)"""
+            require_admin(auth_context)
+            
+            return get_pool_stats()
+
+        @self.app.get("/api/auth/cache/stats")
+        @auth_admin()
+        def get_auth_cache_stats(auth_context: AuthContext = Depends(get_current_auth_context)):
+            """Auth cache hit/miss counters for user and game membership lookups (admin only)"""
+            require_admin(auth_context)
+            
+            return auth_cache.get_stats()
+
+        @self.app.get("/api/auth/password-hash/stats")
+        @auth_admin()
+        def get_password_hash_stats(auth_context: AuthContext = Depends(get_current_auth_context)):
+            """Password hashing pool usage, queue rejections and timings (admin only)"""
+            require_admin(auth_context)
+            
+            return password_hasher.get_stats()
+
         @self.app.post("/api/game-invites", response_model=GameInviteResponse)
         @auth_logged_in()
-        async def create_game_invite(invite: GameInviteCreate, auth_context: AuthContext = Depends(get_current_auth_context)):
+        def create_game_invite(invite: GameInviteCreate, auth_context: AuthContext = Depends(get_current_auth_context)):
             """Create a game invite"""
             require_logged_in(auth_context)
             
@@ -864,7 +925,7 @@ class Server:
 
         @self.app.get("/api/game-invites/", response_model=List[GameInviteResponse])
         @auth_admin()
-        async def list_all_game_invites(auth_context: AuthContext = Depends(get_current_auth_context)):
+        def list_all_game_invites(auth_context: AuthContext = Depends(get_current_auth_context)):
             """List game invites"""
             require_admin(auth_context)
             
@@ -876,7 +937,7 @@ class Server:
 
         @self.app.get("/api/game-invites/unused", response_model=List[GameInviteResponse])
         @auth_admin()
-        async def list_all_unused_game_invites(auth_context: AuthContext = Depends(get_current_auth_context)):
+        def list_all_unused_game_invites(auth_context: AuthContext = Depends(get_current_auth_context)):
             """List all unreviewed game invites"""
             require_admin(auth_context)
             
@@ -888,7 +949,7 @@ class Server:
 
         @self.app.get("/api/game-invites/{invite_id}", response_model=GameInviteResponse)
         @auth_logged_in()
-        async def get_game_invite(invite_id: int, auth_context: AuthContext = Depends(get_current_auth_context)):
+        def get_game_invite(invite_id: int, auth_context: AuthContext = Depends(get_current_auth_context)):
             """Get a game invite by ID"""
             require_logged_in(auth_context)
             
@@ -905,7 +966,7 @@ class Server:
 
         @self.app.get("/api/game-invites/user/{user_id}", response_model=List[GameInviteResponse])
         @auth_as_id(param_name="user_id")
-        async def list_game_invites_for_user(user_id: int, auth_context: AuthContext = Depends(get_current_auth_context)):
+        def list_game_invites_for_user(user_id: int, auth_context: AuthContext = Depends(get_current_auth_context)):
             """Get all pending game invites for a user (as recipient)"""
             # Enforce as_id requirement
             require_as_id(auth_context, user_id)
@@ -918,7 +979,7 @@ class Server:
 
         @self.app.post("/api/game-invites/{invite_id}/accept")
         @auth_logged_in()
-        async def accept_game_invite(invite_id: int, accept_data: GameInviteAccept, auth_context: AuthContext = Depends(get_current_auth_context)):
+        def accept_game_invite(invite_id: int, accept_data: GameInviteAccept, auth_context: AuthContext = Depends(get_current_auth_context)):
             """Accept a game invite"""
             require_logged_in(auth_context)
             
@@ -945,7 +1006,7 @@ class Server:
 
         @self.app.post("/api/game-invites/{invite_id}/decline")
         @auth_logged_in()
-        async def decline_game_invite(invite_id: int, auth_context: AuthContext = Depends(get_current_auth_context)):
+        def decline_game_invite(invite_id: int, auth_context: AuthContext = Depends(get_current_auth_context)):
             """Decline a game invite"""
             require_logged_in(auth_context)
             
@@ -968,6 +1029,52 @@ class Server:
             except Exception as e:
                 raise HTTPException(status_code=500, detail=str(e))
 
+    def _setup_async_routes(self):
+        """
+        Async versions of the hot game read routes (DB_ASYNC): they query
+        through the AsyncEngine and never block the event loop, so in-flight
+        requests don't queue behind each other or the thread pool. Turns use
+        the sync route (see GameService's async data layer).
+        """
+
+        @self.app.get("/api/games/{game_id}", response_model=GameResponse)
+        @auth_as_id_in_game(game_id_param="game_id")
+        async def get_game(game_id: int, session=Depends(get_async_db), auth_context: AuthContext = Depends(get_current_auth_context_async)):
+            """Get a game by ID with full state"""
+            await require_as_id_in_game_async(auth_context, game_id, session)
+            
+            try:
+                return await self.game_service.get_game_async(session, game_id)
+            except Exception as e:
+                raise HTTPException(status_code=400, detail=str(e))
+
+        @self.app.get("/api/games/user/{user_id}/your-turn", response_model=List[GameResponse])
+        @auth_as_id(param_name="user_id")
+        async def list_games_user_turn(user_id: int, session=Depends(get_async_db), auth_context: AuthContext = Depends(get_current_auth_context_async)):
+            """List games where it's the user's turn"""
+            require_as_id(auth_context, user_id)
+            
+            games = await self.game_service.list_games_user_turn_async(session, user_id)
+            return await self.game_service.get_games_async(session, [g.id for g in games])
+
+        @self.app.get("/api/games/user/{user_id}/opponent-turn", response_model=List[GameResponse])
+        @auth_as_id(param_name="user_id")
+        async def list_games_opponent_turn(user_id: int, session=Depends(get_async_db), auth_context: AuthContext = Depends(get_current_auth_context_async)):
+            """List games where it's the opponent's turn"""
+            require_as_id(auth_context, user_id)
+            
+            games = await self.game_service.list_games_opponent_turn_async(session, user_id)
+            return await self.game_service.get_games_async(session, [g.id for g in games])
+
+        @self.app.get("/api/games/user/{user_id}/finished", response_model=List[GameResponse])
+        @auth_as_id(param_name="user_id")
+        async def list_games_finished(user_id: int, session=Depends(get_async_db), auth_context: AuthContext = Depends(get_current_auth_context_async)):
+            """List finished games for a user"""
+            require_as_id(auth_context, user_id)
+            
+            games = await self.game_service.list_games_finished_async(session, user_id)
+            return await self.game_service.get_games_async(session, [g.id for g in games])
+
     def run(self, host: str = "0.0.0.0", port: int = 8080):
         """Run the server"""
         import uvicorn
@@ -0,0 +1,137 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+# Auth facts (users' admin flags, games' players) kept in memory, up to
+# AUTH_CACHE_SIZE of each (0 disables the cache) for AUTH_CACHE_TTL seconds.
+AUTH_CACHE_SIZE = int(os.environ.get("AUTH_CACHE_SIZE", "4096"))
+AUTH_CACHE_TTL = float(os.environ.get("AUTH_CACHE_TTL", "30"))
+
+
+class AuthCache:
+    """
+    Bounded, short-lived cache of what the auth checks look up on every
+    request: each user's admin flag and each game's two players.
+
+    UserService invalidates a user whenever it changes or deletes them and
+    GameService invalidates a game it deletes, so within this process the
+    cache is never stale; the TTL bounds staleness from writes made by
+    anything else.
+
+    It also remembers when each user last changed (for the max_size most
+    recently changed users), which tells auth.py whether the claims in an
+    older token still hold.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        if max_size < 0:
+            raise ValueError("Auth cache size can't be negative")
+        self.max_size = max_size
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        # key -> (value, stored_at), least recently used first
+        self.users: "OrderedDict[int, Tuple[bool, float]]" = OrderedDict()
+        self.games: "OrderedDict[int, Tuple[Tuple[int, int], float]]" = OrderedDict()
+        # user_id -> wall clock time of the user's last change, oldest first
+        self.changed_at: "OrderedDict[int, float]" = OrderedDict()
+        # every change since this time is in changed_at: process start, or the
+        # latest change that had to be forgotten to keep changed_at bounded
+        self.changes_since = time.time()
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _get(self, entries: OrderedDict, key: int) -> Any:
+        with self.lock:
+            entry = entries.get(key)
+            if entry is None or time.monotonic() - entry[1] > self.ttl:
+                entries.pop(key, None)
+                self.misses += 1
+                return None
+            entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def _put(self, entries: OrderedDict, key: int, value: Any) -> None:
+        entries[key] = (value, time.monotonic())
+        entries.move_to_end(key)
+        while len(entries) > self.max_size:
+            entries.popitem(last=False)
+
+    def get_user_admin(self, user_id: int) -> Optional[bool]:
+        """The user's cached admin flag, or None on a miss."""
+        return self._get(self.users, user_id)
+
+    def put_user(self, user_id: int, admin: bool, loaded_at: float) -> None:
+        """
+        Cache a user's admin flag.
+
+        Args:
+            user_id: The user's ID
+            admin: The admin flag as read from the database
+            loaded_at: time.time() from before the read; if the user changed
+                since, the value may be stale and isn't cached
+        """
+        with self.lock:
+            if self.changed_at.get(user_id, 0.0) >= loaded_at or self.changes_since >= loaded_at:
+                return
+            self._put(self.users, user_id, bool(admin))
+
+    def get_game_players(self, game_id: int) -> Optional[Tuple[int, int]]:
+        """The game's cached (x_user_id, o_user_id), or None on a miss."""
+        return self._get(self.games, game_id)
+
+    def put_game(self, game_id: int, x_user_id: int, o_user_id: int) -> None:
+        """Cache a game's players (they never change while the game exists)."""
+        with self.lock:
+            self._put(self.games, game_id, (x_user_id, o_user_id))
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Drop a user after a change, and record when it happened."""
+        with self.lock:
+            self.users.pop(user_id, None)
+            self.changed_at[user_id] = time.time()
+            self.changed_at.move_to_end(user_id)
+            while len(self.changed_at) > self.max_size:
+                _, forgotten_at = self.changed_at.popitem(last=False)
+                self.changes_since = max(self.changes_since, forgotten_at)
+            self.invalidations += 1
+
+    def invalidate_game(self, game_id: int) -> None:
+        """Drop a deleted game."""
+        with self.lock:
+            self.games.pop(game_id, None)
+            self.invalidations += 1
+
+    def claims_valid(self, user_id: int, issued_at: float) -> bool:
+        """
+        Whether claims about a user in a token issued at `issued_at` (a Unix
+        timestamp) still hold: every change to the user after the token was
+        issued would be recorded here (it was issued after the process started
+        and after the last change that was forgotten), and there is none.
+        Otherwise the caller looks the user up.
+        """
+        with self.lock:
+            return issued_at > self.changes_since and self.changed_at.get(user_id, 0.0) < issued_at
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "users": len(self.users),
+                "games": len(self.games),
+                "changed_users": len(self.changed_at),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "invalidations": self.invalidations,
+            }
+
+
+# Shared by the auth dependencies and the services that invalidate it
+auth_cache = AuthCache(AUTH_CACHE_SIZE, AUTH_CACHE_TTL)
@@ -0,0 +1,153 @@
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+from typing import Any, Dict, Optional, Tuple
+from datamodels.tictactoe import UltimateTicTacToeGameState
+from datamodels.bitboard import BitboardGameState, CELL_NAMES
+from engines.mcts import MCTSResult, search, parallel_search, default_workers
+from engines.opening_book import OpeningBook
+import os
+import threading
+
+# Search budget per bot move: seconds of thinking and/or a total playout cap.
+# A bot replies within the request of the move it answers, so the time limit
+# is added to the response time of every move played against a bot.
+BOT_TIME_LIMIT = float(os.environ.get("BOT_TIME_LIMIT", "1.0"))
+BOT_PLAYOUTS = int(os.environ.get("BOT_PLAYOUTS", "0")) or None
+
+# Worker processes for root-parallel search (1 searches in-process)
+BOT_WORKERS = int(os.environ.get("BOT_WORKERS", "0")) or default_workers()
+
+# Optional opening book (see build_opening_book.py); book moves need this many games behind them
+OPENING_BOOK_PATH = os.environ.get("OPENING_BOOK_PATH", "")
+BOOK_MIN_GAMES = int(os.environ.get("BOOK_MIN_GAMES", "5"))
+
+
+class BotService:
+    """
+    Chooses moves for bot users with Monte Carlo Tree Search, or from the
+    opening book when one is configured and knows the position.
+    Searches run in a process pool shared by every game. Its workers are
+    spawned rather than forked: the server process has other threads
+    running, and a forked child could inherit one of their locks held.
+    """
+
+    def __init__(
+        self,
+        workers: int = BOT_WORKERS,
+        time_limit: Optional[float] = BOT_TIME_LIMIT,
+        max_playouts: Optional[int] = BOT_PLAYOUTS,
+        opening_book_path: str = OPENING_BOOK_PATH,
+        book_min_games: int = BOOK_MIN_GAMES,
+    ):
+        if time_limit is None and max_playouts is None:
+            raise ValueError("BotService needs a time limit or a playout budget")
+        self.workers = max(1, workers)
+        self.time_limit = time_limit
+        self.max_playouts = max_playouts
+        self.executor: Optional[ProcessPoolExecutor] = None
+
+        self.opening_book: Optional[OpeningBook] = None
+        self.book_min_games = book_min_games
+        if opening_book_path:
+            try:
+                self.opening_book = OpeningBook(opening_book_path)
+                print(f"[BOT] Opening book loaded: {len(self.opening_book)} records")
+            except (OSError, ValueError) as e:
+                print(f"Warning: Could not open opening book {opening_book_path}: {e}")
+
+        self.last_result: Optional[MCTSResult] = None
+        self.moves_played = 0
+        self.book_moves = 0
+        self.total_playouts = 0
+        self.total_search_time = 0.0
+        # games are played from concurrent requests; guards the executor and counters
+        self.lock = threading.Lock()
+
+    def choose_move(self, state: UltimateTicTacToeGameState) -> Tuple[str, str]:
+        """
+        Search the position and return the bot's move.
+
+        Args:
+            state: The current game state; the bot plays the side to move
+
+        Returns:
+            The (corner, position) names of the chosen move
+
+        Raises:
+            ValueError: If there is no legal move
+        """
+        board = BitboardGameState.from_game_state(state)
+
+        # well-known positions skip the search
+        if self.opening_book is not None:
+            book_move = self.opening_book.best_move(board, min_games=self.book_min_games)
+            if book_move is not None:
+                with self.lock:
+                    self.moves_played += 1
+                    self.book_moves += 1
+                print(f"[BOT] Book move from {book_move.games} game(s), score {book_move.score:.2f}")
+                return book_move.corner, book_move.position
+
+        if self.workers > 1:
+            result = parallel_search(
+                self._get_executor(),
+                self.workers,
+                board,
+                time_limit=self.time_limit,
+                max_playouts=self.max_playouts,
+            )
+        else:
+            result = search(board, time_limit=self.time_limit, max_playouts=self.max_playouts)
+
+        if result.move is None:
+            raise ValueError("The bot has no legal move to play")
+
+        with self.lock:
+            self.last_result = result
+            self.moves_played += 1
+            self.total_playouts += result.playouts
+            self.total_search_time += result.elapsed
+        print(
+            f"[BOT] {result.playouts} playouts in {result.elapsed:.2f}s "
+            f"({result.playouts_per_second:.0f} playouts/s, {self.workers} worker(s)), "
+            f"expected score {result.win_rate:.2f}"
+        )
+
+        corner, position = result.move
+        return CELL_NAMES[9 * corner + position]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Search throughput counters, for tracking engine speed.
+
+        Returns:
+            Dictionary with move and playout totals and playouts per second
+        """
+        with self.lock:
+            return {
+                "workers": self.workers,
+                "moves_played": self.moves_played,
+                "book_moves": self.book_moves,
+                "total_playouts": self.total_playouts,
+                "total_search_time": self.total_search_time,
+                "playouts_per_second": self.total_playouts / self.total_search_time if self.total_search_time else 0.0,
+                "last_playouts_per_second": self.last_result.playouts_per_second if self.last_result else 0.0,
+            }
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self.lock:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self.executor
+
+    def close(self):
+        """Shut down the search worker processes."""
+        with self.lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        if self.opening_book is not None:
+            self.opening_book.close()
+            self.opening_book = None
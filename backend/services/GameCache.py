@@ -0,0 +1,126 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from datamodels.tictactoe import UltimateTicTacToe
+
+
+class GameCache:
+    """
+    Bounded LRU cache of live UltimateTicTacToe objects keyed by game ID.
+
+    Entries expire `ttl` seconds after they were loaded or stored, which
+    bounds how stale a game can get if something other than this process
+    writes it. Entries can be marked dirty (changed but not yet persisted);
+    GameFileService flushes those and never lets one drop out unsaved.
+
+    Games are copied on the way in and out, so a caller changing its game
+    (a turn in progress) is never seen by other readers, and a change that
+    fails to save never reaches the cache.
+
+    All access goes through `lock`, which is only held for the cache's own
+    bookkeeping.
+
+    The cache is per process: with several server processes sharing one
+    database, each serves its own copy until the TTL runs out, so enable it
+    only when a single process serves the games.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        if max_size < 1:
+            raise ValueError("Game cache size must be at least 1")
+        self.max_size = max_size
+        self.ttl = ttl
+        self.lock = threading.RLock()
+        # game_id -> (game, stored_at), least recently used first
+        self.entries: "OrderedDict[int, Tuple[UltimateTicTacToe, float]]" = OrderedDict()
+        self.dirty: set = set()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, game_id: int) -> Optional[UltimateTicTacToe]:
+        """A copy of the cached game, or None on a miss or if the entry has expired (and is clean)."""
+        with self.lock:
+            entry = self.entries.get(game_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            game, stored_at = entry
+            if time.monotonic() - stored_at > self.ttl and game_id not in self.dirty:
+                del self.entries[game_id]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self.entries.move_to_end(game_id)
+            self.hits += 1
+            return game.copy()
+
+    def put(self, game_id: int, game: UltimateTicTacToe, dirty: bool = False) -> List[Tuple[int, UltimateTicTacToe]]:
+        """
+        Cache a copy of a game. Returns the dirty entries pushed out to make
+        room, which the caller must persist.
+        """
+        game = game.copy()
+        with self.lock:
+            self.entries[game_id] = (game, time.monotonic())
+            self.entries.move_to_end(game_id)
+            if dirty:
+                self.dirty.add(game_id)
+
+            evicted = []
+            while len(self.entries) > self.max_size:
+                old_id, (old_game, _) = self.entries.popitem(last=False)
+                self.evictions += 1
+                if old_id in self.dirty:
+                    self.dirty.discard(old_id)
+                    evicted.append((old_id, old_game))
+            return evicted
+
+    def invalidate(self, game_id: int) -> None:
+        """Drop a game (and any pending write for it)."""
+        with self.lock:
+            self.entries.pop(game_id, None)
+            self.dirty.discard(game_id)
+
+    def keep_dirty(self, game_id: int, game: UltimateTicTacToe) -> None:
+        """
+        Put back a dirty game that was pushed out but couldn't be written yet,
+        as the next in line for eviction. The cache may briefly exceed its size.
+        """
+        with self.lock:
+            if game_id in self.entries:
+                self.dirty.add(game_id)
+                return
+            self.entries[game_id] = (game, time.monotonic())
+            self.entries.move_to_end(game_id, last=False)
+            self.dirty.add(game_id)
+
+    def mark_dirty(self, game_ids: List[int]) -> None:
+        """Mark games that are still cached as needing a write again (after a failed flush)."""
+        with self.lock:
+            self.dirty.update(game_id for game_id in game_ids if game_id in self.entries)
+
+    def take_dirty(self) -> List[Tuple[int, UltimateTicTacToe]]:
+        """Clear the dirty set and return those games (not copies: don't change them), for persisting."""
+        with self.lock:
+            games = [(game_id, self.entries[game_id][0]) for game_id in self.dirty if game_id in self.entries]
+            self.dirty.clear()
+            return games
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self.entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "dirty": len(self.dirty),
+            }
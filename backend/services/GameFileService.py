@@ -1,25 +1,143 @@
+import asyncio
 import json
 import os
 import datetime
-from typing import Optional
-from datamodels.tictactoe import UltimateTicTacToe
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import JSONB
+from datamodels.tictactoe import UltimateTicTacToe, UltimateTicTacToeGameState, Move, CHECKPOINT_INTERVAL
+from datamodels.zobrist import format_hash
+from datamodels.game_codec import encode_game, decode_game, decode_current_state, CURRENT_STATE_BYTES
 from services.TicTacToeService import TicTacToeService
+from services.GameCache import GameCache
 from database.schema import SessionLocal, Game, User
+from database.session import db_session
 
 DATA_DIR = os.environ.get("DATA_DIR", "./devdata")
 DB_TYPE = os.environ.get("DB_TYPE", "sqlite").lower()
 GAMES_DIR = os.path.join(DATA_DIR, "games")
 
+# File storage mode (SQLite mode only): "json" rewrites the game file on every
+# turn; "movelog" appends each turn to {id}.log and compacts the log into a
+# game file once the game finishes.
+GAME_STORAGE = os.environ.get("GAME_STORAGE", "json").lower()
+GAME_STORAGES = ("json", "movelog")
+
+# Encoding of stored games: "json" documents, or the compact "binary" codec
+# (datamodels/game_codec.py) in {id}.bin files / the games.game_state_bin column.
+# Either format is read regardless of this setting.
+GAME_FORMAT = os.environ.get("GAME_FORMAT", "json").lower()
+GAME_FORMATS = ("json", "binary")
+GAME_FILE_EXTENSIONS = {"json": ".json", "binary": ".bin"}
+
+# Live games kept in memory (0, the default, disables the cache); entries are
+# reloaded from storage GAME_CACHE_TTL seconds after they were cached. The
+# cache is per process, so only enable it when a single server process (one
+# uvicorn worker, one replica) serves the games: others would keep serving
+# their cached copy of a game for up to GAME_CACHE_TTL after it changed.
+GAME_CACHE_SIZE = int(os.environ.get("GAME_CACHE_SIZE", "0"))
+GAME_CACHE_TTL = float(os.environ.get("GAME_CACHE_TTL", "300"))
+
+# Write-behind: when above 0, saves only mark the cached game dirty and a
+# background thread persists dirty games every GAME_WRITE_BEHIND seconds,
+# together with their database record's turn, result and move count, so the
+# record is never ahead of the stored game (and turn lists built from the
+# records lag by up to that long). Needs the cache. Call close() on shutdown
+# to flush pending writes.
+GAME_WRITE_BEHIND = float(os.environ.get("GAME_WRITE_BEHIND", "0"))
+
+# Directory layout of game files (SQLite mode): "flat" keeps every file in
+# DATA_DIR/games; "sharded" writes to DATA_DIR/games/ab/cd/ (see shard_dir) so
+# no single directory grows huge. Files are found in either place, and the
+# layout migrator moves flat files into their shards GAME_LAYOUT_MIGRATE_BATCH
+# at a time, every GAME_LAYOUT_MIGRATE_INTERVAL seconds.
+GAME_LAYOUT = os.environ.get("GAME_LAYOUT", "flat").lower()
+GAME_LAYOUTS = ("flat", "sharded")
+GAME_LAYOUT_MIGRATE_BATCH = int(os.environ.get("GAME_LAYOUT_MIGRATE_BATCH", "500"))
+GAME_LAYOUT_MIGRATE_INTERVAL = float(os.environ.get("GAME_LAYOUT_MIGRATE_INTERVAL", "1"))
+
+# Threads reading game files in parallel for load_games (SQLite mode)
+GAME_LOAD_WORKERS = int(os.environ.get("GAME_LOAD_WORKERS", "8"))
+
+# Game and game file locks are striped by game ID so different games never
+# wait on each other
+GAME_LOCK_STRIPES = 64
+FILE_LOCK_STRIPES = 64
+
+GAME_FILE_SUFFIXES = tuple(GAME_FILE_EXTENSIONS.values()) + (".log",)
+
 # Only create games directory for SQLite
 if DB_TYPE == "sqlite":
     os.makedirs(GAMES_DIR, exist_ok=True)
 
 
+class GameSlice(NamedTuple):
+    """Part of a game's history, from GameFileService.load_game_slice."""
+    current_game: UltimateTicTacToeGameState
+    start: int                          # index of the first move in moves
+    state: UltimateTicTacToeGameState   # the state before moves[0]
+    moves: List[Move]
+    move_count: int                     # moves in the whole game
+
+
+def shard_dir(game_id: int) -> str:
+    """Directory of a game's files in the sharded layout: the low two bytes of its ID, in hex."""
+    return os.path.join(GAMES_DIR, f"{game_id & 0xFF:02x}", f"{(game_id >> 8) & 0xFF:02x}")
+
+
+def parse_game_file_name(file_name: str) -> Optional[int]:
+    """The game ID of a stored game file name ({id}.json/.bin/.log), or None for anything else."""
+    stem, ext = os.path.splitext(file_name)
+    if ext in GAME_FILE_SUFFIXES and stem.isdigit():
+        return int(stem)
+    return None
+
+
 class GameFileService:
-    def __init__(self, tictactoe_service: TicTacToeService):
+    def __init__(
+        self,
+        tictactoe_service: TicTacToeService,
+        storage: str = GAME_STORAGE,
+        game_format: str = GAME_FORMAT,
+        cache_size: int = GAME_CACHE_SIZE,
+        cache_ttl: float = GAME_CACHE_TTL,
+        write_behind: float = GAME_WRITE_BEHIND,
+        layout: str = GAME_LAYOUT,
+    ):
+        if storage not in GAME_STORAGES:
+            raise ValueError(f"Unknown game storage '{storage}', expected one of {GAME_STORAGES}")
+        if game_format not in GAME_FORMATS:
+            raise ValueError(f"Unknown game format '{game_format}', expected one of {GAME_FORMATS}")
+        if layout not in GAME_LAYOUTS:
+            raise ValueError(f"Unknown game layout '{layout}', expected one of {GAME_LAYOUTS}")
+        if write_behind > 0 and cache_size < 1:
+            raise ValueError("Write-behind needs the game cache (GAME_CACHE_SIZE > 0)")
         self.tictactoe_service = tictactoe_service
-        self.db = SessionLocal()
+        self.game_format = game_format
+        self.db = db_session
         self.use_db = DB_TYPE == "postgres"
+        self.use_log = not self.use_db and storage == "movelog"
+        self.sharded = layout == "sharded"
+        # serialize a game's file reads and writes with the layout migrator's moves
+        self.file_locks = [threading.RLock() for _ in range(FILE_LOCK_STRIPES)]
+        self.load_workers = GAME_LOAD_WORKERS
+        self._load_pool: Optional[ThreadPoolExecutor] = None
+
+        self.cache: Optional[GameCache] = GameCache(cache_size, cache_ttl) if cache_size > 0 else None
+        # held by GameService around a whole turn; taken before the cache and file locks
+        self.game_locks = [threading.RLock() for _ in range(GAME_LOCK_STRIPES)]
+        self.write_behind = write_behind
+        self.saves = 0
+        self.writes = 0
+        self._stop_flusher = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        if write_behind > 0:
+            self._flusher = threading.Thread(target=self._flush_loop, name="game-write-behind", daemon=True)
+            self._flusher.start()
+        self._stop_migrator = threading.Event()
+        self._migrator: Optional[threading.Thread] = None
 
     def start_new_game(self, game_id: int) -> UltimateTicTacToe:
         """
@@ -37,7 +155,9 @@ class GameFileService:
             raise ValueError(f"Game with ID {game_id} not found in database")
         
         game = self.tictactoe_service.init_empty_game()
+        self.update_game_record(game_record, game)
         self.save_game(game_id, game)
+        self.db.commit()
         return game
 
     def take_turn(self, game_id: int, game: UltimateTicTacToe, player: str, corner: str, position: str) -> None:
@@ -51,47 +171,124 @@ class GameFileService:
             corner: The corner to play in (e.g., 'topleft', 'center', etc.)
             position: The position within the corner (e.g., 'topleft', 'center', etc.)
         """
-        self.tictactoe_service.take_turn(game, player, corner, position)
-        self.save_game(game_id, game)
+        # the game lock orders the turn with the write-behind flusher's write
+        # (GameService already holds it for the whole turn; it is reentrant)
+        with self.game_lock(game_id):
+            self.tictactoe_service.take_turn(game, player, corner, position)
+
+            try:
+                # Update database game record with timestamp, turn and finished status;
+                # in PostgreSQL mode it is committed together with the game state.
+                # With write-behind the flusher updates it when it stores the game.
+                game_record = None if self.write_behind else self.db.query(Game).filter(Game.id == game_id).first()
+                if game_record:
+                    self._record_turn(game_record, game)
+
+                if self.use_log and not self.write_behind:
+                    self.saves += 1
+                    self.writes += 1
+                    with self._file_lock(game_id):
+                        self._append_turn(game_id, game)
+                        if game.current_game.finished:
+                            self.compact_game(game_id, game)
+                    self._cache_game(game_id, game)
+                else:
+                    self.save_game(game_id, game)
+                self.db.commit()
+            except Exception:
+                # the move may be cached but not stored; reload the game next time
+                if self.cache is not None:
+                    self.cache.invalidate(game_id)
+                raise
+
+    def update_game_record(self, game_record: Game, game: UltimateTicTacToe) -> None:
+        """
+        Copy the turn, next player, move count, last move time and result
+        from a game onto its database record (the caller commits).
         
-        # Update database game record with timestamp and finished status
-        game_record = self.db.query(Game).filter(Game.id == game_id).first()
-        if game_record:
-            game_record.updated_at = datetime.datetime.utcnow()
-            if game.current_game.finished:
-                game_record.finished = True  # type: ignore
-                # Set winner based on game state
-                if game.current_game.winner == 'X':
-                    game_record.winner_id = game_record.x_user_id
-                elif game.current_game.winner == 'O':
-                    game_record.winner_id = game_record.o_user_id
-            self.db.commit()
+        Args:
+            game_record: The game's database record
+            game: The game object
+        """
+        state = game.current_game
+        game_record.turn = state.turn
+        game_record.move_count = len(game.moves)
+        game_record.last_move_at = (
+            datetime.datetime.utcfromtimestamp(game.moves[-1].timestamp) if game.moves else None
+        )
+        if state.finished:
+            game_record.finished = True  # type: ignore
+            game_record.next_user_id = None
+            # Set winner based on game state
+            if state.winner == 'X':
+                game_record.winner_id = game_record.x_user_id
+            elif state.winner == 'O':
+                game_record.winner_id = game_record.o_user_id
+        else:
+            game_record.next_user_id = game_record.x_user_id if state.turn == 'X' else game_record.o_user_id
+
+    def _record_turn(self, game_record: Game, game: UltimateTicTacToe) -> None:
+        game_record.updated_at = datetime.datetime.utcnow()
+        self.update_game_record(game_record, game)
 
     def save_game(self, game_id: int, game: UltimateTicTacToe) -> None:
         """
-        Save the game state to either PostgreSQL database or JSON file.
+        Save the game state to either PostgreSQL database or a game file, in
+        the configured format. In movelog storage an unfinished game's whole
+        log is rewritten instead; turns only append to it (see take_turn).
+        With write-behind enabled the game is only marked dirty in the cache.
         
         Args:
             game_id: The unique ID for the game
             game: The UltimateTicTacToe game object to save
         """
-        game_data = self._serialize_game(game)
-        
+        self.saves += 1
+        if self.write_behind:
+            self._cache_game(game_id, game, dirty=True)
+            return
+        self._store_game(game_id, game, self.db)
+        self._cache_game(game_id, game)
+
+    def _store_game(self, game_id: int, game: UltimateTicTacToe, db, update_record: bool = False) -> None:
+        """
+        Write a game to storage now, using the given database session; with
+        update_record (write-behind) the record's turn and result too.
+        """
+        self.writes += 1
+        game_record = None
+        if self.use_db or update_record:
+            game_record = db.query(Game).filter(Game.id == game_id).first()
+            if game_record and update_record:
+                self._record_turn(game_record, game)
         if self.use_db:
-            # Save to PostgreSQL database
-            game_record = self.db.query(Game).filter(Game.id == game_id).first()
+            # Save to PostgreSQL database, in the same transaction as the record
             if game_record:
-                game_record.game_state = game_data
-                self.db.commit()
+                if self.game_format == "binary":
+                    game_record.game_state_bin = encode_game(game)
+                    game_record.game_state = None
+                else:
+                    game_record.game_state = self._serialize_game(game)
+                    game_record.game_state_bin = None
+                db.commit()
+            return
+        if self.use_log and not game.current_game.finished:
+            with self._file_lock(game_id):
+                self._write_log(game_id, game)
         else:
-            # Save to JSON file (SQLite)
-            file_path = os.path.join(GAMES_DIR, f"{game_id}.json")
-            with open(file_path, 'w') as f:
-                json.dump(game_data, f, indent=2)
+            # Save to a game file (SQLite)
+            with self._file_lock(game_id):
+                self._write_game_file(game_id, game)
+                self._remove_log(game_id)
+        if game_record:
+            # the record follows the file, so it's never ahead of it
+            db.commit()
 
     def load_game(self, game_id: int) -> Optional[UltimateTicTacToe]:
         """
-        Load a game state from either PostgreSQL database or JSON file.
+        Load a game state from either PostgreSQL database or a game file
+        (binary or JSON), or by replaying its move log when it has one.
+        Cached games are returned as copies; changes reach the cache and
+        storage only when saved (take_turn does this).
         
         Args:
             game_id: The unique ID for the game
@@ -99,26 +296,267 @@ class GameFileService:
         Returns:
             The UltimateTicTacToe game object, or None if the game doesn't exist
         """
+        if self.cache is not None:
+            game = self.cache.get(game_id)
+            if game is not None:
+                return game
+
+        game = self._load_stored_game(game_id)
+        if game is not None:
+            self._cache_game(game_id, game)
+        return game
+
+    def load_games(self, game_ids: Iterable[int]) -> Dict[int, UltimateTicTacToe]:
+        """
+        Load many games at once: cached games first, then the rest with one
+        query (PostgreSQL) or by reading their files in parallel on a thread
+        pool (SQLite).
+        
+        Args:
+            game_ids: The games to load
+        
+        Returns:
+            Dictionary of game ID to game; missing or unreadable games are left out
+        """
+        games: Dict[int, UltimateTicTacToe] = {}
+        missing = []
+        for game_id in dict.fromkeys(game_ids):
+            game = self.cache.get(game_id) if self.cache is not None else None
+            if game is not None:
+                games[game_id] = game
+            else:
+                missing.append(game_id)
+        if not missing:
+            return games
+
+        if self.use_db:
+            query = self.db.query(Game.id, Game.game_state, Game.game_state_bin).filter(Game.id.in_(missing))
+            loaded = []
+            for game_id, game_state, game_state_bin in query:
+                try:
+                    loaded.append((game_id, self._decode_record(game_state, game_state_bin)))
+                except (KeyError, TypeError, ValueError) as e:
+                    print(f"Warning: Could not load game {game_id}: {e}")
+        elif len(missing) == 1 or self.load_workers < 2:
+            loaded = [(game_id, self._try_load_stored_game(game_id)) for game_id in missing]
+        else:
+            if self._load_pool is None:
+                self._load_pool = ThreadPoolExecutor(max_workers=self.load_workers, thread_name_prefix="game-load")
+            loaded = list(zip(missing, self._load_pool.map(self._try_load_stored_game, missing)))
+
+        for game_id, game in loaded:
+            if game is not None:
+                games[game_id] = game
+                self._cache_game(game_id, game)
+        return games
+
+    def load_current_state(self, game_id: int) -> Optional[UltimateTicTacToeGameState]:
+        """
+        Load only a game's current state, for callers that don't need the
+        history. In PostgreSQL mode just current_game (or the first bytes of
+        a binary game) is read from the row; elsewhere the game is loaded.
+        
+        Args:
+            game_id: The unique ID for the game
+        
+        Returns:
+            The current state, or None if the game doesn't exist
+        """
+        game = self.cache.get(game_id) if self.cache is not None else None
+        if game is not None:
+            return game.current_game
+        if not self.use_db:
+            game = self.load_game(game_id)
+            return game.current_game if game is not None else None
+
+        row = self.db.query(
+            func.substr(Game.game_state_bin, 1, CURRENT_STATE_BYTES),
+            Game.game_state['current_game'],
+        ).filter(Game.id == game_id).first()
+        if row is None:
+            return None
+        state_prefix, current_game = row
+        if state_prefix:
+            return decode_current_state(bytes(state_prefix))
+        if current_game:
+            return self._deserialize_game_state(current_game)
+        return None
+
+    def load_game_slice(self, game_id: int, start: int = 0, stop: Optional[int] = None) -> Optional[GameSlice]:
+        """
+        Load part of a game's history: the moves from start up to stop
+        (default: the end), the state before them and the current state.
+        In PostgreSQL mode a JSON game is not fetched whole: current_game,
+        the checkpoint at or before start and the moves from there are
+        extracted server side with JSON paths. Elsewhere the game is loaded
+        and sliced.
+        
+        Args:
+            game_id: The unique ID for the game
+            start: Index of the first move
+            stop: Index after the last move
+        
+        Returns:
+            The slice, or None if the game doesn't exist
+        
+        Raises:
+            ValueError: If start or stop is negative
+        """
+        if start < 0 or (stop is not None and stop < 0):
+            raise ValueError("Move indexes must not be negative")
+        if stop is not None:
+            stop = max(start, stop)
+
+        game = self.cache.get(game_id) if self.cache is not None else None
+        if game is None and self.use_db and self.db.get_bind().dialect.name == "postgresql":
+            game_slice = self._query_game_slice(game_id, start, stop)
+            if game_slice is not None:
+                return game_slice
+        if game is None:
+            game = self.load_game(game_id)
+            if game is None:
+                return None
+
+        start = min(start, len(game.moves))
+        base = max(index for index in game.checkpoints if index <= start)
+        state = self.tictactoe_service.apply_moves(game.checkpoints[base], game.moves[base:start])
+        return GameSlice(game.current_game, start, state, game.moves[start:stop], len(game.moves))
+
+    def _query_game_slice(self, game_id: int, start: int, stop: Optional[int]) -> Optional[GameSlice]:
+        """A slice extracted from the JSONB game document, or None if the row has none to slice."""
+        # checkpoints are taken every CHECKPOINT_INTERVAL moves; replay from the one before start
+        base = start - start % CHECKPOINT_INTERVAL
+        last = "last" if stop is None else str(max(stop - 1, base))
+        row = self.db.query(
+            Game.game_state['current_game'],
+            Game.game_state['checkpoints'][str(base)],
+            func.jsonb_path_query_array(Game.game_state, f"$.moves[{base} to {last}]", type_=JSONB),
+            func.jsonb_array_length(Game.game_state['moves']),
+        ).filter(Game.id == game_id).first()
+        if row is None or row[0] is None or row[1] is None:
+            return None
+        current_game, checkpoint, moves_data, move_count = row
+
+        moves = [Move(**move) for move in moves_data]
+        state = self.tictactoe_service.apply_moves(
+            self._deserialize_game_state(checkpoint), moves[:start - base]
+        )
+        end = None if stop is None else stop - base
+        return GameSlice(
+            self._deserialize_game_state(current_game), start, state, moves[start - base:end], move_count
+        )
+
+    async def load_games_async(self, session, game_ids: Iterable[int]) -> Dict[int, UltimateTicTacToe]:
+        """
+        load_games for the async data layer (DB_ASYNC): in PostgreSQL mode the
+        states are fetched with one query on the given AsyncSession; game
+        files are read on the thread pool without blocking the event loop.
+        
+        Args:
+            session: The request's AsyncSession
+            game_ids: The games to load
+        
+        Returns:
+            Dictionary of game ID to game; missing or unreadable games are left out
+        """
+        game_ids = list(dict.fromkeys(game_ids))
+        if not self.use_db:
+            return await asyncio.to_thread(self.load_games, game_ids)
+
+        games: Dict[int, UltimateTicTacToe] = {}
+        missing = []
+        for game_id in game_ids:
+            game = self.cache.get(game_id) if self.cache is not None else None
+            if game is not None:
+                games[game_id] = game
+            else:
+                missing.append(game_id)
+        if not missing:
+            return games
+
+        result = await session.execute(
+            select(Game.id, Game.game_state, Game.game_state_bin).where(Game.id.in_(missing))
+        )
+        for game_id, game_state, game_state_bin in result:
+            try:
+                game = self._decode_record(game_state, game_state_bin)
+            except (KeyError, TypeError, ValueError) as e:
+                print(f"Warning: Could not load game {game_id}: {e}")
+                continue
+            if game is not None:
+                games[game_id] = game
+                self._cache_game(game_id, game)
+        return games
+
+    def _try_load_stored_game(self, game_id: int) -> Optional[UltimateTicTacToe]:
+        try:
+            return self._load_stored_game(game_id)
+        except (KeyError, TypeError, ValueError) as e:
+            print(f"Warning: Could not load game {game_id}: {e}")
+            return None
+
+    def _load_stored_game(self, game_id: int) -> Optional[UltimateTicTacToe]:
+        """Read a game from storage, bypassing the cache."""
         if self.use_db:
             # Load from PostgreSQL database
             game_record = self.db.query(Game).filter(Game.id == game_id).first()
-            if not game_record or not game_record.game_state:
+            if not game_record:
                 return None
-            return self._deserialize_game(game_record.game_state)
+            return self._decode_record(game_record.game_state, game_record.game_state_bin)
         else:
-            # Load from JSON file (SQLite)
-            file_path = os.path.join(GAMES_DIR, f"{game_id}.json")
-            if not os.path.exists(file_path):
-                return None
+            with self._file_lock(game_id):
+                # An unfinished game in movelog storage lives in its log
+                log_path = self._find_file(game_id, ".log")
+                if log_path is not None:
+                    return self._read_log(log_path)
+
+                # Load from a binary or JSON file (SQLite), sharded or flat
+                binary_path = self._find_file(game_id, GAME_FILE_EXTENSIONS["binary"])
+                if binary_path is not None:
+                    with open(binary_path, 'rb') as f:
+                        return decode_game(f.read())
+
+                file_path = self._find_file(game_id, GAME_FILE_EXTENSIONS["json"])
+                if file_path is None:
+                    return None
             
-            with open(file_path, 'r') as f:
-                game_data = json.load(f)
+                with open(file_path, 'r') as f:
+                    game_data = json.load(f)
             
-            return self._deserialize_game(game_data)
+                return self._deserialize_game(game_data)
+
+    def iter_games(self) -> Iterator[Tuple[int, UltimateTicTacToe]]:
+        """
+        Iterate over every stored game, for offline tools such as the opening book builder.
+        
+        Yields:
+            (game_id, game) pairs; unreadable games are skipped
+        """
+        if self.use_db:
+            query = self.db.query(Game.id, Game.game_state, Game.game_state_bin).filter(
+                (Game.game_state.isnot(None)) | (Game.game_state_bin.isnot(None))
+            )
+            for game_id, game_state, game_state_bin in query.yield_per(100):
+                try:
+                    yield game_id, self._decode_record(game_state, game_state_bin)
+                except (KeyError, TypeError, ValueError) as e:
+                    print(f"Warning: Could not load game {game_id}: {e}")
+        else:
+            # flat files and shard directories alike
+            game_ids = set()
+            for _, _, file_names in os.walk(GAMES_DIR):
+                for file_name in file_names:
+                    game_id = parse_game_file_name(file_name)
+                    if game_id is not None:
+                        game_ids.add(game_id)
+            for game_id in sorted(game_ids):
+                game = self._try_load_stored_game(game_id)
+                if game is not None:
+                    yield game_id, game
 
     def delete_game(self, game_id: int) -> None:
         """
-        Delete a game's state (from database or JSON file).
+        Delete a game's state (from database or game files).
         
         Args:
             game_id: The unique ID for the game
@@ -126,57 +564,404 @@ class GameFileService:
         Raises:
             ValueError: If the game doesn't exist
         """
+        if self.cache is not None:
+            self.cache.invalidate(game_id)
+
         if self.use_db:
             # Clear game state from PostgreSQL database
             game_record = self.db.query(Game).filter(Game.id == game_id).first()
             if not game_record:
                 raise ValueError(f"Game {game_id} not found in database")
             game_record.game_state = None
+            game_record.game_state_bin = None
             self.db.commit()
         else:
-            # Delete JSON file (SQLite)
-            file_path = os.path.join(GAMES_DIR, f"{game_id}.json")
-            if not os.path.exists(file_path):
-                raise ValueError(f"Game file for game {game_id} not found")
-            
-            os.remove(file_path)
+            # Delete game files and/or move log, sharded or flat (SQLite)
+            with self._file_lock(game_id):
+                paths = [path for ext in GAME_FILE_SUFFIXES for path in self._file_paths(game_id, ext)]
+                existing = [path for path in paths if os.path.exists(path)]
+                if not existing:
+                    raise ValueError(f"Game file for game {game_id} not found")
+                
+                for path in existing:
+                    os.remove(path)
 
-    def _serialize_game(self, game: UltimateTicTacToe) -> dict:
-        """Convert a game object to a JSON-serializable dictionary."""
-        def serialize_subgame(subgame):
-            return {
-                'finished': subgame.finished,
-                'winner': subgame.winner,
-                'topleft': subgame.topleft,
-                'topmiddle': subgame.topmiddle,
-                'topright': subgame.topright,
-                'middleleft': subgame.middleleft,
-                'center': subgame.center,
-                'middleright': subgame.middleright,
-                'bottomleft': subgame.bottomleft,
-                'bottommiddle': subgame.bottommiddle,
-                'bottomright': subgame.bottomright,
-            }
+    def compact_game(self, game_id: int, game: Optional[UltimateTicTacToe] = None) -> bool:
+        """
+        Replace a game's move log with a single game file, so the game
+        loads without replaying. Called automatically when a logged game
+        finishes; can also be run on unfinished games (they go back to a log
+        on their next turn).
         
-        current_game = game.current_game
-        return {
-            'current_game': {
-                'turn': current_game.turn,
-                'finished': current_game.finished,
-                'winner': current_game.winner,
-                'activeCorner': current_game.activeCorner,
-                'topleft': serialize_subgame(current_game.topleft),
-                'topmiddle': serialize_subgame(current_game.topmiddle),
-                'topright': serialize_subgame(current_game.topright),
-                'middleleft': serialize_subgame(current_game.middleleft),
-                'center': serialize_subgame(current_game.center),
-                'middleright': serialize_subgame(current_game.middleright),
-                'bottomleft': serialize_subgame(current_game.bottomleft),
-                'bottommiddle': serialize_subgame(current_game.bottommiddle),
-                'bottomright': serialize_subgame(current_game.bottomright),
-            },
-            'history': [self._serialize_game_state(state) for state in game.history]
+        Args:
+            game_id: The unique ID for the game
+            game: The game if it is already loaded
+        
+        Returns:
+            True if a log was compacted, False if the game has no log
+        """
+        with self._file_lock(game_id):
+            log_path = self._find_file(game_id, ".log")
+            if log_path is None:
+                return False
+            if game is None:
+                game = self._read_log(log_path)
+
+            self._write_game_file(game_id, game)
+            os.remove(log_path)
+            return True
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """
+        Cache and persistence counters.
+        
+        Returns:
+            Dictionary with cache hits, misses, evictions and size (when the
+            cache is enabled) plus save requests and actual storage writes
+        """
+        stats: Dict[str, Any] = {"enabled": self.cache is not None}
+        if self.cache is not None:
+            stats.update(self.cache.get_stats())
+        stats.update({
+            "write_behind": self.write_behind,
+            "saves": self.saves,
+            "writes": self.writes,
+        })
+        return stats
+
+    def flush(self, db=None) -> int:
+        """
+        Persist every game with a pending write-behind save.
+        
+        Args:
+            db: Database session to write with (default: this service's session)
+        
+        Returns:
+            Number of games written
+        """
+        if self.cache is None:
+            return 0
+        pending = self.cache.take_dirty()
+        for index, (game_id, game) in enumerate(pending):
+            try:
+                # only this game waits for its write, and never for half a move
+                with self.game_lock(game_id):
+                    self._store_game(game_id, game, db or self.db, update_record=True)
+            except Exception:
+                # keep the unwritten games dirty for the next flush
+                self.cache.mark_dirty([pending_id for pending_id, _ in pending[index:]])
+                raise
+        return len(pending)
+
+    def migrate_layout(self, limit: Optional[int] = None) -> int:
+        """
+        Move game files from the flat games directory into their shards.
+        Each move is an atomic rename made under the file lock, so the game
+        stays readable throughout. A flat file whose shard already has a
+        copy is a leftover (writes go to the shard) and is removed.
+        
+        Args:
+            limit: Move at most this many files (default: all)
+        
+        Returns:
+            Number of flat files moved or removed
+        
+        Raises:
+            ValueError: If the service is not using the sharded layout
+        """
+        if self.use_db or not self.sharded:
+            raise ValueError("Layout migration needs SQLite mode with GAME_LAYOUT=sharded")
+        moved = 0
+        with os.scandir(GAMES_DIR) as entries:
+            for entry in entries:
+                if limit is not None and moved >= limit:
+                    break
+                game_id = parse_game_file_name(entry.name)
+                if game_id is None or not entry.is_file():
+                    continue
+                target_dir = shard_dir(game_id)
+                target_path = os.path.join(target_dir, entry.name)
+                with self._file_lock(game_id):
+                    if not os.path.exists(entry.path):
+                        continue
+                    if os.path.exists(target_path):
+                        os.remove(entry.path)
+                    else:
+                        os.makedirs(target_dir, exist_ok=True)
+                        os.replace(entry.path, target_path)
+                moved += 1
+        return moved
+
+    def start_layout_migration(
+        self,
+        batch_size: int = GAME_LAYOUT_MIGRATE_BATCH,
+        interval: float = GAME_LAYOUT_MIGRATE_INTERVAL,
+    ) -> bool:
+        """
+        Migrate flat game files into shards in the background, batch_size
+        files every interval seconds, while the server keeps running. The
+        thread exits once no flat files are left or on close().
+        
+        Returns:
+            True if the migrator was started, False if there is nothing to
+            migrate (PostgreSQL mode, flat layout, or already running)
+        """
+        if self.use_db or not self.sharded or self._migrator is not None:
+            return False
+        if batch_size < 1:
+            raise ValueError("Layout migration batch size must be at least 1")
+        self._migrator = threading.Thread(
+            target=self._migrate_loop, args=(batch_size, interval), name="game-layout-migrator", daemon=True
+        )
+        self._migrator.start()
+        return True
+
+    def close(self) -> None:
+        """Stop the background threads and flush pending writes."""
+        if self._migrator is not None:
+            self._stop_migrator.set()
+            self._migrator.join()
+            self._migrator = None
+        if self._load_pool is not None:
+            self._load_pool.shutdown()
+            self._load_pool = None
+        if self._flusher is not None:
+            self._stop_flusher.set()
+            self._flusher.join()
+            self._flusher = None
+        written = self.flush()
+        if written:
+            print(f"✓ Flushed {written} pending game write(s)")
+
+    def _flush_loop(self) -> None:
+        # SQLAlchemy sessions are not thread safe, so the flusher has its own
+        db = SessionLocal()
+        try:
+            while not self._stop_flusher.wait(self.write_behind):
+                try:
+                    self.flush(db)
+                except Exception as e:
+                    db.rollback()
+                    print(f"Warning: Write-behind flush failed: {e}")
+        finally:
+            db.close()
+
+    def _migrate_loop(self, batch_size: int, interval: float) -> None:
+        total = 0
+        while not self._stop_migrator.is_set():
+            try:
+                moved = self.migrate_layout(limit=batch_size)
+            except OSError as e:
+                print(f"Warning: Game layout migration failed: {e}")
+                return
+            total += moved
+            if moved < batch_size:
+                break
+            self._stop_migrator.wait(interval)
+        if total:
+            print(f"✓ Moved {total} game file(s) into the sharded layout")
+
+    def _cache_game(self, game_id: int, game: UltimateTicTacToe, dirty: bool = False) -> None:
+        if self.cache is None:
+            return
+        evicted = self.cache.put(game_id, game, dirty=dirty)
+        if not evicted:
+            return
+        # dirty games pushed out of a full cache are written straight away, on
+        # their own session so the request's transaction isn't committed early
+        db = SessionLocal()
+        try:
+            for evicted_id, evicted_game in evicted:
+                lock = self.game_lock(evicted_id)
+                # waiting here could deadlock with a turn holding that lock and
+                # waiting for ours; if it's busy, the flusher writes the game later
+                if not lock.acquire(blocking=False):
+                    self.cache.keep_dirty(evicted_id, evicted_game)
+                    continue
+                try:
+                    self._store_game(evicted_id, evicted_game, db, update_record=True)
+                finally:
+                    lock.release()
+        finally:
+            db.close()
+
+    def game_lock(self, game_id: int) -> threading.RLock:
+        """
+        Lock serializing concurrent requests that change the same game, so
+        each one loads the game only after the previous turn was saved. The
+        write-behind flusher takes it too, so it never stores half a move.
+        """
+        return self.game_locks[game_id % GAME_LOCK_STRIPES]
+
+    def _file_lock(self, game_id: int) -> threading.RLock:
+        return self.file_locks[game_id % FILE_LOCK_STRIPES]
+
+    def _file_paths(self, game_id: int, ext: str) -> List[str]:
+        """Both places a game file can be, the configured layout's first."""
+        file_name = f"{game_id}{ext}"
+        sharded_path = os.path.join(shard_dir(game_id), file_name)
+        flat_path = os.path.join(GAMES_DIR, file_name)
+        return [sharded_path, flat_path] if self.sharded else [flat_path, sharded_path]
+
+    def _find_file(self, game_id: int, ext: str) -> Optional[str]:
+        for path in self._file_paths(game_id, ext):
+            if os.path.exists(path):
+                return path
+        return None
+
+    def _remove_file(self, game_id: int, ext: str, keep: Optional[str] = None) -> None:
+        """Remove a game file from both layouts, except the path in keep."""
+        for path in self._file_paths(game_id, ext):
+            if path != keep and os.path.exists(path):
+                os.remove(path)
+
+    def _game_file_path(self, game_id: int, game_format: str) -> str:
+        """Where a game file is written in the configured layout."""
+        return self._file_paths(game_id, GAME_FILE_EXTENSIONS[game_format])[0]
+
+    def _write_game_file(self, game_id: int, game: UltimateTicTacToe) -> None:
+        """
+        Write {id}.json or {id}.bin (atomically) and remove any copy in the
+        other format or the other layout.
+        """
+        file_path = self._game_file_path(game_id, self.game_format)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        temp_path = f"{file_path}.tmp"
+        if self.game_format == "binary":
+            with open(temp_path, 'wb') as f:
+                f.write(encode_game(game))
+        else:
+            with open(temp_path, 'w') as f:
+                json.dump(self._serialize_game(game), f, indent=2)
+        os.replace(temp_path, file_path)
+
+        for game_format in GAME_FORMATS:
+            self._remove_file(game_id, GAME_FILE_EXTENSIONS[game_format], keep=file_path)
+
+    def _decode_record(self, game_state: Optional[dict], game_state_bin: Optional[bytes]) -> Optional[UltimateTicTacToe]:
+        """Decode a games row, preferring the binary column."""
+        if game_state_bin:
+            return decode_game(bytes(game_state_bin))
+        if game_state:
+            return self._deserialize_game(game_state)
+        return None
+
+    # ===== Move log storage =====
+    #
+    # One JSON object per line:
+    #     {"checkpoint": 10, "state": {...}}   full state before move 10
+    #     {"move": {"player": "X", ...}}       one move
+    # A turn appends its move line, plus a checkpoint line every
+    # CHECKPOINT_INTERVAL moves, so the bytes written per turn stay constant.
+
+    def _log_path(self, game_id: int) -> str:
+        """Where a move log is written in the configured layout."""
+        return self._file_paths(game_id, ".log")[0]
+
+    def _remove_log(self, game_id: int) -> None:
+        self._remove_file(game_id, ".log")
+
+    def _log_line(self, record: dict) -> str:
+        return json.dumps(record, separators=(',', ':')) + '\n'
+
+    def _checkpoint_line(self, index: int, state) -> str:
+        return self._log_line({'checkpoint': index, 'state': self._serialize_game_state(state)})
+
+    def _move_line(self, move: Move) -> str:
+        return self._log_line({'move': move.to_dict()})
+
+    def _write_log(self, game_id: int, game: UltimateTicTacToe) -> None:
+        """Write a game's whole log (new games, forks and games converted from JSON)."""
+        lines = []
+        for index, move in enumerate(game.moves):
+            if index in game.checkpoints:
+                lines.append(self._checkpoint_line(index, game.checkpoints[index]))
+            lines.append(self._move_line(move))
+        if len(game.moves) in game.checkpoints:
+            lines.append(self._checkpoint_line(len(game.moves), game.checkpoints[len(game.moves)]))
+
+        log_path = self._log_path(game_id)
+        os.makedirs(os.path.dirname(log_path), exist_ok=True)
+        temp_path = f"{log_path}.tmp"
+        with open(temp_path, 'w') as f:
+            f.writelines(lines)
+        os.replace(temp_path, log_path)
+
+        self._remove_file(game_id, ".log", keep=log_path)
+        for game_format in GAME_FORMATS:
+            self._remove_file(game_id, GAME_FILE_EXTENSIONS[game_format])
+
+    def _append_turn(self, game_id: int, game: UltimateTicTacToe) -> None:
+        """Append the latest move (and its checkpoint, if one was taken) to the game's log."""
+        log_path = self._find_file(game_id, ".log")
+        if log_path is None:
+            # game stored as JSON so far: convert it once, then append from now on
+            self._write_log(game_id, game)
+            return
+
+        record = self._move_line(game.moves[-1])
+        if len(game.moves) in game.checkpoints:
+            record += self._checkpoint_line(len(game.moves), game.checkpoints[len(game.moves)])
+        # a log still in the other layout is appended in place; the migrator moves it
+        with open(log_path, 'a+b') as f:
+            # start on a fresh line if an earlier write was cut short
+            if f.tell() > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    record = '\n' + record
+            f.write(record.encode())
+
+    def _read_log(self, log_path: str) -> UltimateTicTacToe:
+        """Rebuild a game from its log, replaying the moves after the last checkpoint."""
+        moves = []
+        checkpoints = {}
+        with open(log_path, 'r') as f:
+            for line_number, line in enumerate(f, start=1):
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # a write cut short by a crash; the turn it belonged to never completed
+                    print(f"Warning: Skipping unreadable line {line_number} of {log_path}")
+                    continue
+                if 'move' in record:
+                    moves.append(Move(**record['move']))
+                else:
+                    checkpoints[record['checkpoint']] = self._deserialize_game_state(record['state'])
+
+        if 0 not in checkpoints:
+            raise ValueError(f"Move log {log_path} has no starting checkpoint")
+        base = max(index for index in checkpoints if index <= len(moves))
+        current_game = checkpoints[base].copy()
+        for move in moves[base:]:
+            self.tictactoe_service._apply_move(current_game, move.player, move.corner, move.position)
+        return UltimateTicTacToe(current_game=current_game, moves=moves, checkpoints=checkpoints)
+
+    def _serialize_game(self, game: UltimateTicTacToe, include_checkpoints: bool = True) -> dict:
+        """
+        Convert a game object to a JSON-serializable dictionary.
+
+        History is stored as a move list plus periodic checkpoint states, so the
+        size grows with the number of moves rather than moves x board size.
+        API payloads can leave the checkpoints out.
+        """
+        data = {
+            'current_game': self._serialize_game_state(game.current_game),
+            'moves': [
+                {
+                    'player': move.player,
+                    'corner': move.corner,
+                    'position': move.position,
+                    'timestamp': move.timestamp,
+                }
+                for move in game.moves
+            ],
         }
+        if include_checkpoints:
+            data['checkpoints'] = {
+                str(index): self._serialize_game_state(state)
+                for index, state in game.checkpoints.items()
+            }
+        return data
 
     def _serialize_game_state(self, game_state) -> dict:
         """Convert a game state object to a JSON-serializable dictionary."""
@@ -200,6 +985,7 @@ class GameFileService:
             'finished': game_state.finished,
             'winner': game_state.winner,
             'activeCorner': game_state.activeCorner,
+            'zobrist_hash': format_hash(game_state.zobrist_hash),
             'topleft': serialize_subgame(game_state.topleft),
             'topmiddle': serialize_subgame(game_state.topmiddle),
             'topright': serialize_subgame(game_state.topright),
@@ -213,53 +999,23 @@ class GameFileService:
 
     def _deserialize_game(self, data: dict) -> UltimateTicTacToe:
         """Convert a JSON-serializable dictionary back to a game object."""
-        from datamodels.tictactoe import SubTicTacToeGame, UltimateTicTacToeGameState
-        
-        def deserialize_subgame(subgame_data):
-            return SubTicTacToeGame(**subgame_data)
-        
-        current_game_data = data['current_game']
-        current_game = UltimateTicTacToeGameState(
-            turn=current_game_data['turn'],
-            finished=current_game_data['finished'],
-            winner=current_game_data['winner'],
-            activeCorner=current_game_data['activeCorner'],
-            topleft=deserialize_subgame(current_game_data['topleft']),
-            topmiddle=deserialize_subgame(current_game_data['topmiddle']),
-            topright=deserialize_subgame(current_game_data['topright']),
-            middleleft=deserialize_subgame(current_game_data['middleleft']),
-            center=deserialize_subgame(current_game_data['center']),
-            middleright=deserialize_subgame(current_game_data['middleright']),
-            bottomleft=deserialize_subgame(current_game_data['bottomleft']),
-            bottommiddle=deserialize_subgame(current_game_data['bottommiddle']),
-            bottomright=deserialize_subgame(current_game_data['bottomright']),
-        )
-        
-        history = [self._deserialize_game_state(state_data) for state_data in data['history']]
+        from datamodels.tictactoe import Move
         
-        game = UltimateTicTacToe(current_game=current_game, history=history)
+        current_game = self._deserialize_game_state(data['current_game'])
+
+        # Legacy format: a full state snapshot before every move
+        if 'history' in data:
+            history = [self._deserialize_game_state(state_data) for state_data in data['history']]
+            return UltimateTicTacToe.from_history(current_game, history)
+
+        moves = [Move(**move_data) for move_data in data['moves']]
+        checkpoints = {
+            int(index): self._deserialize_game_state(state_data)
+            for index, state_data in data['checkpoints'].items()
+        }
         
-        return game
+        return UltimateTicTacToe(current_game=current_game, moves=moves, checkpoints=checkpoints)
 
-    def _deserialize_game_state(self, data: dict):
+    def _deserialize_game_state(self, data: dict) -> UltimateTicTacToeGameState:
         """Convert a JSON-serializable dictionary back to a game state object."""
-        from datamodels.tictactoe import SubTicTacToeGame, UltimateTicTacToeGameState
-        
-        def deserialize_subgame(subgame_data):
-            return SubTicTacToeGame(**subgame_data)
-        
-        return UltimateTicTacToeGameState(
-            turn=data['turn'],
-            finished=data['finished'],
-            winner=data['winner'],
-            activeCorner=data['activeCorner'],
-            topleft=deserialize_subgame(data['topleft']),
-            topmiddle=deserialize_subgame(data['topmiddle']),
-            topright=deserialize_subgame(data['topright']),
-            middleleft=deserialize_subgame(data['middleleft']),
-            center=deserialize_subgame(data['center']),
-            middleright=deserialize_subgame(data['middleright']),
-            bottomleft=deserialize_subgame(data['bottomleft']),
-            bottommiddle=deserialize_subgame(data['bottommiddle']),
-            bottomright=deserialize_subgame(data['bottomright']),
-        )
+        return UltimateTicTacToeGameState.from_dict(data)
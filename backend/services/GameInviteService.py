@@ -1,12 +1,13 @@
 import random
-from database.schema import SessionLocal, GameInviteRequest
+from database.schema import GameInviteRequest
+from database.session import db_session
 from services.GameService import GameService
 from services.NotificationService import NotificationService
 from sqlalchemy.orm import joinedload
 
 class GameInviteService:
     def __init__(self, game_service: GameService, notification_service: NotificationService):
-        self.db = SessionLocal()
+        self.db = db_session
         self.game_service = game_service
         self.notification_service = notification_service
 
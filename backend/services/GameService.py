@@ -1,11 +1,29 @@
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datamodels.tictactoe import UltimateTicTacToe
 from services.GameFileService import GameFileService
 from services.UserService import UserService
 from services.NotificationService import NotificationService
-from database.schema import SessionLocal, Game
+from services.BotService import BotService
+from services.AuthCache import auth_cache
+from engines.negamax import NegamaxSearcher
+from engines.tablebase import Tablebase, RESULT_NAMES
+from database.schema import Game
+from database.session import db_session
+from sqlalchemy import select
 from sqlalchemy.orm import joinedload
 import datetime
+import os
+import threading
+
+# Upper bound on the time budget of a single analysis request, in seconds
+ANALYSIS_MAX_TIME = float(os.environ.get("ANALYSIS_MAX_TIME", "5.0"))
+
+# Analysis searchers kept for reuse (each keeps its transposition table, about
+# 8 MB, between searches); concurrent analyses beyond this get a fresh one
+ANALYSIS_SEARCHERS = int(os.environ.get("ANALYSIS_SEARCHERS", "0")) or os.cpu_count() or 1
+
+# Optional endgame tablebase (see build_tablebase.py) for exact analysis of near-full boards
+TABLEBASE_PATH = os.environ.get("TABLEBASE_PATH", "")
 
 
 class GameService:
@@ -14,11 +32,24 @@ class GameService:
     Handles game creation, retrieval, turn execution, and database coordination.
     """
     
-    def __init__(self, game_file_service: GameFileService, user_service: UserService, notification_service: NotificationService):
+    def __init__(self, game_file_service: GameFileService, user_service: UserService, notification_service: NotificationService, bot_service: Optional[BotService] = None, tablebase_path: str = TABLEBASE_PATH):
         self.game_file_service = game_file_service
         self.user_service = user_service
         self.notification_service = notification_service
-        self.db = SessionLocal()
+        self.bot_service = bot_service
+
+        self.tablebase: Optional[Tablebase] = None
+        if tablebase_path:
+            try:
+                self.tablebase = Tablebase(tablebase_path)
+                print(f"[ANALYSIS] Tablebase loaded: {len(self.tablebase)} positions, up to {self.tablebase.max_empty} empty cells")
+            except (OSError, ValueError) as e:
+                print(f"Warning: Could not open tablebase {tablebase_path}: {e}")
+        # idle searchers; a searcher is used by one analysis at a time
+        self.searchers: List[NegamaxSearcher] = []
+        self.max_searchers = max(1, ANALYSIS_SEARCHERS)
+        self.searchers_lock = threading.Lock()
+        self.db = db_session
     
     def create_game(self, x_user_id: int, o_user_id: int) -> Game:
         """
@@ -58,57 +89,49 @@ class GameService:
         # Initialize game via GameFileService
         self.game_file_service.start_new_game(game_record.id)
         
+        # A bot playing X moves straight away
+        self.play_bot_turns(game_record.id)
+        
         return game_record
     
     def get_last_move(self, game: Any) -> Optional[Dict[str, str]]:
         """
-        Calculate the last corner/position pair from game history.
+        Get the last corner/position pair from the game's move list.
         Returns None if no moves have been made yet.
         
         Args:
             game: The UltimateTicTacToe game object
         
         Returns:
-            Dictionary with 'corner' and 'position' keys, or None if no history
+            Dictionary with 'corner' and 'position' keys, or None if no moves
         """
-        if not game.history or len(game.history) == 0:
+        if not game.moves:
             return None
         
-        # The last move is the difference between current_game and the last history state
-        # We need to find which subgame and position changed
-        last_state = game.history[-1]
-        current_state = game.current_game
-        
-        # Check each subgame position to find the difference
-        positions = [
-            'topleft', 'topmiddle', 'topright',
-            'middleleft', 'center', 'middleright',
-            'bottomleft', 'bottommiddle', 'bottomright'
-        ]
-        
-        for corner in positions:
-            last_subgame = getattr(last_state, corner)
-            current_subgame = getattr(current_state, corner)
-            
-            # Check each cell in the subgame
-            cell_positions = [
-                'topleft', 'topmiddle', 'topright',
-                'middleleft', 'center', 'middleright',
-                'bottomleft', 'bottommiddle', 'bottomright'
-            ]
-            
-            for cell_pos in cell_positions:
-                last_cell = getattr(last_subgame, cell_pos, '')
-                current_cell = getattr(current_subgame, cell_pos, '')
-                
-                if last_cell != current_cell:
-                    return {
-                        "corner": corner,
-                        "position": cell_pos
-                    }
-        
-        return None
+        last_move = game.moves[-1]
+        return {
+            "corner": last_move.corner,
+            "position": last_move.position
+        }
 
+    def get_game_record(self, game_id: int) -> Game:
+        """
+        Get a game's database record without loading its state.
+        
+        Args:
+            game_id: The game ID
+        
+        Returns:
+            The Game record
+        
+        Raises:
+            ValueError: If game not found
+        """
+        game_record = self.db.query(Game).filter(Game.id == game_id).first()
+        if not game_record:
+            raise ValueError(f"Game with ID {game_id} not found")
+        return game_record
+    
     def get_game(self, game_id: int) -> Dict[str, Any]:
         """
         Get a game by ID with full state.
@@ -131,12 +154,45 @@ class GameService:
         if not game:
             raise ValueError("Could not load game state")
         
-        # Serialize game state
-        game_data = self.game_file_service._serialize_game(game)
-        
         # Get player information
-        x_user = self.user_service.get_user_by_id(game_record.x_user_id)
-        o_user = self.user_service.get_user_by_id(game_record.o_user_id)
+        users = self.user_service.get_users_by_ids([game_record.x_user_id, game_record.o_user_id])
+        return self._game_data(game_record, game, users)
+    
+    def get_games(self, game_ids: List[int]) -> List[Dict[str, Any]]:
+        """
+        Get several games with full state, like get_game, using a fixed
+        number of queries: one for the game records, one (or a parallel
+        file read) for the states and one for the players.
+        
+        Args:
+            game_ids: The game IDs
+        
+        Returns:
+            List of game data dictionaries in the order of game_ids; games
+            that are missing or fail to load are skipped
+        """
+        if not game_ids:
+            return []
+        records = {record.id: record for record in self.db.query(Game).filter(Game.id.in_(game_ids))}
+        games = self.game_file_service.load_games(records)
+        users = self.user_service.get_users_by_ids(
+            user_id for record in records.values() for user_id in (record.x_user_id, record.o_user_id)
+        )
+        
+        result = []
+        for game_id in game_ids:
+            if game_id not in games:
+                print(f"Error loading game {game_id}: {'Could not load game state' if game_id in records else 'not found'}")
+                continue
+            result.append(self._game_data(records[game_id], games[game_id], users))
+        return result
+    
+    def _game_data(self, game_record: Game, game: UltimateTicTacToe, users: Dict[int, Any]) -> Dict[str, Any]:
+        """Build the get_game response for a record, its game and the players by ID."""
+        # Serialize game state (move list only; checkpoints stay in storage)
+        game_data = self.game_file_service._serialize_game(game, include_checkpoints=False)
+        x_user = users.get(game_record.x_user_id)
+        o_user = users.get(game_record.o_user_id)
         
         # Calculate last move
         last_move = self.get_last_move(game)
@@ -170,13 +226,120 @@ class GameService:
         if not game_record:
             raise ValueError(f"Game with ID {game_id} not found")
         
-        # Load the game state from file
-        game = self.game_file_service.load_game(game_id)
-        if not game:
+        # Only the current position is drawn
+        state = self.game_file_service.load_current_state(game_id)
+        if not state:
             raise ValueError("Could not load game state")
         
-        return str(game)
+        return str(state)
+
+    def get_legal_moves(self, game_id: int) -> list:
+        """
+        Get the moves the player to move may currently play.
+        
+        Args:
+            game_id: The game ID
+        
+        Returns:
+            List of dictionaries with 'corner' and 'position' keys
+        
+        Raises:
+            ValueError: If game not found
+        """
+        state = self.game_file_service.load_current_state(game_id)
+        if not state:
+            raise ValueError(f"Game with ID {game_id} not found")
+        
+        moves = self.game_file_service.tictactoe_service.legal_moves(state)
+        return [{"corner": corner, "position": position} for corner, position in moves]
+
+    def get_game_history(self, game_id: int, start: int = 0, stop: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Get the states of a game, rebuilt from its move list.
+        
+        Args:
+            game_id: The game ID
+            start: Index of the first move to include
+            stop: Index after the last move to include (default: the end)
+        
+        Returns:
+            Dictionary with 'history' (the state before each move from start),
+            'start', 'move_count' and 'current_game'
+        
+        Raises:
+            ValueError: If game not found or start/stop is negative
+        """
+        game_slice = self.game_file_service.load_game_slice(game_id, start, stop)
+        if not game_slice:
+            raise ValueError(f"Game with ID {game_id} not found")
+        
+        tictactoe_service = self.game_file_service.tictactoe_service
+        return {
+            "history": [
+                self.game_file_service._serialize_game_state(state)
+                for state in tictactoe_service.replay_history(game_slice.state, game_slice.moves)
+            ],
+            "start": game_slice.start,
+            "move_count": game_slice.move_count,
+            "current_game": self.game_file_service._serialize_game_state(game_slice.current_game),
+        }
     
+    def analyze_game(self, game_id: int, time_limit: float = 1.0, max_depth: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Analyse the current position with the alpha-beta searcher.
+        
+        Args:
+            game_id: The game ID
+            time_limit: Search budget in seconds (at most ANALYSIS_MAX_TIME)
+            max_depth: Optional depth limit in plies
+        
+        Returns:
+            Dictionary with the best move, score (for the player to move), depth
+            reached, principal variation, search speed and the exact tablebase
+            result when the position is in the tablebase
+        
+        Raises:
+            ValueError: If game not found or the time limit is out of range
+        """
+        if time_limit <= 0 or time_limit > ANALYSIS_MAX_TIME:
+            raise ValueError(f"Time limit must be between 0 and {ANALYSIS_MAX_TIME} seconds")
+        
+        state = self.game_file_service.load_current_state(game_id)
+        if not state:
+            raise ValueError(f"Game with ID {game_id} not found")
+        
+        searcher = self._take_searcher()
+        try:
+            result = searcher.search(state, time_limit=time_limit, max_depth=max_depth)
+        finally:
+            self._return_searcher(searcher)
+        entry = self.tablebase.probe(state) if self.tablebase is not None else None
+        return {
+            "player": state.turn,
+            "best_move": {"corner": result.move[0], "position": result.move[1]} if result.move else None,
+            "score": result.score,
+            "forced_win": result.is_win,
+            "depth": result.depth,
+            "pv": [{"corner": corner, "position": position} for corner, position in result.pv],
+            "nodes": result.nodes,
+            "nodes_per_second": result.nodes_per_second,
+            "elapsed": result.elapsed,
+            "tablebase": {"result": RESULT_NAMES[entry.result], "distance": entry.distance} if entry else None,
+        }
+    
+    def _take_searcher(self) -> NegamaxSearcher:
+        # concurrent analyses each search with their own searcher, so none
+        # waits for another and every one keeps its time budget
+        with self.searchers_lock:
+            if self.searchers:
+                return self.searchers.pop()
+        return NegamaxSearcher(tablebase=self.tablebase)
+
+    def _return_searcher(self, searcher: NegamaxSearcher) -> None:
+        with self.searchers_lock:
+            if len(self.searchers) < self.max_searchers:
+                self.searchers.append(searcher)
+
     def list_games(self) -> list:
         """
         List all games.
@@ -206,6 +369,7 @@ class GameService:
         # Delete from database
         self.db.delete(game_record)
         self.db.commit()
+        auth_cache.invalidate_game(game_id)
 
     def list_games_by_user(self, user_id: int) -> list:
         """
@@ -232,38 +396,11 @@ class GameService:
         Returns:
             List of game records sorted by updated_at descending
         """
-        # Get all games where the user is a player and game is not finished
-        # Eagerly load relationships before detaching from session
-        games = self.db.query(Game).options(
+        # next_user_id is kept up to date on every turn, so no game state is loaded
+        return self.db.query(Game).options(
             joinedload(Game.x_user),
             joinedload(Game.o_user)
-        ).filter(
-            (Game.x_user_id == user_id) | (Game.o_user_id == user_id),
-            Game.finished == False
-        ).all()
-        
-        # Detach objects from session to free connection
-        self.db.expunge_all()
-        
-        # Filter to only games where it's the user's turn
-        user_turn_games = []
-        for game_record in games:
-            try:
-                game = self.game_file_service.load_game(game_record.id)
-                if game:
-                    # Determine if it's the user's turn
-                    is_user_x = game_record.x_user_id == user_id
-                    current_player_is_x = game.current_game.turn == 'X'
-                    
-                    if (is_user_x and current_player_is_x) or (not is_user_x and not current_player_is_x):
-                        user_turn_games.append(game_record)
-            except Exception:
-                # Skip games that can't be loaded
-                pass
-        
-        # Sort by updated_at descending
-        user_turn_games.sort(key=lambda g: g.updated_at, reverse=True)
-        return user_turn_games
+        ).filter(*self._user_turn_filter(user_id)).order_by(Game.updated_at.desc()).all()
 
     def list_games_opponent_turn(self, user_id: int) -> list:
         """
@@ -274,38 +411,24 @@ class GameService:
         Returns:
             List of game records sorted by updated_at descending
         """
-        # Get all games where the user is a player and game is not finished
-        # Eagerly load relationships before detaching from session
-        games = self.db.query(Game).options(
+        return self.db.query(Game).options(
             joinedload(Game.x_user),
             joinedload(Game.o_user)
-        ).filter(
+        ).filter(*self._opponent_turn_filter(user_id)).order_by(Game.updated_at.desc()).all()
+
+    # filters shared by the sync and async turn lists
+    def _user_turn_filter(self, user_id: int) -> tuple:
+        return (Game.next_user_id == user_id, Game.finished == False)
+
+    def _opponent_turn_filter(self, user_id: int) -> tuple:
+        return (
             (Game.x_user_id == user_id) | (Game.o_user_id == user_id),
-            Game.finished == False
-        ).all()
-        
-        # Detach objects from session to free connection
-        self.db.expunge_all()
-        
-        # Filter to only games where it's the opponent's turn
-        opponent_turn_games = []
-        for game_record in games:
-            try:
-                game = self.game_file_service.load_game(game_record.id)
-                if game:
-                    # Determine if it's the user's turn (if not, it's opponent's)
-                    is_user_x = game_record.x_user_id == user_id
-                    current_player_is_x = game.current_game.turn == 'X'
-                    
-                    if (is_user_x and not current_player_is_x) or (not is_user_x and current_player_is_x):
-                        opponent_turn_games.append(game_record)
-            except Exception:
-                # Skip games that can't be loaded
-                pass
-        
-        # Sort by updated_at descending
-        opponent_turn_games.sort(key=lambda g: g.updated_at, reverse=True)
-        return opponent_turn_games
+            Game.finished == False,
+            Game.next_user_id != user_id,
+        )
+
+    def _finished_filter(self, user_id: int) -> tuple:
+        return ((Game.x_user_id == user_id) | (Game.o_user_id == user_id), Game.finished == True)
 
     def fork_game(self, source_game_id: int, from_move_index: int, x_user_id: int, o_user_id: int) -> Dict[str, Any]:
         """
@@ -336,11 +459,8 @@ class GameService:
         if not source_game:
             raise ValueError(f"Could not load game state for game {source_game_id}")
 
-        all_states = source_game.history + [source_game.current_game]
-        if from_move_index < 0 or from_move_index >= len(all_states):
-            raise ValueError(f"Move index {from_move_index} is out of range (0–{len(all_states) - 1})")
-
-        fork_state = all_states[from_move_index]
+        # Index into all states (before each move, then current); rebuilt from the move list
+        fork_state = self.game_file_service.tictactoe_service.state_at(source_game, from_move_index)
         if fork_state.finished:
             raise ValueError("Cannot fork from a finished game state")
 
@@ -353,11 +473,11 @@ class GameService:
         self.db.commit()
         self.db.refresh(game_record)
 
-        forked_game = UltimateTicTacToe(
-            current_game=fork_state.copy(),
-            history=[]
-        )
+        forked_game = UltimateTicTacToe(current_game=fork_state.copy())
         self.game_file_service.save_game(game_record.id, forked_game)
+        self.game_file_service.update_game_record(game_record, forked_game)
+        self.db.commit()
+        self.play_bot_turns(game_record.id)
 
         # Update timestamp
         game_record.updated_at = datetime.datetime.utcnow()
@@ -377,14 +497,75 @@ class GameService:
         return self.db.query(Game).options(
             joinedload(Game.x_user),
             joinedload(Game.o_user)
-        ).filter(
-            (Game.x_user_id == user_id) | (Game.o_user_id == user_id),
-            Game.finished == True
-        ).order_by(Game.updated_at.desc()).all()
+        ).filter(*self._finished_filter(user_id)).order_by(Game.updated_at.desc()).all()
+    
+    def play_bot_turns(self, game_id: int) -> int:
+        """
+        Play moves for bot users for as long as a bot is the player to move.
+        Does nothing if no BotService is configured.
+        
+        The search runs on a copy of the position without holding the game
+        lock, so it doesn't hold up other requests for this game or for the
+        games sharing its lock stripe; the move is then played under the lock
+        unless the game moved on in the meantime.
+        
+        Args:
+            game_id: The game ID
+        
+        Returns:
+            Number of moves the bot(s) played
+        
+        Raises:
+            ValueError: If game not found
+        """
+        if self.bot_service is None:
+            return 0
+        
+        game_record = self.db.query(Game).filter(Game.id == game_id).first()
+        if not game_record:
+            raise ValueError(f"Game with ID {game_id} not found")
+        
+        moves_played = 0
+        while True:
+            with self.game_file_service.game_lock(game_id):
+                game = self.game_file_service.load_game(game_id)
+                if not game:
+                    raise ValueError("Could not load game state")
+                if game.current_game.finished:
+                    break
+                player = game.current_game.turn
+                user_id = game_record.x_user_id if player == 'X' else game_record.o_user_id
+                user = self.user_service.get_user_by_id(user_id)
+                if not user or not user.bot:
+                    break
+                state = game.current_game.copy()
+                move_count = len(game.moves)
+            
+            corner, position = self.bot_service.choose_move(state)
+            
+            with self.game_file_service.game_lock(game_id):
+                game = self.game_file_service.load_game(game_id)
+                if not game:
+                    raise ValueError("Could not load game state")
+                if len(game.moves) != move_count:
+                    # another request played this turn first; look again
+                    continue
+                self.game_file_service.take_turn(
+                    game_id=game_id,
+                    game=game,
+                    player=player,
+                    corner=corner,
+                    position=position
+                )
+                moves_played += 1
+        
+        return moves_played
     
     def take_turn(self, game_id: int, player: str, corner: str, position: str) -> Dict[str, Any]:
         """
-        Execute a turn in a game.
+        Execute a turn in a game. If the opponent is a bot, its reply is
+        searched and played before this returns, so the call takes up to the
+        bot's search time (BOT_TIME_LIMIT) longer.
         
         Args:
             game_id: The game ID
@@ -398,53 +579,151 @@ class GameService:
         Raises:
             ValueError: If game not found or move is invalid
         """
-        game_record = self.db.query(Game).filter(Game.id == game_id).first()
-        if not game_record:
-            raise ValueError(f"Game with ID {game_id} not found")
+        # one turn per game at a time: a concurrent request for the same game
+        # waits and then plays from the position this turn leaves
+        with self.game_file_service.game_lock(game_id):
+            game_record = self.db.query(Game).filter(Game.id == game_id).first()
+            if not game_record:
+                raise ValueError(f"Game with ID {game_id} not found")
+        
+            # Load the game state from file
+            game = self.game_file_service.load_game(game_id)
+            if not game:
+                raise ValueError("Could not load game state")
+        
+            # Execute turn via GameFileService (which handles persistence)
+            self.game_file_service.take_turn(
+                game_id=game_id,
+                game=game,
+                player=player,
+                corner=corner,
+                position=position
+            )
         
-        # Load the game state from file
-        game = self.game_file_service.load_game(game_id)
-        if not game:
-            raise ValueError("Could not load game state")
+        # Reply for the opponent if it is a bot; the search runs without the game lock
+        bot_moves = self.play_bot_turns(game_id)
         
-        # Execute turn via GameFileService (which handles persistence)
-        self.game_file_service.take_turn(
-            game_id=game_id,
-            game=game,
-            player=player,
-            corner=corner,
-            position=position
-        )
+        with self.game_file_service.game_lock(game_id):
+            if bot_moves:
+                game = self.game_file_service.load_game(game_id)
+                if not game:
+                    raise ValueError("Could not load game state")
         
-        # Refresh game record from database in case it was updated
-        self.db.refresh(game_record)
+            # Refresh game record from database in case it was updated
+            self.db.refresh(game_record)
         
-        # Re-query to ensure we have the latest data including updated winner_id
-        game_record = self.db.query(Game).filter(Game.id == game_id).first()
+            # Re-query to ensure we have the latest data including updated winner_id
+            game_record = self.db.query(Game).filter(Game.id == game_id).first()
         
-        # Serialize updated game state
-        game_data = self.game_file_service._serialize_game(game)
-
-        # notify the player who's turn it is now
-        # reload the game
-        new_loaded_game = self.game_file_service.load_game(game_id)
-        if new_loaded_game.current_game.winner is None and not new_loaded_game.current_game.finished:
-            next_player = new_loaded_game.current_game.current_player
-            if next_player == 'X':
-                next_user_id = game_record.x_user_id
-            else:
-                next_user_id = game_record.o_user_id
-            self.notification_service.send_notification(
-                user_id=next_user_id,
-                title="It's your turn!",
-                message=f"Game ID {game_id}: It's your turn to play as {next_player}."
-            )
+            # Serialize updated game state
+            game_data = self.game_file_service._serialize_game(game, include_checkpoints=False)
+
+            # notify the player whose turn it is now
+            # (the game object is already up to date, no need to reload it)
+            if not game.current_game.finished:
+                next_player = game.current_game.turn
+                if next_player == 'X':
+                    next_user_id = game_record.x_user_id
+                else:
+                    next_user_id = game_record.o_user_id
+                self.notification_service.send_notification(
+                    user_id=next_user_id,
+                    title="It's your turn!",
+                    message=f"Game ID {game_id}: It's your turn to play as {next_player}."
+                )
+        
+            return {
+                "id": game_record.id,
+                "x_user_id": game_record.x_user_id,
+                "o_user_id": game_record.o_user_id,
+                "finished": game_record.finished,
+                "winner_id": game_record.winner_id,
+                "state": game_data
+            }
+
+    # ===== Async data layer (DB_ASYNC) =====
+    #
+    # Variants of the hot read paths for async routes. Queries run on the
+    # request's AsyncSession and game files are read on the thread pool, so no
+    # call blocks the event loop. Turns stay on the sync path: they hold the
+    # per-game lock (a thread lock) around the engine, the save and the bot
+    # reply, so an async variant would only move the same work to a thread.
+
+    async def get_game_record_async(self, session, game_id: int) -> Game:
+        """
+        get_game_record on an AsyncSession.
         
-        return {
-            "id": game_record.id,
-            "x_user_id": game_record.x_user_id,
-            "o_user_id": game_record.o_user_id,
-            "finished": game_record.finished,
-            "winner_id": game_record.winner_id,
-            "state": game_data
-        }
+        Raises:
+            ValueError: If game not found
+        """
+        game_record = await session.get(Game, game_id)
+        if not game_record:
+            raise ValueError(f"Game with ID {game_id} not found")
+        return game_record
+
+    async def get_game_async(self, session, game_id: int) -> Dict[str, Any]:
+        """
+        get_game on an AsyncSession.
+        
+        Raises:
+            ValueError: If game not found
+        """
+        game_record = await self.get_game_record_async(session, game_id)
+        users = await self.user_service.get_users_by_ids_async(session, [game_record.x_user_id, game_record.o_user_id])
+        await self._end_read(session)
+        games = await self.game_file_service.load_games_async(session, [game_id])
+        if game_id not in games:
+            raise ValueError("Could not load game state")
+        return self._game_data(game_record, games[game_id], users)
+
+    async def get_games_async(self, session, game_ids: List[int]) -> List[Dict[str, Any]]:
+        """
+        get_games on an AsyncSession: one query each for the records, states
+        (or a parallel file read) and players.
+        
+        Returns:
+            List of game data dictionaries in the order of game_ids; games
+            that are missing or fail to load are skipped
+        """
+        if not game_ids:
+            return []
+        result = await session.execute(select(Game).where(Game.id.in_(game_ids)))
+        records = {record.id: record for record in result.scalars()}
+        users = await self.user_service.get_users_by_ids_async(
+            session, [user_id for record in records.values() for user_id in (record.x_user_id, record.o_user_id)]
+        )
+        await self._end_read(session)
+        games = await self.game_file_service.load_games_async(session, records)
+        
+        data = []
+        for game_id in game_ids:
+            if game_id not in games:
+                print(f"Error loading game {game_id}: {'Could not load game state' if game_id in records else 'not found'}")
+                continue
+            data.append(self._game_data(records[game_id], games[game_id], users))
+        return data
+
+    async def _end_read(self, session) -> None:
+        """
+        End the session's read transaction before waiting on the thread pool
+        (game files). On SQLite an open reader blocks writers, and a
+        writer on a pool thread would then wait for a reader that is waiting
+        for a pool thread. Loaded records stay usable (no expire on commit).
+        """
+        await session.commit()
+
+    async def _list_games_async(self, session, conditions: tuple) -> list:
+        result = await session.execute(select(Game).where(*conditions).order_by(Game.updated_at.desc()))
+        return list(result.scalars())
+
+    async def list_games_user_turn_async(self, session, user_id: int) -> list:
+        """list_games_user_turn on an AsyncSession (records only, players not loaded)."""
+        return await self._list_games_async(session, self._user_turn_filter(user_id))
+
+    async def list_games_opponent_turn_async(self, session, user_id: int) -> list:
+        """list_games_opponent_turn on an AsyncSession (records only, players not loaded)."""
+        return await self._list_games_async(session, self._opponent_turn_filter(user_id))
+
+    async def list_games_finished_async(self, session, user_id: int) -> list:
+        """list_games_finished on an AsyncSession (records only, players not loaded)."""
+        return await self._list_games_async(session, self._finished_filter(user_id))
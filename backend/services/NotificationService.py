@@ -1,9 +1,10 @@
-from database.schema import SessionLocal, Notification
+from database.schema import Notification
+from database.session import db_session
 from datetime import datetime, UTC
 
 class NotificationService:
     def __init__(self):
-        self.db = SessionLocal()
+        self.db = db_session
 
     def send_notification(self, user_id: int, title: str|None, message: str) -> Notification:
         notification = Notification(
@@ -0,0 +1,147 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+import bcrypt
+import os
+import threading
+import time
+
+# bcrypt work factor for new hashes (4-31); stored hashes of another cost are
+# rehashed at the user's next login
+BCRYPT_ROUNDS = int(os.environ.get("BCRYPT_ROUNDS", "12"))
+
+# Threads hashing and checking passwords; bcrypt releases the GIL, so they
+# use that many cores
+PASSWORD_HASH_WORKERS = int(os.environ.get("PASSWORD_HASH_WORKERS", "0")) or os.cpu_count() or 1
+
+# Password jobs allowed to wait for a thread; past that, requests are turned
+# away instead of queueing. Waiting requests hold one of the DB_MAX_REQUESTS
+# request slots, so keep workers + queue well below it.
+PASSWORD_HASH_QUEUE = int(os.environ.get("PASSWORD_HASH_QUEUE", "8"))
+
+
+class PasswordHashQueueFull(Exception):
+    """Raised when too many password jobs are already waiting."""
+
+
+class PasswordHasher:
+    """
+    Hashes and checks passwords with bcrypt on a small dedicated thread
+    pool, so a burst of logins uses at most `workers` cores and queues at
+    most `max_queue` jobs instead of tying up every request thread.
+    """
+
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, rounds: int = BCRYPT_ROUNDS, max_queue: int = PASSWORD_HASH_QUEUE):
+        if not 4 <= rounds <= 31:
+            raise ValueError("BCRYPT_ROUNDS must be between 4 and 31")
+        if max_queue < 0:
+            raise ValueError("PASSWORD_HASH_QUEUE can't be negative")
+        self.workers = max(1, workers)
+        self.rounds = rounds
+        self.max_queue = max_queue
+        self.executor: Optional[ThreadPoolExecutor] = None
+
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.hashes = 0
+        self.verifications = 0
+        self.outdated_hashes = 0
+        self.rejected = 0
+        self.total_time = 0.0
+        self.total_wait = 0.0
+        # called from concurrent requests; guards the executor and counters
+        self.lock = threading.Lock()
+
+    def hash(self, password: str) -> str:
+        """
+        Hash a password with the configured work factor.
+
+        Raises:
+            PasswordHashQueueFull: If too many password jobs are waiting
+        """
+        hashed = self._run("hashes", bcrypt.hashpw, password.encode('utf-8'), bcrypt.gensalt(self.rounds))
+        return hashed.decode('utf-8')
+
+    def verify(self, password: str, hashed_password: str) -> bool:
+        """
+        Check a password against a stored hash.
+
+        Raises:
+            PasswordHashQueueFull: If too many password jobs are waiting
+        """
+        return self._run("verifications", bcrypt.checkpw, password.encode('utf-8'), hashed_password.encode('utf-8'))
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """Whether a stored hash was made with a different work factor than the configured one."""
+        try:
+            cost = int(hashed_password.split('$')[2])
+        except (IndexError, ValueError):
+            return False
+        if cost == self.rounds:
+            return False
+        with self.lock:
+            self.outdated_hashes += 1
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Pool usage and timing counters.
+
+        Returns:
+            Dictionary with the pool's configuration, jobs running or queued
+            now, totals of hashes, checks and rejected jobs, and the average
+            time a job took and waited for a thread
+        """
+        with self.lock:
+            jobs = self.hashes + self.verifications
+            return {
+                "workers": self.workers,
+                "rounds": self.rounds,
+                "max_queue": self.max_queue,
+                "in_flight": self.in_flight,
+                "queued": max(0, self.in_flight - self.workers),
+                "peak_in_flight": self.peak_in_flight,
+                "hashes": self.hashes,
+                "verifications": self.verifications,
+                "outdated_hashes": self.outdated_hashes,
+                "rejected": self.rejected,
+                "average_ms": 1000 * self.total_time / jobs if jobs else 0.0,
+                "average_wait_ms": 1000 * self.total_wait / jobs if jobs else 0.0,
+            }
+
+    def _run(self, counter: str, func: Callable, *args) -> Any:
+        with self.lock:
+            if self.in_flight >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise PasswordHashQueueFull("Too many password checks in progress, try again shortly")
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+            executor = self.executor
+        try:
+            return executor.submit(self._timed, counter, time.perf_counter(), func, *args).result()
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+    def _timed(self, counter: str, submitted_at: float, func: Callable, *args) -> Any:
+        started_at = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            elapsed = time.perf_counter() - started_at
+            with self.lock:
+                setattr(self, counter, getattr(self, counter) + 1)
+                self.total_time += elapsed
+                self.total_wait += started_at - submitted_at
+
+    def close(self):
+        """Shut down the hashing threads."""
+        with self.lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown()
+
+
+# Shared by every UserService
+password_hasher = PasswordHasher()
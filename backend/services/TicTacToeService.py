@@ -1,7 +1,28 @@
-from datamodels.tictactoe import UltimateTicTacToe, UltimateTicTacToeGameState, SubTicTacToeGame
+from datamodels.tictactoe import (
+    UltimateTicTacToe, UltimateTicTacToeGameState, SubTicTacToeGame, Move, CHECKPOINT_INTERVAL,
+    STATUS_OFFSET, STATUS_FINISHED, TURN_BYTE, FINISHED_BYTE, WINNER_BYTE, ACTIVE_BYTE, NO_ACTIVE_CORNER,
+)
+from datamodels.bitboard import BitboardGameState, POSITIONS, POSITION_INDEX, PLAYER_INDEX, NO_WINNER, ANY_CORNER, CELL_NAMES, iter_cells
+from datamodels.zobrist import move_key
+from typing import List, Tuple, Union
+import os
 import time
 
+# Rules engine used by take_turn: "dataclass" (attribute based) or "bitboard"
+ENGINE = os.environ.get("TICTACTOE_ENGINE", "dataclass").lower()
+ENGINES = ("dataclass", "bitboard")
+
+# When enabled, every turn is re-checked against a full-board recompute
+VERIFY = os.environ.get("TICTACTOE_VERIFY", "").lower() in ("1", "true", "yes")
+
+
 class TicTacToeService:
+    def __init__(self, engine: str = ENGINE, verify: bool = VERIFY):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown tictactoe engine '{engine}', expected one of {ENGINES}")
+        self.engine = engine
+        self.verify = verify
+
     def init_empty_game(self) -> UltimateTicTacToe:
         def create_empty_subgame() -> SubTicTacToeGame:
             return SubTicTacToeGame(
@@ -34,9 +55,108 @@ class TicTacToeService:
             bottomright=create_empty_subgame(),
         )
 
-        return UltimateTicTacToe(current_game=game_state, history=[])
+        return UltimateTicTacToe(current_game=game_state)
 
     def take_turn(self, game: UltimateTicTacToe, player: str, corner: str, position: str) -> None:
+        if self.engine == "bitboard":
+            self._take_turn_bitboard(game, player, corner, position)
+        else:
+            self._take_turn_dataclass(game, player, corner, position)
+
+        # record the move; full states are rebuilt from the nearest checkpoint on demand
+        game.moves.append(Move(player=player, corner=corner, position=position, timestamp=int(time.time())))
+        if len(game.moves) % CHECKPOINT_INTERVAL == 0:
+            game.checkpoints[len(game.moves)] = game.current_game.copy()
+
+        if self.verify:
+            self.verify_state(game.current_game)
+
+    def legal_moves(self, state: Union[UltimateTicTacToeGameState, BitboardGameState], as_mask: bool = False) -> Union[List[Tuple[str, str]], int]:
+        """
+        List the moves the side to move may play.
+        
+        Args:
+            state: A game state, or a BitboardGameState to skip the conversion
+            as_mask: Return the 81-bit cell mask (bit 9*corner + position) instead of a list
+        
+        Returns:
+            List of (corner, position) name pairs, or the bitmask if as_mask is set
+        """
+        if not isinstance(state, BitboardGameState):
+            state = BitboardGameState.from_game_state(state)
+        mask = state.legal_move_mask()
+        if as_mask:
+            return mask
+        return [CELL_NAMES[cell] for cell in iter_cells(mask)]
+
+    def state_at(self, game: UltimateTicTacToe, index: int) -> UltimateTicTacToeGameState:
+        """
+        Rebuild the state before move `index` (0 = starting position, len(moves) = current state).
+
+        Replays at most CHECKPOINT_INTERVAL moves from the nearest earlier checkpoint.
+
+        Raises:
+            ValueError: If index is out of range
+        """
+        if index < 0 or index > len(game.moves):
+            raise ValueError(f"Move index {index} is out of range (0–{len(game.moves)})")
+        if index == len(game.moves):
+            return game.current_game.copy()
+
+        base = max(i for i in game.checkpoints if i <= index)
+        state = game.checkpoints[base].copy()
+        for move in game.moves[base:index]:
+            self._apply_move(state, move.player, move.corner, move.position)
+        state.next_turn_timestamp = game.moves[index].timestamp
+        return state
+
+    def get_history(self, game: UltimateTicTacToe) -> List[UltimateTicTacToeGameState]:
+        """Rebuild the full state before every move, replaying the move list once."""
+        return self.replay_history(game.checkpoints[0], game.moves)
+
+    def replay_history(self, state: UltimateTicTacToeGameState, moves: List[Move]) -> List[UltimateTicTacToeGameState]:
+        """The state before each of moves, replayed from state (which is left unchanged)."""
+        history = []
+        state = state.copy()
+        for move in moves:
+            entry = state.copy()
+            entry.next_turn_timestamp = move.timestamp
+            history.append(entry)
+            self._apply_move(state, move.player, move.corner, move.position)
+        return history
+
+    def apply_moves(self, state: UltimateTicTacToeGameState, moves: List[Move]) -> UltimateTicTacToeGameState:
+        """A copy of state with moves played, without validating them (they come from a stored game)."""
+        state = state.copy()
+        for move in moves:
+            self._apply_move(state, move.player, move.corner, move.position)
+        return state
+
+    def compute_hash(self, state: UltimateTicTacToeGameState) -> int:
+        """Recompute a state's Zobrist hash from scratch (ignores the stored zobrist_hash)."""
+        return state.computeHash()
+
+    def verify_state(self, state: UltimateTicTacToeGameState) -> None:
+        """
+        Recompute every subgame, the overall result and the Zobrist hash from
+        scratch and compare against the incrementally maintained state.
+
+        Raises:
+            RuntimeError: If the incremental state disagrees with the full recompute
+        """
+        expected = state.copy()
+        expected.updateSelf()
+        for corner in POSITIONS:
+            actual_subgame = getattr(state, corner)
+            expected_subgame = getattr(expected, corner)
+            if (actual_subgame.finished, actual_subgame.winner) != (expected_subgame.finished, expected_subgame.winner):
+                raise RuntimeError(f"Incremental status mismatch in {corner} subgame")
+        if (state.finished, state.winner) != (expected.finished, expected.winner):
+            raise RuntimeError("Incremental status mismatch in overall game")
+        if state.zobrist_hash != state.computeHash():
+            raise RuntimeError("Incremental Zobrist hash mismatch")
+
+    def _take_turn_dataclass(self, game: UltimateTicTacToe, player: str, corner: str, position: str) -> None:
         # if game is finished, cannot play
         if game.current_game.finished:
             raise ValueError("The game is already finished!")
@@ -59,25 +179,68 @@ class TicTacToeService:
             raise ValueError(f"The position {position} in {corner} is already taken!")
         
         # safe to make a move
-        # copy the current game state to history
-        history_entry = game.current_game.copy()
-        history_entry.next_turn_timestamp = int(time.time())
-        game.history.append(history_entry)
+        self._apply_move(game.current_game, player, corner, position)
+
+    def _apply_move(self, state: UltimateTicTacToeGameState, player: str, corner: str, position: str) -> None:
         # make the move
+        subgame: SubTicTacToeGame = getattr(state, corner)
         setattr(subgame, position, player)
+        old_active = POSITION_INDEX[state.activeCorner] if state.activeCorner else ANY_CORNER
         
-        # Update the subgame to check for wins/draws
+        # Update the subgame to check for wins/draws (a single outcome table lookup)
         subgame.updateSelf()
         
         # the next active corner is determined by the position played, unless that subgame is finished
         next_active_corner = position
-        next_subgame: SubTicTacToeGame = getattr(game.current_game, next_active_corner)
+        next_subgame: SubTicTacToeGame = getattr(state, next_active_corner)
         if next_subgame.finished:
             next_active_corner = ''
-        game.current_game.activeCorner = next_active_corner
+        state.activeCorner = next_active_corner
 
         # next player's turn
-        game.current_game.turn = 'O' if player == 'X' else 'X'
+        state.turn = 'O' if player == 'X' else 'X'
 
-        # update overall game state (checks for ultimate wins/draws)
-        game.current_game.updateSelf()
\ No newline at end of file
+        # stone, side to move and forced corner all changed
+        corner_index = POSITION_INDEX[corner]
+        new_active = POSITION_INDEX[next_active_corner] if next_active_corner else ANY_CORNER
+        state.zobrist_hash ^= move_key(PLAYER_INDEX[player], 9 * corner_index + POSITION_INDEX[position], old_active, new_active)
+
+        # update overall game state (checks for ultimate wins/draws through this corner)
+        state.updateAfterMove(corner)
+
+    def _game_bitboard(self, game: UltimateTicTacToe) -> BitboardGameState:
+        """
+        The bitboard kept on the game for current_game, rebuilt only when the
+        game is new to this engine or current_game changed some other way
+        (its Zobrist hash no longer matches).
+        """
+        state = game.current_game
+        if game.bitboard is None or game.bitboard_hash != state.zobrist_hash:
+            game.bitboard = BitboardGameState.from_game_state(state)
+            game.bitboard_hash = state.zobrist_hash
+        return game.bitboard
+
+    def _take_turn_bitboard(self, game: UltimateTicTacToe, player: str, corner: str, position: str) -> None:
+        state = game.current_game
+        board = self._game_bitboard(game)
+
+        # validation raises the same ValueErrors as the dataclass engine
+        corner_index, position_index = board.check_move(player, corner, position)
+
+        old_active = board.active
+        board.apply_move(corner_index, position_index)
+
+        # write back only the bytes a single move can change
+        buffer = state.buffer
+        corner_bit = 1 << corner_index
+        buffer[9 * corner_index + position_index] = PLAYER_INDEX[player] + 1
+        buffer[STATUS_OFFSET + corner_index] = (
+            (1 if board.x_won & corner_bit else 2 if board.o_won & corner_bit else 0)
+            | (STATUS_FINISHED if board.closed & corner_bit else 0)
+        )
+        buffer[ACTIVE_BYTE] = board.active if board.active != ANY_CORNER else NO_ACTIVE_CORNER
+        buffer[TURN_BYTE] = board.turn + 1
+        buffer[FINISHED_BYTE] = 1 if board.finished else 0
+        buffer[WINNER_BYTE] = board.winner + 1 if board.winner != NO_WINNER else 0
+        state.zobrist_hash ^= move_key(PLAYER_INDEX[player], 9 * corner_index + position_index, old_active, board.active)
+        game.bitboard_hash = state.zobrist_hash
@@ -1,5 +1,6 @@
 from datetime import datetime, timedelta, UTC
-from database.schema import SessionLocal, UserInvite
+from database.schema import UserInvite
+from database.session import db_session
 from services.UserService import UserService
 from services.NotificationService import NotificationService
 import random
@@ -7,7 +8,7 @@ import string
 
 class UserInviteService:
     def __init__(self, user_service: UserService, notification_service: NotificationService):
-        self.db = SessionLocal()
+        self.db = db_session
         self.user_service = user_service
         self.notification_service = notification_service
 
@@ -1,15 +1,19 @@
-from typing import Optional, List, Tuple
-from database.schema import SessionLocal, User
-import bcrypt
+from typing import Dict, Iterable, Optional, List, Tuple
+from sqlalchemy import select
+from database.schema import User
+from database.session import db_session
+from services.AuthCache import auth_cache
+from services.PasswordHasher import password_hasher, PasswordHashQueueFull
 import secrets
 import string
 
 
 class UserService:
     def __init__(self):
-        self.db = SessionLocal()
+        self.db = db_session
+        self.password_hasher = password_hasher
 
-    def create_user(self, name: str, username: str, email: str, password: str, admin: bool = False) -> User:
+    def create_user(self, name: str, username: str, email: str, password: str, admin: bool = False, bot: bool = False) -> User:
         """
         Create a new user.
         
@@ -19,19 +23,21 @@ class UserService:
             email: The user's email address
             password: The plain password (will be hashed)
             admin: Whether the user is an admin (default: False)
+            bot: Whether the user's turns are played by the BotService (default: False)
         
         Returns:
             The created User object
         """
         # Hash the password
-        hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        hashed_password = self.password_hasher.hash(password)
         
         user = User(
             name=name,
             username=username,
             email=email,
             hashed_password=hashed_password,
-            admin=admin
+            admin=admin,
+            bot=bot
         )
         self.db.add(user)
         self.db.commit()
@@ -50,6 +56,51 @@ class UserService:
         """
         return self.db.query(User).filter(User.id == user_id).first()
 
+    def get_users_by_ids(self, user_ids: Iterable[int]) -> Dict[int, User]:
+        """
+        Retrieve several users with a single query.
+        
+        Args:
+            user_ids: The users' IDs
+        
+        Returns:
+            Dictionary of user ID to User; unknown IDs are left out
+        """
+        user_ids = {user_id for user_id in user_ids if user_id is not None}
+        if not user_ids:
+            return {}
+        return {user.id: user for user in self.db.query(User).filter(User.id.in_(user_ids))}
+
+    async def get_user_by_id_async(self, session, user_id: int) -> Optional[User]:
+        """
+        get_user_by_id on an AsyncSession (DB_ASYNC).
+        
+        Args:
+            session: The request's AsyncSession
+            user_id: The user's ID
+        
+        Returns:
+            The User object, or None if not found
+        """
+        return await session.get(User, user_id)
+
+    async def get_users_by_ids_async(self, session, user_ids: Iterable[int]) -> Dict[int, User]:
+        """
+        get_users_by_ids on an AsyncSession (DB_ASYNC).
+        
+        Args:
+            session: The request's AsyncSession
+            user_ids: The users' IDs
+        
+        Returns:
+            Dictionary of user ID to User; unknown IDs are left out
+        """
+        user_ids = {user_id for user_id in user_ids if user_id is not None}
+        if not user_ids:
+            return {}
+        result = await session.execute(select(User).where(User.id.in_(user_ids)))
+        return {user.id: user for user in result.scalars()}
+
     def get_user_by_username(self, username: str) -> Optional[User]:
         """
         Retrieve a user by username (excludes deleted users).
@@ -85,7 +136,9 @@ class UserService:
 
     def authenticate_user(self, username: str, password: str) -> Optional[User]:
         """
-        Authenticate a user by username and password.
+        Authenticate a user by username and password. A hash made with a
+        different work factor than BCRYPT_ROUNDS is replaced on success,
+        unless the hashing pool is full (it is then retried next login).
         
         Args:
             username: The username
@@ -93,13 +146,25 @@ class UserService:
         
         Returns:
             The User object if authentication succeeds, None otherwise
+        
+        Raises:
+            PasswordHashQueueFull: If too many password checks are waiting
         """
         user = self.get_user_by_username(username)
         if not user:
             return None
         
         # Verify the password against the hashed password
-        if bcrypt.checkpw(password.encode('utf-8'), user.hashed_password.encode('utf-8')):
+        if self.password_hasher.verify(password, user.hashed_password):
+            # Upgrade hashes made with an older work factor while we have the
+            # password; best effort, the login already succeeded
+            if self.password_hasher.needs_rehash(user.hashed_password):
+                try:
+                    user.hashed_password = self.password_hasher.hash(password)
+                except PasswordHashQueueFull:
+                    return user
+                self.db.commit()
+                self.db.refresh(user)
             return user
         
         return None
@@ -121,12 +186,13 @@ class UserService:
         
         for key, value in kwargs.items():
             if key == 'password':
-                user.hashed_password = bcrypt.hashpw(value.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+                user.hashed_password = self.password_hasher.hash(value)
                 user.password_must_reset = False
-            elif key in ['name', 'username', 'email', 'admin'] and hasattr(user, key):
+            elif key in ['name', 'username', 'email', 'admin', 'bot'] and hasattr(user, key):
                 setattr(user, key, value)
         
         self.db.commit()
+        auth_cache.invalidate_user(user_id)
         self.db.refresh(user)
         return user
 
@@ -148,6 +214,7 @@ class UserService:
         user.username = f"deleted_user_{user.id}"
         user.email = f"deleted_user_{user.id}@example.com"
         self.db.commit()
+        auth_cache.invalidate_user(user_id)
         return True
 
     def reset_username(self, user_id: int, new_username: str) -> Optional[User]:
@@ -203,8 +270,7 @@ class UserService:
         new_password = ''.join(secrets.choice(characters) for _ in range(12))
         
         # Hash and set the new password
-        hashed_password = bcrypt.hashpw(new_password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-        user.hashed_password = hashed_password
+        user.hashed_password = self.password_hasher.hash(new_password)
         user.password_must_reset = True
         
         self.db.commit()
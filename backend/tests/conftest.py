@@ -0,0 +1,47 @@
+import os
+import sys
+import tempfile
+import uuid
+
+import pytest
+
+# the backend runs from its own directory (imports like `from services...`)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# a throwaway SQLite database and games directory for the whole run; set
+# before anything reads the configuration at import time
+os.environ["DATA_DIR"] = tempfile.mkdtemp(prefix="tictactoe-tests-")
+os.environ["DB_TYPE"] = "sqlite"
+# the cheapest bcrypt work factor, so creating users is fast
+os.environ["BCRYPT_ROUNDS"] = "4"
+
+
+@pytest.fixture
+def db():
+    """The request-scoped session, on a database with the schema created."""
+    from database.schema import init_db
+    from database.session import db_session
+
+    init_db()
+    yield db_session
+    db_session.remove()
+
+
+@pytest.fixture
+def new_game_record(db):
+    """Factory creating a Game record between two new users; returns the game ID."""
+    from database.schema import Game, User
+
+    def create() -> int:
+        users = []
+        for _ in range(2):
+            name = uuid.uuid4().hex
+            users.append(User(name=name, username=name, email=f"{name}@example.com", hashed_password="-"))
+        db.add_all(users)
+        db.flush()
+        game_record = Game(x_user_id=users[0].id, o_user_id=users[1].id)
+        db.add(game_record)
+        db.commit()
+        return game_record.id
+
+    return create
@@ -0,0 +1,53 @@
+import time
+
+from services.AuthCache import AuthCache
+
+
+def test_invalidated_user_is_reloaded():
+    cache = AuthCache(max_size=8, ttl=60)
+    loaded_at = time.time()
+    cache.put_user(1, True, loaded_at)
+    assert cache.get_user_admin(1) is True
+
+    cache.invalidate_user(1)
+    assert cache.get_user_admin(1) is None
+    # a read that started before the change may be stale and isn't cached
+    cache.put_user(1, True, loaded_at)
+    assert cache.get_user_admin(1) is None
+
+
+def test_entries_expire():
+    cache = AuthCache(max_size=8, ttl=0)
+    cache.put_game(1, 2, 3)
+    time.sleep(0.01)
+    assert cache.get_game_players(1) is None
+
+
+def test_token_claims_are_trusted_only_without_a_later_change():
+    cache = AuthCache(max_size=8, ttl=60)
+    issued_at = time.time()
+    assert cache.claims_valid(1, issued_at)
+
+    time.sleep(0.01)
+    cache.invalidate_user(1)
+    assert not cache.claims_valid(1, issued_at)
+    assert cache.claims_valid(2, issued_at)
+    assert cache.claims_valid(1, time.time() + 0.01)
+
+    # tokens from before the process started can't be checked
+    assert not cache.claims_valid(3, cache.changes_since - 1)
+
+
+def test_change_times_stay_bounded():
+    cache = AuthCache(max_size=4, ttl=60)
+    issued_at = time.time()
+    time.sleep(0.01)
+    for user_id in range(100):
+        cache.invalidate_user(user_id)
+
+    assert len(cache.changed_at) == 4
+    # a forgotten change still invalidates older tokens, for every user
+    assert not cache.claims_valid(0, issued_at)
+    assert not cache.claims_valid(1000, issued_at)
+    assert not cache.claims_valid(99, issued_at)
+    assert cache.claims_valid(0, time.time() + 0.01)
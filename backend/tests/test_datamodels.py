@@ -0,0 +1,88 @@
+import random
+
+from datamodels.tictactoe import UltimateTicTacToe, UltimateTicTacToeGameState, SubTicTacToeGame, CHECKPOINT_INTERVAL
+from datamodels.zobrist import format_hash
+from services.TicTacToeService import TicTacToeService
+
+
+def played_game() -> UltimateTicTacToe:
+    service = TicTacToeService()
+    game = service.init_empty_game()
+    for corner, position in [('center', 'topleft'), ('topleft', 'center'), ('center', 'bottomright')]:
+        service.take_turn(game, game.current_game.turn, corner, position)
+    return game
+
+
+def test_state_dict_round_trip_keeps_the_hash():
+    state = played_game().current_game
+    data = state.to_dict()
+
+    assert data['zobrist_hash'] == format_hash(state.zobrist_hash)
+    assert UltimateTicTacToeGameState.from_dict(data) == state
+
+
+def test_state_from_dict_accepts_int_hashes():
+    state = played_game().current_game
+    data = state.to_dict()
+    data['zobrist_hash'] = state.zobrist_hash
+
+    assert UltimateTicTacToeGameState.from_dict(data) == state
+
+
+def test_game_dict_round_trip():
+    game = played_game()
+
+    assert UltimateTicTacToe.from_dict(game.to_dict()) == game
+
+
+def test_game_from_legacy_history_has_the_live_checkpoints():
+    service = TicTacToeService()
+    rng = random.Random(4)
+    for length in (0, 9, CHECKPOINT_INTERVAL, 2 * CHECKPOINT_INTERVAL, 2 * CHECKPOINT_INTERVAL + 3):
+        game = service.init_empty_game()
+        while len(game.moves) < length:
+            corner, position = rng.choice(service.legal_moves(game.current_game))
+            service.take_turn(game, game.current_game.turn, corner, position)
+
+        rebuilt = UltimateTicTacToe.from_history(game.current_game.copy(), service.get_history(game))
+
+        assert [(m.player, m.corner, m.position) for m in rebuilt.moves] == [(m.player, m.corner, m.position) for m in game.moves]
+        assert rebuilt.checkpoints.keys() == game.checkpoints.keys()
+        for index, state in game.checkpoints.items():
+            assert rebuilt.checkpoints[index].buffer == state.buffer
+
+
+def test_state_at_matches_the_replayed_history():
+    service = TicTacToeService()
+    rng = random.Random(5)
+    game = service.init_empty_game()
+    while len(game.moves) < 2 * CHECKPOINT_INTERVAL + 5:
+        corner, position = rng.choice(service.legal_moves(game.current_game))
+        service.take_turn(game, game.current_game.turn, corner, position)
+
+    history = service.get_history(game)
+    for index, state in enumerate(history):
+        assert service.state_at(game, index) == state
+    assert service.state_at(game, len(game.moves)) == game.current_game
+
+
+def test_packed_state_views_write_through_to_the_buffer():
+    state = played_game().current_game
+    copy = state.copy()
+
+    state.topright.bottomleft = 'O'
+    assert state.topright.bottomleft == 'O'
+    assert state.topright.to_dict() == {**copy.topright.to_dict(), 'bottomleft': 'O'}
+    assert copy.topright.bottomleft == '' and copy != state
+
+    # whole subgames are copied in, and the status is recomputed from the cells
+    subgame = SubTicTacToeGame(False, '', 'X', 'X', 'X', '', 'O', '', 'O', '', '')
+    state.bottomleft = subgame
+    state.updateSelf()
+    assert state.bottomleft.finished and state.bottomleft.winner == 'X'
+    assert subgame.winner == ''
+
+    # the buffer is the whole position (the hash is kept by the engines)
+    state.zobrist_hash = state.computeHash()
+    assert UltimateTicTacToeGameState.from_buffer(bytearray(state.buffer)) == state
+    assert UltimateTicTacToeGameState.from_dict(state.to_dict()).buffer == state.buffer
@@ -0,0 +1,155 @@
+"""
+Random-playout equivalence of the rules engines against the dataclass
+engine's TicTacToeService.take_turn: the bitboard engine, verify mode and
+the NumPy batch engine must reach the same states and reject the same moves.
+"""
+import random
+
+import numpy as np
+import pytest
+
+from datamodels.batch import BatchGameState, NO_MOVE
+from datamodels.bitboard import POSITION_INDEX, POSITIONS
+from datamodels.tictactoe import UltimateTicTacToe
+from services.TicTacToeService import TicTacToeService
+
+GAMES = 200
+
+
+def play_random_game(service: TicTacToeService, rng: random.Random):
+    """Play one game to the end with uniformly random legal moves."""
+    game = service.init_empty_game()
+    while not game.current_game.finished:
+        corner, position = rng.choice(service.legal_moves(game.current_game))
+        service.take_turn(game, game.current_game.turn, corner, position)
+    return game
+
+
+def try_turn(service: TicTacToeService, game, player: str, corner: str, position: str):
+    """The ValueError message take_turn raises for the move, or None if it was played."""
+    try:
+        service.take_turn(game, player, corner, position)
+    except ValueError as e:
+        return str(e)
+    return None
+
+
+def test_bitboard_engine_matches_dataclass_engine():
+    reference = TicTacToeService(engine="dataclass")
+    bitboard = TicTacToeService(engine="bitboard")
+    rng = random.Random(1)
+
+    for _ in range(GAMES):
+        expected = reference.init_empty_game()
+        game = bitboard.init_empty_game()
+        while not expected.current_game.finished:
+            legal = reference.legal_moves(expected.current_game)
+
+            # an illegal move (or a move out of turn) is rejected with the same
+            # message and leaves the game as it was
+            player = rng.choice(('X', 'O'))
+            corner, position = rng.choice(POSITIONS), rng.choice(POSITIONS)
+            if player != expected.current_game.turn or (corner, position) not in legal:
+                before = game.current_game.copy()
+                error = try_turn(bitboard, game, player, corner, position)
+                assert error is not None
+                assert error == try_turn(reference, expected, player, corner, position)
+                assert game.current_game == before
+
+            corner, position = rng.choice(legal)
+            player = expected.current_game.turn
+            reference.take_turn(expected, player, corner, position)
+            bitboard.take_turn(game, player, corner, position)
+            assert game.current_game.buffer == expected.current_game.buffer
+            assert game.current_game.zobrist_hash == expected.current_game.zobrist_hash
+
+        assert [(m.player, m.corner, m.position) for m in game.moves] == [(m.player, m.corner, m.position) for m in expected.moves]
+        assert game.checkpoints.keys() == expected.checkpoints.keys()
+
+
+def test_bitboard_engine_follows_a_replaced_state():
+    reference = TicTacToeService(engine="dataclass")
+    bitboard = TicTacToeService(engine="bitboard")
+    game = bitboard.init_empty_game()
+    bitboard.take_turn(game, 'X', 'center', 'topleft')
+
+    # the board kept from the last turn no longer describes current_game
+    other = reference.init_empty_game()
+    reference.take_turn(other, 'X', 'center', 'bottomright')
+    game.current_game = other.current_game.copy()
+    bitboard.take_turn(game, 'O', 'bottomright', 'center')
+    reference.take_turn(other, 'O', 'bottomright', 'center')
+    assert game.current_game == other.current_game
+
+
+def test_legal_moves_are_exactly_the_moves_take_turn_accepts():
+    service = TicTacToeService()
+    rng = random.Random(4)
+
+    for _ in range(20):
+        game = service.init_empty_game()
+        while not game.current_game.finished:
+            state = game.current_game
+            accepted = [
+                (corner, position)
+                for corner in POSITIONS
+                for position in POSITIONS
+                if try_turn(service, UltimateTicTacToe(current_game=state.copy()), state.turn, corner, position) is None
+            ]
+            legal = service.legal_moves(state)
+            assert sorted(legal) == sorted(accepted)
+            assert service.legal_moves(state, as_mask=True) == sum(1 << (9 * POSITION_INDEX[c] + POSITION_INDEX[p]) for c, p in legal)
+
+            corner, position = rng.choice(legal)
+            service.take_turn(game, state.turn, corner, position)
+        assert service.legal_moves(game.current_game) == []
+
+
+@pytest.mark.parametrize("engine", ["dataclass", "bitboard"])
+def test_verify_mode_agrees_with_full_recompute(engine):
+    service = TicTacToeService(engine=engine, verify=True)
+    rng = random.Random(2)
+
+    for _ in range(GAMES // 2):
+        game = play_random_game(service, rng)
+        # incremental status and hash equal a from-scratch recompute
+        expected = game.current_game.copy()
+        expected.updateSelf()
+        assert game.current_game.buffer == expected.buffer
+        assert game.current_game.zobrist_hash == game.current_game.computeHash()
+
+
+def test_verify_mode_detects_a_wrong_incremental_state():
+    service = TicTacToeService(verify=True)
+    game = service.init_empty_game()
+    service.take_turn(game, 'X', 'center', 'topleft')
+
+    game.current_game.zobrist_hash ^= 1
+    with pytest.raises(RuntimeError):
+        service.verify_state(game.current_game)
+
+
+def test_batch_engine_matches_take_turn():
+    reference = TicTacToeService()
+    games = [reference.init_empty_game() for _ in range(GAMES)]
+    batch = BatchGameState.from_game_states([game.current_game for game in games])
+    rng = np.random.default_rng(3)
+
+    while not batch.finished.all():
+        moves = batch.random_moves(rng)
+        batch.step(moves)
+        for game, cell in zip(games, moves):
+            if cell != NO_MOVE:
+                corner, position = divmod(int(cell), 9)
+                reference.take_turn(game, game.current_game.turn, POSITIONS[corner], POSITIONS[position])
+
+        for i, game in enumerate(games):
+            state = batch.to_game_state(i)
+            assert state.buffer == game.current_game.buffer
+            assert state.zobrist_hash == game.current_game.zobrist_hash
+
+    # finished games have no legal move, and an illegal move is refused
+    assert (batch.random_moves(rng) == NO_MOVE).all()
+    fresh = BatchGameState(1)
+    with pytest.raises(ValueError):
+        fresh.step(np.array([9 * POSITION_INDEX['topleft']]))
@@ -0,0 +1,55 @@
+import random
+
+import pytest
+
+from datamodels.game_codec import (
+    CURRENT_STATE_BYTES, MAGIC, decode_current_state, decode_game, encode_game, encode_state, decode_state,
+)
+from services.TicTacToeService import TicTacToeService
+
+
+def random_games(count: int, seed: int):
+    service = TicTacToeService()
+    rng = random.Random(seed)
+    games = []
+    for _ in range(count):
+        game = service.init_empty_game()
+        for _ in range(rng.randrange(0, 81)):
+            if game.current_game.finished:
+                break
+            corner, position = rng.choice(service.legal_moves(game.current_game))
+            service.take_turn(game, game.current_game.turn, corner, position)
+        # timestamps may go backwards (clock changes); deltas are signed
+        for move in game.moves:
+            move.timestamp = rng.randrange(1_600_000_000, 1_800_000_000)
+        games.append(game)
+    return games
+
+
+def test_games_round_trip():
+    for game in random_games(100, seed=30):
+        data = encode_game(game)
+        assert decode_game(data) == game
+        # the current state alone, from the fixed-size prefix
+        assert decode_current_state(data[:CURRENT_STATE_BYTES]) == game.current_game
+
+
+def test_states_round_trip_with_their_hash():
+    for game in random_games(20, seed=31):
+        for state in [game.current_game, *game.checkpoints.values()]:
+            decoded = decode_state(encode_state(state))
+            assert decoded.buffer == state.buffer
+            assert decoded.zobrist_hash == state.zobrist_hash
+
+
+def test_bad_data_is_refused():
+    data = encode_game(random_games(1, seed=32)[0])
+
+    with pytest.raises(ValueError):
+        decode_game(b'{"current_game": {}}')
+    with pytest.raises(ValueError):
+        decode_game(data[:-1])
+    with pytest.raises(ValueError):
+        decode_game(MAGIC + bytes([99]) + data[len(MAGIC) + 1:])
+    with pytest.raises(ValueError):
+        decode_current_state(data[:CURRENT_STATE_BYTES - 1])
@@ -0,0 +1,222 @@
+import json
+import os
+import random
+
+import pytest
+
+from database.schema import Game
+from services.GameFileService import GameFileService, GAMES_DIR, shard_dir
+from services.TicTacToeService import TicTacToeService
+
+
+def file_service(**options) -> GameFileService:
+    """A GameFileService with the default storage settings, whatever the environment says."""
+    settings = dict(storage="json", game_format="json", cache_size=0, write_behind=0, layout="flat")
+    settings.update(options)
+    return GameFileService(TicTacToeService(), **settings)
+
+
+def play_random_moves(service: GameFileService, game_id: int, game, count: int, rng: random.Random) -> None:
+    for _ in range(count):
+        if game.current_game.finished:
+            return
+        corner, position = rng.choice(service.tictactoe_service.legal_moves(game.current_game))
+        service.take_turn(game_id, game, game.current_game.turn, corner, position)
+
+
+def test_game_file_with_int_hashes_loads(new_game_record):
+    service = file_service()
+    game_id = new_game_record()
+    game = service.start_new_game(game_id)
+    play_random_moves(service, game_id, game, 12, random.Random(5))
+
+    # files written before hashes were stored as hex hold plain ints
+    path = service._find_file(game_id, ".json")
+    with open(path) as f:
+        data = json.load(f)
+    for state in [data['current_game'], *data['checkpoints'].values()]:
+        state['zobrist_hash'] = int(state['zobrist_hash'], 16)
+    with open(path, 'w') as f:
+        json.dump(data, f)
+
+    assert service.load_game(game_id) == game
+
+
+def test_cache_drops_a_move_whose_save_failed(new_game_record, monkeypatch):
+    service = file_service(cache_size=8)
+    game_id = new_game_record()
+    service.start_new_game(game_id)
+    game = service.load_game(game_id)
+    play_random_moves(service, game_id, game, 3, random.Random(6))
+    saved = service.load_game(game_id)
+
+    def failing_store(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(service, "_store_game", failing_store)
+    with pytest.raises(OSError):
+        play_random_moves(service, game_id, game, 1, random.Random(7))
+    monkeypatch.undo()
+
+    assert service.load_game(game_id) == saved
+    assert len(service.load_game(game_id).moves) == 3
+
+
+def test_cache_hands_out_copies(new_game_record):
+    service = file_service(cache_size=8)
+    game_id = new_game_record()
+    service.start_new_game(game_id)
+
+    # a turn in progress (not saved yet) is invisible to other readers
+    game = service.load_game(game_id)
+    service.tictactoe_service.take_turn(game, 'X', 'center', 'center')
+    assert service.load_game(game_id).moves == []
+    assert service.load_current_state(game_id) == service.tictactoe_service.init_empty_game().current_game
+
+    service.save_game(game_id, game)
+    assert service.load_game(game_id) == game
+    assert service.load_game(game_id) is not service.load_game(game_id)
+
+
+def test_write_behind_stores_the_game_and_its_record_together(db, new_game_record):
+    service = file_service(cache_size=2, write_behind=3600)
+    try:
+        game_ids = [new_game_record() for _ in range(3)]
+        games = {game_id: service.start_new_game(game_id) for game_id in game_ids}
+        service.flush()
+        rng = random.Random(8)
+        for game_id in game_ids:
+            play_random_moves(service, game_id, games[game_id], 4, rng)
+
+        # the first game was pushed out of the cache and written with its record;
+        # the others are still pending, with their records at the stored state
+        stored = file_service()
+        assert stored.load_game(game_ids[0]) == games[game_ids[0]]
+        for game_id in game_ids[1:]:
+            assert stored.load_game(game_id).moves == []
+            assert db.get(Game, game_id).move_count == 0
+
+        assert service.flush() == 2
+        db.expire_all()
+        for game_id in game_ids:
+            assert stored.load_game(game_id) == games[game_id]
+            record = db.get(Game, game_id)
+            assert record.move_count == 4
+            assert record.turn == games[game_id].current_game.turn
+    finally:
+        service.close()
+
+
+def test_move_log_replays_to_the_same_game_as_a_full_save(new_game_record):
+    logged = file_service(storage="movelog")
+    saved = file_service()
+    rng = random.Random(40)
+    log_id, save_id = new_game_record(), new_game_record()
+    log_game, save_game = logged.start_new_game(log_id), saved.start_new_game(save_id)
+
+    while not log_game.current_game.finished:
+        corner, position = rng.choice(logged.tictactoe_service.legal_moves(log_game.current_game))
+        player = log_game.current_game.turn
+        logged.take_turn(log_id, log_game, player, corner, position)
+        saved.take_turn(save_id, save_game, player, corner, position)
+        if not log_game.current_game.finished:
+            assert logged._find_file(log_id, ".log") is not None
+            loaded = logged.load_game(log_id)
+            assert loaded.current_game == save_game.current_game
+            assert loaded.moves == log_game.moves
+            assert loaded.checkpoints == save_game.checkpoints
+
+    # a finished game is compacted into a single game file
+    assert logged._find_file(log_id, ".log") is None
+    assert logged.load_game(log_id) == log_game
+    assert saved.load_game(save_id).current_game == log_game.current_game
+
+
+def test_move_log_skips_a_line_cut_short(new_game_record):
+    service = file_service(storage="movelog")
+    game_id = new_game_record()
+    game = service.start_new_game(game_id)
+    play_random_moves(service, game_id, game, 5, random.Random(41))
+    log_path = service._find_file(game_id, ".log")
+    with open(log_path, 'a') as f:
+        f.write('{"move": {"player": "X", "cor')
+
+    assert service.load_game(game_id) == game
+    # the next turn starts on a fresh line
+    play_random_moves(service, game_id, game, 1, random.Random(42))
+    assert service.load_game(game_id) == game
+
+
+def test_binary_games_load_in_either_format(new_game_record):
+    binary = file_service(game_format="binary")
+    game_id = new_game_record()
+    game = binary.start_new_game(game_id)
+    play_random_moves(binary, game_id, game, 15, random.Random(43))
+
+    assert binary._find_file(game_id, ".bin") is not None
+    assert binary._find_file(game_id, ".json") is None
+    assert file_service().load_game(game_id) == game
+    assert binary.load_current_state(game_id) == game.current_game
+
+    # switching back rewrites the game as JSON on its next save
+    json_service = file_service()
+    play_random_moves(json_service, game_id, game, 1, random.Random(44))
+    assert json_service._find_file(game_id, ".bin") is None
+    assert binary.load_game(game_id) == game
+
+
+def test_sharded_layout_finds_and_migrates_flat_files(new_game_record):
+    flat = file_service()
+    game_ids = [new_game_record() for _ in range(5)]
+    games = {game_id: flat.start_new_game(game_id) for game_id in game_ids}
+    play_random_moves(flat, game_ids[0], games[game_ids[0]], 3, random.Random(45))
+
+    sharded = file_service(layout="sharded")
+    # flat files stay readable, and new writes go to the shard
+    assert sharded.load_game(game_ids[0]) == games[game_ids[0]]
+    play_random_moves(sharded, game_ids[1], games[game_ids[1]], 3, random.Random(46))
+    assert os.path.exists(os.path.join(shard_dir(game_ids[1]), f"{game_ids[1]}.json"))
+    assert not os.path.exists(os.path.join(GAMES_DIR, f"{game_ids[1]}.json"))
+
+    while sharded.migrate_layout(limit=2):
+        pass
+    for game_id in game_ids:
+        assert not os.path.exists(os.path.join(GAMES_DIR, f"{game_id}.json"))
+        assert sharded.load_game(game_id) == games[game_id]
+        # the flat layout still finds games in their shards
+        assert flat.load_game(game_id) == games[game_id]
+
+
+def test_load_games_matches_loading_one_by_one(new_game_record):
+    service = file_service()
+    rng = random.Random(47)
+    game_ids = [new_game_record() for _ in range(12)]
+    for game_id in game_ids:
+        play_random_moves(service, game_id, service.start_new_game(game_id), rng.randrange(20), rng)
+
+    missing_id = max(game_ids) + 1000
+    loaded = service.load_games(game_ids + [missing_id, game_ids[0]])
+    assert list(loaded) == game_ids
+    assert all(loaded[game_id] == service.load_game(game_id) for game_id in game_ids)
+
+
+def test_current_state_and_slices_match_the_whole_game(new_game_record):
+    service = file_service()
+    game_id = new_game_record()
+    game = service.start_new_game(game_id)
+    play_random_moves(service, game_id, game, 35, random.Random(48))
+    history = service.tictactoe_service.get_history(game)
+
+    assert service.load_current_state(game_id) == game.current_game
+    for start, stop in [(0, None), (0, 5), (7, 23), (10, 11), (30, None), (len(game.moves), None), (50, 60)]:
+        game_slice = service.load_game_slice(game_id, start, stop)
+        first = min(start, len(game.moves))
+        assert game_slice.start == first
+        assert game_slice.moves == game.moves[first:stop]
+        assert game_slice.current_game == game.current_game
+        assert game_slice.move_count == len(game.moves)
+        expected_state = history[first] if first < len(history) else game.current_game
+        assert game_slice.state.buffer == expected_state.buffer
+    assert service.load_game_slice(game_id + 1000) is None
+    with pytest.raises(ValueError):
+        service.load_game_slice(game_id, -1)
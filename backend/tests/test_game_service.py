@@ -0,0 +1,154 @@
+import asyncio
+import random
+import threading
+import uuid
+
+import pytest
+
+from database.schema import Game
+from database.session import db_session
+from services.BotService import BotService
+from services.GameFileService import GameFileService
+from services.GameService import GameService
+from services.NotificationService import NotificationService
+from services.TicTacToeService import TicTacToeService
+from services.UserService import UserService
+
+
+def game_service(bot_service=None) -> GameService:
+    game_file_service = GameFileService(
+        TicTacToeService(), storage="json", game_format="json", cache_size=0, write_behind=0, layout="flat"
+    )
+    return GameService(game_file_service, UserService(), NotificationService(), bot_service=bot_service)
+
+
+def new_user(service: GameService, bot: bool = False) -> int:
+    name = uuid.uuid4().hex
+    return service.user_service.create_user(name, name, f"{name}@example.com", "password", bot=bot).id
+
+
+def play_random_turn(service: GameService, game_id: int, rng: random.Random) -> None:
+    legal = service.get_legal_moves(game_id)
+    state = service.get_game(game_id)["state"]["current_game"]
+    move = rng.choice(legal)
+    service.take_turn(game_id, state["turn"], move["corner"], move["position"])
+
+
+def test_turn_lists_follow_the_games(db):
+    service = game_service()
+    x_id, o_id = new_user(service), new_user(service)
+    rng = random.Random(50)
+    game_ids = [service.create_game(x_id, o_id).id for _ in range(8)]
+    for game_id in game_ids:
+        for _ in range(rng.choice([0, 1, 2, 7, 80])):
+            if service.get_game(game_id)["finished"]:
+                break
+            play_random_turn(service, game_id, rng)
+
+    for user_id, player in [(x_id, 'X'), (o_id, 'O')]:
+        games = {game_id: service.get_game(game_id) for game_id in game_ids}
+        own_turn = {game_id for game_id, data in games.items() if not data["finished"] and data["state"]["current_game"]["turn"] == player}
+        finished = {game_id for game_id, data in games.items() if data["finished"]}
+
+        assert {game.id for game in service.list_games_user_turn(user_id)} == own_turn
+        assert {game.id for game in service.list_games_opponent_turn(user_id)} == set(game_ids) - own_turn - finished
+        assert {game.id for game in service.list_games_finished(user_id)} == finished
+
+    for game_id in game_ids:
+        record = db.get(Game, game_id)
+        data = service.get_game(game_id)
+        assert record.move_count == len(data["state"]["moves"])
+        assert record.turn == data["state"]["current_game"]["turn"]
+
+
+def test_get_games_matches_get_game(db):
+    service = game_service()
+    x_id, o_id = new_user(service), new_user(service)
+    rng = random.Random(51)
+    game_ids = [service.create_game(x_id, o_id).id for _ in range(5)]
+    for game_id in game_ids:
+        for _ in range(rng.randrange(10)):
+            play_random_turn(service, game_id, rng)
+
+    requested = [game_ids[3], game_ids[0], max(game_ids) + 1000, game_ids[4]]
+    assert service.get_games(requested) == [service.get_game(game_id) for game_id in requested if game_id in game_ids]
+
+
+def test_a_bot_replies_within_the_turn(db):
+    bot_service = BotService(workers=1, time_limit=None, max_playouts=50)
+    service = game_service(bot_service)
+    human_id, bot_id = new_user(service), new_user(service, bot=True)
+    game_id = service.create_game(human_id, bot_id).id
+
+    result = service.take_turn(game_id, 'X', 'center', 'center')
+    assert len(result["state"]["moves"]) == 2
+    assert result["state"]["current_game"]["turn"] == 'X'
+    assert db.get(Game, game_id).next_user_id == human_id
+    assert bot_service.get_stats()["moves_played"] == 1
+
+    # a bot playing X opens as soon as the game is created
+    bot_first = service.create_game(bot_id, human_id).id
+    assert len(service.get_game(bot_first)["state"]["moves"]) == 1
+    bot_service.close()
+
+
+def test_concurrent_turns_on_one_game_stay_consistent(db):
+    service = game_service()
+    x_id, o_id = new_user(service), new_user(service)
+    game_ids = [service.create_game(x_id, o_id).id for _ in range(3)]
+    errors = []
+
+    def play(seed: int) -> None:
+        rng = random.Random(seed)
+        try:
+            for _ in range(30):
+                try:
+                    play_random_turn(service, rng.choice(game_ids), rng)
+                except ValueError:
+                    pass  # another thread moved first, or the game ended
+        except Exception as e:
+            errors.append(e)
+        finally:
+            db_session.remove()
+
+    threads = [threading.Thread(target=play, args=(seed,)) for seed in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    tictactoe_service = service.game_file_service.tictactoe_service
+    db.expire_all()
+    for game_id in game_ids:
+        game = service.game_file_service.load_game(game_id)
+        replayed = tictactoe_service.init_empty_game()
+        for move in game.moves:
+            tictactoe_service.take_turn(replayed, move.player, move.corner, move.position)
+        assert replayed.current_game == game.current_game
+        assert db.get(Game, game_id).move_count == len(game.moves)
+
+
+def test_async_reads_match_the_sync_ones(db):
+    from database.session import async_session_scope
+
+    service = game_service()
+    x_id, o_id = new_user(service), new_user(service)
+    rng = random.Random(52)
+    game_ids = [service.create_game(x_id, o_id).id for _ in range(4)]
+    for game_id in game_ids[:2]:
+        play_random_turn(service, game_id, rng)
+
+    async def read():
+        async with async_session_scope() as session:
+            game = await service.get_game_async(session, game_ids[0])
+            games = await service.get_games_async(session, game_ids)
+            own_turn = await service.list_games_user_turn_async(session, x_id)
+            finished = await service.list_games_finished_async(session, x_id)
+            return game, games, {record.id for record in own_turn}, {record.id for record in finished}
+
+    game, games, own_turn, finished = asyncio.run(read())
+    assert game == service.get_game(game_ids[0])
+    assert games == service.get_games(game_ids)
+    assert own_turn == {record.id for record in service.list_games_user_turn(x_id)}
+    assert finished == set()
@@ -0,0 +1,115 @@
+import uuid
+
+import bcrypt
+import pytest
+from fastapi.testclient import TestClient
+
+from services.GameFileService import GameFileService
+from services.GameInviteService import GameInviteService
+from services.GameService import GameService
+from services.NotificationService import NotificationService
+from services.PasswordHasher import PasswordHasher, PasswordHashQueueFull
+from services.TicTacToeService import TicTacToeService
+from services.UserInviteService import UserInviteService
+from services.UserService import UserService
+
+
+def fill_queue(hasher: PasswordHasher) -> None:
+    """Make the hasher look busy with as many jobs as it accepts."""
+    with hasher.lock:
+        hasher.in_flight = hasher.workers + hasher.max_queue
+
+
+def new_user(user_service: UserService, password: str = "password"):
+    name = uuid.uuid4().hex
+    return user_service.create_user(name, name, f"{name}@example.com", password)
+
+
+@pytest.fixture
+def server(db, tmp_path, monkeypatch):
+    from server import Server
+
+    # the server serves the frontend from ./www
+    monkeypatch.chdir(tmp_path)
+    notification_service = NotificationService()
+    user_service = UserService()
+    game_service = GameService(GameFileService(TicTacToeService()), user_service, notification_service)
+    return Server(
+        user_service,
+        game_service,
+        UserInviteService(user_service, notification_service),
+        GameInviteService(game_service, notification_service),
+        notification_service,
+    )
+
+
+def test_jobs_past_the_queue_are_rejected():
+    hasher = PasswordHasher(workers=2, rounds=4, max_queue=1)
+    hashed = hasher.hash("secret")
+    assert hasher.verify("secret", hashed)
+    assert not hasher.verify("other", hashed)
+
+    fill_queue(hasher)
+    with pytest.raises(PasswordHashQueueFull):
+        hasher.verify("secret", hashed)
+    with pytest.raises(PasswordHashQueueFull):
+        hasher.hash("secret")
+
+    stats = hasher.get_stats()
+    assert stats["rejected"] == 2
+    assert stats["queued"] == 1
+    assert stats["hashes"] == 1 and stats["verifications"] == 2
+    hasher.close()
+
+
+def test_login_is_turned_away_with_503_when_the_queue_is_full(server):
+    user = new_user(server.user_service)
+    hasher = PasswordHasher(workers=1, rounds=4, max_queue=0)
+    server.user_service.password_hasher = hasher
+    client = TestClient(server.app)
+
+    response = client.post("/api/login", json={"username": user.username, "password": "password"})
+    assert response.status_code == 200
+
+    fill_queue(hasher)
+    response = client.post("/api/login", json={"username": user.username, "password": "password"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    hasher.close()
+
+
+def test_login_rehashes_with_the_configured_rounds(db):
+    user_service = UserService()
+    user = new_user(user_service)
+    user_service.password_hasher = PasswordHasher(workers=1, rounds=5, max_queue=0)
+
+    authenticated = user_service.authenticate_user(user.username, "password")
+    assert authenticated is not None
+    assert authenticated.hashed_password.split('$')[2] == "05"
+    assert bcrypt.checkpw(b"password", authenticated.hashed_password.encode('utf-8'))
+    assert user_service.authenticate_user(user.username, "wrong") is None
+    user_service.password_hasher.close()
+
+
+def test_rehash_is_skipped_when_the_queue_fills_up(db, monkeypatch):
+    user_service = UserService()
+    user = new_user(user_service)
+    original_hash = user.hashed_password
+    hasher = PasswordHasher(workers=1, rounds=5, max_queue=0)
+    user_service.password_hasher = hasher
+
+    # the queue fills up between checking the password and rehashing it
+    verify = hasher.verify
+
+    def verify_then_fill(password, hashed_password):
+        result = verify(password, hashed_password)
+        fill_queue(hasher)
+        return result
+
+    monkeypatch.setattr(hasher, "verify", verify_then_fill)
+
+    authenticated = user_service.authenticate_user(user.username, "password")
+    assert authenticated is not None
+    assert authenticated.hashed_password == original_hash
+    assert hasher.get_stats()["rejected"] == 1
+    hasher.close()
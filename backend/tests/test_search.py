@@ -0,0 +1,200 @@
+"""
+The search engines against a brute-force solver on positions small enough
+to solve exactly, plus the files they read (opening book, tablebase).
+"""
+import random
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+
+from datamodels.bitboard import BitboardGameState, OPEN_CELLS, NO_WINNER, CELL_NAMES, iter_cells
+from datamodels.symmetry import transform_bitboard, transform_cell
+from engines import mcts
+from engines.negamax import NegamaxSearcher, WIN_SCORE, MAX_PLY
+from engines.opening_book import OpeningBook, collect_statistics, write_book
+from engines.tablebase import Solver, Tablebase, WIN, DRAW, LOSS, random_seeds, write_table
+from services.TicTacToeService import TicTacToeService
+
+
+def playable(board: BitboardGameState) -> int:
+    return 0 if board.finished else (OPEN_CELLS[board.closed] & ~board.occupied).bit_count()
+
+
+def endgame_positions(count: int, max_playable: int, seed: int):
+    """Unfinished positions from random games with at most max_playable open cells."""
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        board = BitboardGameState()
+        while not board.finished and playable(board) > max_playable:
+            cell = rng.choice(list(iter_cells(board.legal_move_mask())))
+            board.apply_move(cell // 9, cell % 9)
+        if not board.finished:
+            positions.append(board)
+    return positions
+
+
+def brute_force(board: BitboardGameState) -> int:
+    """1, 0 or -1: win, draw or loss for the side to move under perfect play."""
+    if board.finished:
+        # the side to move never won: the game ended on the opponent's move
+        return 0 if board.winner == NO_WINNER else -1
+    best = -1
+    for cell in iter_cells(board.legal_move_mask()):
+        child = board.copy()
+        child.apply_move(cell // 9, cell % 9)
+        best = max(best, -brute_force(child))
+        if best == 1:
+            break
+    return best
+
+
+def winning_moves(board: BitboardGameState):
+    """Cells that end the game with a win for the side to move."""
+    cells = []
+    for cell in iter_cells(board.legal_move_mask()):
+        child = board.copy()
+        child.apply_move(cell // 9, cell % 9)
+        if child.finished and child.winner == board.turn:
+            cells.append(cell)
+    return cells
+
+
+def position_with_a_winning_move(seed: int) -> BitboardGameState:
+    rng = random.Random(seed)
+    while True:
+        board = BitboardGameState()
+        while not board.finished:
+            if winning_moves(board):
+                return board
+            cell = rng.choice(list(iter_cells(board.legal_move_mask())))
+            board.apply_move(cell // 9, cell % 9)
+
+
+# ===== MCTS =====
+
+def test_mcts_plays_a_winning_move():
+    for seed in range(5):
+        board = position_with_a_winning_move(seed)
+        result = mcts.search(board, max_playouts=3000, seed=seed)
+        assert 9 * result.move[0] + result.move[1] in winning_moves(board)
+
+
+def test_parallel_search_in_spawned_workers():
+    board = position_with_a_winning_move(0)
+    with ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context("spawn")) as executor:
+        result = mcts.parallel_search(executor, 2, board, max_playouts=4000, seed=1)
+
+    assert result.playouts == 4000
+    assert 9 * result.move[0] + result.move[1] in winning_moves(board)
+
+
+# ===== Negamax =====
+
+def test_negamax_solves_endgames_exactly():
+    searcher = NegamaxSearcher(tt_size=1 << 16)
+    for board in endgame_positions(30, 8, seed=9):
+        result = searcher.search(board, max_depth=MAX_PLY)
+        expected = brute_force(board)
+        if expected == 0:
+            assert result.score == 0
+        else:
+            assert (result.score >= WIN_SCORE - MAX_PLY) == (expected == 1)
+            assert (result.score <= -(WIN_SCORE - MAX_PLY)) == (expected == -1)
+
+        # the chosen move keeps the result
+        child = board.copy()
+        child.apply_move(*divmod(CELL_NAMES.index(result.move), 9))
+        assert -brute_force(child) == expected
+
+
+def test_negamax_takes_an_immediate_win():
+    searcher = NegamaxSearcher(tt_size=1 << 16)
+    for seed in range(5):
+        board = position_with_a_winning_move(seed)
+        result = searcher.search(board, max_depth=2)
+        assert result.score == WIN_SCORE - 1
+        assert CELL_NAMES.index(result.move) in winning_moves(board)
+
+
+# ===== Opening book =====
+
+def test_opening_book_answers_in_every_orientation(tmp_path):
+    service = TicTacToeService()
+    rng = random.Random(10)
+    games = []
+    for _ in range(40):
+        game = service.init_empty_game()
+        # every game opens the same way, into a position with no symmetry of its
+        # own (so each orientation maps its moves one to one)
+        service.take_turn(game, 'X', 'center', 'topleft')
+        service.take_turn(game, 'O', 'topleft', 'topmiddle')
+        while not game.current_game.finished:
+            corner, position = rng.choice(service.legal_moves(game.current_game))
+            service.take_turn(game, game.current_game.turn, corner, position)
+        games.append(game)
+
+    path = str(tmp_path / "book.bin")
+    assert write_book(path, collect_statistics(games, max_ply=6)) > 0
+    book = OpeningBook(path)
+    try:
+        board = BitboardGameState()
+        board.apply_move(4, 0)
+        board.apply_move(0, 1)
+        moves = book.lookup(board)
+        assert sum(move.games for move in moves) == 40
+        assert all(move.games >= 1 for move in moves)
+
+        for transform in range(8):
+            image = transform_bitboard(board, transform)
+            image_moves = book.lookup(image)
+            # the same statistics, with every move mapped onto the image
+            expected = sorted(
+                (CELL_NAMES[transform_cell(CELL_NAMES.index((move.corner, move.position)), transform)], move.games, move.wins, move.draws)
+                for move in moves
+            )
+            assert sorted(((move.corner, move.position), move.games, move.wins, move.draws) for move in image_moves) == expected
+    finally:
+        book.close()
+
+
+# ===== Tablebase =====
+
+RESULTS = {1: WIN, 0: DRAW, -1: LOSS}
+
+
+def test_tablebase_matches_brute_force(tmp_path):
+    seeds = random_seeds(20, 7, seed=11)
+    solver = Solver()
+    for board in seeds:
+        result, _ = solver.solve(board)
+        assert result == RESULTS[brute_force(board)]
+
+    path = str(tmp_path / "tablebase.bin")
+    write_table(path, solver.records, 7)
+    tablebase = Tablebase(path)
+    try:
+        for board in seeds:
+            expected = solver.solve(board)
+            # symmetric positions share an entry
+            for transform in range(8):
+                assert tuple(tablebase.probe(transform_bitboard(board, transform))) == expected
+    finally:
+        tablebase.close()
+
+
+def test_negamax_with_tablebase_agrees(tmp_path):
+    seeds = random_seeds(10, 7, seed=12)
+    solver = Solver()
+    for board in seeds:
+        solver.solve(board)
+    path = str(tmp_path / "tablebase.bin")
+    write_table(path, solver.records, 7)
+    tablebase = Tablebase(path)
+    try:
+        searcher = NegamaxSearcher(tt_size=1 << 16, tablebase=tablebase)
+        for board in seeds:
+            score = searcher.search(board, max_depth=MAX_PLY).score
+            result = solver.solve(board)[0]
+            assert (score > 0, score == 0, score < 0) == (result == WIN, result == DRAW, result == LOSS)
+    finally:
+        tablebase.close()
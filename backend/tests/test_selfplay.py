@@ -0,0 +1,27 @@
+import json
+import os
+
+import selfplay
+from services.GameFileService import GameFileService
+from services.TicTacToeService import TicTacToeService
+
+
+def test_selfplay_is_reproducible_and_writes_loadable_games(tmp_path):
+    first = selfplay.run(games=7, workers=2, seed=3, policy="random", playouts=0, engine="bitboard", output=str(tmp_path / "a"))
+    second = selfplay.run(games=7, workers=2, seed=3, policy="random", playouts=0, engine="dataclass", output=str(tmp_path / "b"))
+
+    assert first["games"] == 7 and sum(first["outcomes"].values()) == 7
+    # same seeds, same games, whichever engine plays them
+    assert (first["moves"], first["outcomes"]) == (second["moves"], second["outcomes"])
+
+    tictactoe_service = TicTacToeService()
+    service = GameFileService(tictactoe_service)
+    assert sorted(os.listdir(tmp_path / "a")) == [f"{game_id}.json" for game_id in sorted(range(1, 8), key=str)]
+    for game_id in range(1, 8):
+        with open(tmp_path / "a" / f"{game_id}.json") as f:
+            game = service._deserialize_game(json.load(f))
+        assert game.current_game.finished
+        replayed = tictactoe_service.init_empty_game()
+        for move in game.moves:
+            tictactoe_service.take_turn(replayed, move.player, move.corner, move.position)
+        assert replayed.current_game == game.current_game
@@ -0,0 +1,47 @@
+from itertools import product
+
+from datamodels.subboard_table import TABLE_SIZE, WIN_LINES, FULL_SUBBOARD, describe, index_from_masks
+
+
+def scan(x: int, o: int):
+    """Outcome of a sub-board by scanning its lines, the way the table is meant to answer."""
+    for line in WIN_LINES:
+        if x & line == line:
+            return 'X'
+        if o & line == line:
+            return 'O'
+    return ''
+
+
+def completing(mask: int, empty: int) -> int:
+    cells = 0
+    for cell in range(9):
+        bit = 1 << cell
+        if empty & bit and any(line & bit and (mask | bit) & line == line for line in WIN_LINES):
+            cells |= bit
+    return cells
+
+
+def test_every_configuration_matches_a_line_scan():
+    seen = set()
+    for values in product(range(3), repeat=9):
+        x = sum(1 << cell for cell, value in enumerate(values) if value == 1)
+        o = sum(1 << cell for cell, value in enumerate(values) if value == 2)
+        index = index_from_masks(x, o)
+        seen.add(index)
+
+        outcome = describe(index)
+        winner = scan(x, o)
+        empty = FULL_SUBBOARD & ~(x | o)
+        finished = bool(winner) or not empty
+        assert outcome.winner == winner
+        assert outcome.finished == finished
+        assert outcome.draw == (finished and not winner)
+        if finished:
+            assert outcome.open_cells == outcome.x_threats == outcome.o_threats == 0
+        else:
+            assert outcome.open_cells == empty
+            assert outcome.x_threats == completing(x, empty)
+            assert outcome.o_threats == completing(o, empty)
+
+    assert len(seen) == TABLE_SIZE
@@ -0,0 +1,55 @@
+import random
+
+from datamodels.bitboard import BitboardGameState, iter_cells
+from datamodels.symmetry import (
+    INVERSE, canonical_hash, canonicalize, transform_bitboard, transform_cell, transform_state,
+)
+from services.TicTacToeService import TicTacToeService
+
+
+def random_states(count: int, seed: int):
+    service = TicTacToeService()
+    rng = random.Random(seed)
+    states = []
+    for _ in range(count):
+        game = service.init_empty_game()
+        for _ in range(rng.randrange(1, 40)):
+            if game.current_game.finished:
+                break
+            corner, position = rng.choice(service.legal_moves(game.current_game))
+            service.take_turn(game, game.current_game.turn, corner, position)
+        states.append(game.current_game)
+    return states
+
+
+def test_all_eight_images_share_one_canonical_form():
+    for state in random_states(50, seed=20):
+        canonical, transform = canonicalize(state)
+        images = [transform_state(state, t) for t in range(8)]
+
+        assert {canonical_hash(image) for image in images} == {canonical_hash(state)}
+        assert all(canonicalize(image)[0] == canonical for image in images)
+        # the canonical form maps back onto the original
+        assert transform_state(canonical, INVERSE[transform]) == state
+
+
+def test_transforms_map_legal_moves_onto_legal_moves():
+    for state in random_states(30, seed=21):
+        board = BitboardGameState.from_game_state(state)
+        for transform in range(8):
+            image = transform_bitboard(board, transform)
+            assert {transform_cell(cell, transform) for cell in iter_cells(board.legal_move_mask())} == set(iter_cells(image.legal_move_mask()))
+            assert image.finished == board.finished and image.winner == board.winner
+
+
+def test_different_positions_canonicalize_apart():
+    service = TicTacToeService()
+    corner_opening = service.init_empty_game()
+    service.take_turn(corner_opening, 'X', 'center', 'topleft')
+    edge_opening = service.init_empty_game()
+    service.take_turn(edge_opening, 'X', 'center', 'topmiddle')
+    mirrored = service.init_empty_game()
+    service.take_turn(mirrored, 'X', 'center', 'bottomright')
+
+    assert canonical_hash(corner_opening.current_game) != canonical_hash(edge_opening.current_game)
+    assert canonical_hash(corner_opening.current_game) == canonical_hash(mirrored.current_game)
@@ -3,7 +3,7 @@ import { useParams, useNavigate } from 'react-router-dom';
 import ApiService from '../../../services/ApiService';
 import UltimateTicTacToeGameBoard from '../../GameBoard/UltimateTicTacToeGameBoard';
 import ForkModal from './ForkModal';
-import type { GameResponse, UltimateTicTacToeGameState, Position } from '../../../datamodels/tictactoe';
+import type { GameResponse, UltimateTicTacToeGameHistory, UltimateTicTacToeGameState, Position } from '../../../datamodels/tictactoe';
 import styles from './MoveHistoryPage.module.scss';
 
 const POSITIONS: Position[] = [
@@ -43,6 +43,7 @@ const MoveHistoryPage: FC = () => {
   const navigate = useNavigate();
 
   const [game, setGame] = useState<GameResponse | null>(null);
+  const [history, setHistory] = useState<UltimateTicTacToeGameHistory | null>(null);
   const [error, setError] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
   const [stepIndex, setStepIndex] = useState(0);
@@ -58,9 +59,13 @@ const MoveHistoryPage: FC = () => {
           setLoading(false);
           return;
         }
-        const gameData = await ApiService.spectateGame(parseInt(gameId));
+        const [gameData, historyData] = await Promise.all([
+          ApiService.spectateGame(parseInt(gameId)),
+          ApiService.getGameHistory(parseInt(gameId)),
+        ]);
         setGame(gameData);
-        const totalStates = (gameData.state.history?.length ?? 0) + 1;
+        setHistory(historyData);
+        const totalStates = historyData.history.length + 1;
         setStepIndex(totalStates - 1);
       } catch {
         setError('Failed to load game. The game may not exist.');
@@ -71,8 +76,8 @@ const MoveHistoryPage: FC = () => {
     fetchGame();
   }, [gameId]);
 
-  const allStates: UltimateTicTacToeGameState[] = game
-    ? [...(game.state.history ?? []), game.state.current_game]
+  const allStates: UltimateTicTacToeGameState[] = history
+    ? [...history.history, history.current_game]
     : [];
 
   const currentState = allStates[stepIndex] ?? null;
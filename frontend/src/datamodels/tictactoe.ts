@@ -23,7 +23,19 @@ export interface GameResponse {
     last_move?: { corner: Position; position: Position } | null;
 }
 
+export interface GameMove {
+    player: Player;
+    corner: Position;
+    position: Position;
+    timestamp: number;
+}
+
 export interface UltimateTicTacToeGame {
+    current_game: UltimateTicTacToeGameState;
+    moves: GameMove[];
+}
+
+export interface UltimateTicTacToeGameHistory {
     current_game: UltimateTicTacToeGameState;
     history: UltimateTicTacToeGameState[];
 }
@@ -33,6 +45,7 @@ export interface UltimateTicTacToeGameState {
     finished: boolean;
     winner: Player | "";
     activeCorner: Position | "";
+    zobrist_hash?: string;  // 64-bit position key as 16 hex digits
 
     topleft: TicTacToeSubGame;
     topmiddle: TicTacToeSubGame;
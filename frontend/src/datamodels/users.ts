@@ -17,6 +17,7 @@ export interface UserResponse {
     name: string;
     username: string;
     password_must_reset?: boolean;
+    bot?: boolean;
 }
 
 export interface GameRecordResponse {
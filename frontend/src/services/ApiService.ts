@@ -1,4 +1,4 @@
-import type { GameCreate, GameResponse, GameTurn } from "../datamodels/tictactoe";
+import type { GameCreate, GameResponse, GameTurn, UltimateTicTacToeGameHistory } from "../datamodels/tictactoe";
 import type { UserCreate, UserResponse, UserUpdate, ScoreboardEntryResponse } from "../datamodels/users";
 import type { GameInviteResponse } from "../datamodels/gameinvites";
 
@@ -185,6 +185,10 @@ export class ApiService {
         return this.request('GET', `/games/${gameId}/spectate`);
     }
 
+    static async getGameHistory(gameId: number): Promise<UltimateTicTacToeGameHistory> {
+        return this.request('GET', `/games/${gameId}/history`);
+    }
+
     static async getGames(): Promise<GameResponse[]> {
         return this.request('GET', '/games');
     }